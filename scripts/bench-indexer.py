@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+bench-indexer.py - Measure index write throughput on a synthetic brain.
+
+Generates a throwaway brain with threads, people and meetings that link to
+each other, parses it once, then times writing the same records into a fresh
+database with the per-document path (store_document, used for incremental
+runs) and with the batched --full path (bulk_load).
+
+It then times finding a person's meetings both ways query-graph.py has done
+it: a LIKE scan over meeting content, and the join over the person -> meeting
+edges the indexer now records. Meetings are about 3/4 of the documents, so
+--docs 67000 gives a 50k-meeting corpus.
+
+Usage:
+    python3 scripts/bench-indexer.py [--docs N] [--lookups N]
+"""
+
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import indexer  # noqa: E402
+
+
+def make_brain(root: Path, docs: int, seed: int = 42):
+    """Write a synthetic brain of roughly `docs` markdown files."""
+    rng = random.Random(seed)
+    n_threads = max(1, docs // 5)
+    n_people = max(1, docs // 20)
+    n_meetings = max(1, docs - n_threads - n_people)
+
+    for sub in ("threads", "people", "archive/meetings"):
+        (root / sub).mkdir(parents=True, exist_ok=True)
+
+    def links(k):
+        return " ".join(f"[[topic-{rng.randrange(n_threads)}]]" for _ in range(k))
+
+    for i in range(n_threads):
+        (root / "threads" / f"topic-{i}.md").write_text(
+            f"# Topic {i}\n\n**Status**: 🟢 Active\n\n"
+            f"- 2026-01-{i % 28 + 1:02d}: progress, see {links(3)}\n"
+        )
+    for i in range(n_people):
+        (root / "people" / f"person-{i}.md").write_text(
+            f"# Person {i}\n\n**Role**: Engineer\n\n- 2026-02-01: talked about {links(4)}\n"
+        )
+    for i in range(n_meetings):
+        attendees = ", ".join(f"Person {rng.randrange(n_people)}" for _ in range(3))
+        (root / "archive" / "meetings" / f"2026-03-{i % 28 + 1:02d}-meeting-{i}.md").write_text(
+            f"# Meeting {i}\n\n**Attendees**: {attendees}\n\n"
+            f"2026-03-{i % 28 + 1:02d} with Person {i % n_people}\n\n"
+            f"{'Lorem ipsum dolor sit amet. ' * 40}\n\nDiscussed {links(5)}\n"
+        )
+
+
+def count_rows(conn: sqlite3.Connection) -> int:
+    return sum(
+        conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("documents", "entities", "relationships", "search_index")
+    )
+
+
+def time_write(db_path: Path, records, bulk: bool):
+    if db_path.exists():
+        db_path.unlink()
+    conn = indexer.init_db(db_path, indexer.SCHEMA_PATH)
+    start = time.perf_counter()
+    if bulk:
+        indexer.bulk_load(conn, iter(records))
+    else:
+        for record in records:
+            indexer.store_document(conn, record)
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    rows = count_rows(conn)
+    conn.close()
+    return rows, elapsed
+
+
+# query-graph.py person: before and after the indexer recorded mention edges
+MEETINGS_BY_CONTENT = """
+    SELECT DISTINCT d.path, d.title FROM documents d
+    WHERE d.type = 'meeting' AND d.content LIKE ? ORDER BY d.path DESC
+"""
+MEETINGS_BY_EDGE = """
+    SELECT DISTINCT d.path, d.title FROM relationships r
+    JOIN documents d ON d.id = r.source_document_id
+    WHERE r.source_id = ? AND r.type IN ('attended', 'mentioned_in') AND d.type = 'meeting'
+    ORDER BY d.path DESC
+"""
+
+
+def time_person_lookups(db_path: Path, lookups: int):
+    conn = sqlite3.connect(str(db_path))
+    people = conn.execute(
+        "SELECT id, name FROM entities WHERE type = 'person' AND document_id IS NOT NULL "
+        "ORDER BY id LIMIT ?", (lookups,)
+    ).fetchall()
+    meetings = conn.execute("SELECT COUNT(*) FROM documents WHERE type = 'meeting'").fetchone()[0]
+    print(f"Person -> meetings lookups: {len(people)} people, {meetings} meetings")
+    for label, sql, param in (
+        ("content LIKE", MEETINGS_BY_CONTENT, lambda pid, name: f"%{name}%"),
+        ("mention edges", MEETINGS_BY_EDGE, lambda pid, name: pid),
+    ):
+        found = 0
+        start = time.perf_counter()
+        for person_id, name in people:
+            found += len(conn.execute(sql, (param(person_id, name),)).fetchall())
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<13} {elapsed / len(people) * 1000:8.2f} ms/query  {found:>8} meetings found")
+    conn.close()
+
+
+def main():
+    docs = 5000
+    lookups = 100
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        if arg == "--docs" and i + 1 < len(args):
+            docs = int(args[i + 1])
+        elif arg == "--lookups" and i + 1 < len(args):
+            lookups = int(args[i + 1])
+
+    tmp = Path(tempfile.mkdtemp(prefix="brain-bench-"))
+    try:
+        make_brain(tmp, docs)
+        files = indexer.find_markdown_files(tmp)
+        records = [r for _, r, _ in indexer.parse_files(tmp, files) if r is not None]
+        print(f"Synthetic brain: {len(records)} documents")
+
+        db_path = tmp / ".brain.db"
+        for label, bulk in (("per-document", False), ("bulk --full", True)):
+            rows, elapsed = time_write(db_path, records, bulk)
+            print(f"  {label:<13} {rows:>8} rows in {elapsed:6.2f}s  "
+                  f"{rows / elapsed:>10,.0f} rows/s")
+        time_person_lookups(db_path, lookups)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
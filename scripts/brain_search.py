@@ -0,0 +1,91 @@
+"""
+brain_search.py - Ranked, paged full-text search over the brain index.
+
+The one query builder for searching documents: query-graph.py search uses
+it, and web/search.js mirrors it for the web UI and Slack.
+
+Results are ordered by the index's rank, which schema.sql configures as
+BM25 weighted towards titles and mentioned entity names over body text.
+The query only ever matches those three columns; a type filter is ANDed
+into the same FTS expression against the type column, so documents of
+other types are never scored. Pages are fetched with a (rank, rowid)
+cursor rather than OFFSET, so page N costs the same as page 1.
+
+Usage (as a library):
+    rows, cursor = brain_search.search(conn, "aisp rollout", types=["thread"])
+    more, cursor = brain_search.search(conn, "aisp rollout", types=["thread"], after=cursor)
+"""
+
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+TEXT_COLUMNS = "{title content entity_names}"
+
+
+def fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def match_expression(query: str, types: Sequence[str] = (), literal: bool = False) -> str:
+    """The MATCH argument for `query` over the text columns, limited to `types`.
+
+    With `literal`, each word is matched as-is instead of being parsed as
+    FTS5 syntax (AND/OR/NOT, "phrases", prefix*).
+    """
+    if literal:
+        query = " ".join(fts_phrase(word) for word in query.split())
+    expression = f"{TEXT_COLUMNS} : ({query})"
+    if types:
+        expression += " AND type : (" + " OR ".join(fts_phrase(t) for t in types) + ")"
+    return expression
+
+
+def encode_cursor(rank: float, rowid: int) -> str:
+    return f"{rank!r}:{rowid}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Inverse of encode_cursor(); raises ValueError for anything else."""
+    rank, rowid = cursor.rsplit(":", 1)
+    return float(rank), int(rowid)
+
+
+def search(conn: sqlite3.Connection, query: str, types: Sequence[str] = (),
+           limit: int = PAGE_SIZE, after: Optional[str] = None,
+           marks: Tuple[str, str] = (">>>", "<<<")) -> Tuple[List[Dict], Optional[str]]:
+    """One page of documents matching `query`, best first.
+
+    Returns the rows (rowid, path, type, title, snippet with matches wrapped
+    in `marks`) and the cursor for the next page, or None on the last page.
+    A query that isn't valid FTS5 syntax is retried as plain words.
+    """
+    if not query.strip():
+        return [], None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    conditions, params = "", []
+    if after is not None:
+        rank, rowid = decode_cursor(after)
+        conditions = " AND (s.rank > ? OR (s.rank = ? AND s.rowid > ?))"
+        params = [rank, rank, rowid]
+
+    sql = f"""
+        SELECT s.rowid, s.rank, d.path, d.type, d.title,
+               snippet(search_index, 1, ?, ?, '...', 32) as snippet
+        FROM search_index s
+        JOIN documents d ON d.id = s.rowid
+        WHERE search_index MATCH ?{conditions}
+        ORDER BY s.rank, s.rowid
+        LIMIT ?
+    """
+    try:
+        rows = conn.execute(sql, [*marks, match_expression(query, types), *params, limit + 1]).fetchall()
+    except sqlite3.OperationalError:
+        rows = conn.execute(sql, [*marks, match_expression(query, types, literal=True),
+                                  *params, limit + 1]).fetchall()
+
+    page = [{"rowid": r[0], "path": r[2], "type": r[3], "title": r[4], "snippet": r[5]}
+            for r in rows[:limit]]
+    cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+    return page, cursor
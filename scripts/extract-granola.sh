@@ -8,6 +8,7 @@
 #
 # Output: JSON array of meetings with title, time, attendees, transcript availability
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 CACHE_PATH="${GRANOLA_CACHE_PATH:-$HOME/Library/Application Support/Granola/cache-v3.json}"
 TARGET_DATE="${1:-$(date +%Y-%m-%d)}"
 
@@ -19,22 +20,11 @@ fi
 
 if [ "$1" == "--list-dates" ]; then
     python3 -c "
-import json
 import sys
-from collections import Counter
-
-with open('$CACHE_PATH', 'r') as f:
-    data = json.load(f)
-
-cache = json.loads(data['cache'])
-documents = cache['state'].get('documents', {})
-
-dates = Counter()
-for doc in documents.values():
-    created = doc.get('created_at', '')[:10]
-    if created:
-        dates[created] += 1
+sys.path.insert(0, '$SCRIPT_DIR')
+import granola_cache
 
+dates = granola_cache.count_dates('$CACHE_PATH')
 for date in sorted(dates.keys(), reverse=True):
     print(f'{date}: {dates[date]} meetings')
 "
@@ -44,34 +34,23 @@ fi
 python3 -c "
 import json
 import sys
-from datetime import datetime
-
-with open('$CACHE_PATH', 'r') as f:
-    data = json.load(f)
-
-cache = json.loads(data['cache'])
-state = cache['state']
-documents = state.get('documents', {})
-transcripts = state.get('transcripts', {})
+sys.path.insert(0, '$SCRIPT_DIR')
+import granola_cache
 
+cache_path = '$CACHE_PATH'
 target_date = '$TARGET_DATE'
+
+# Only the day's documents are decoded, and only their transcripts read
+documents = granola_cache.load_documents(cache_path, target_date)
+transcripts = granola_cache.load_transcripts(cache_path, documents)
 meetings = []
 
 for doc_id, doc in documents.items():
-    created = doc.get('created_at', '')[:10]
-    if created != target_date:
-        continue
-
     cal = doc.get('google_calendar_event') or {}
     start_obj = cal.get('start') or {}
     start = start_obj.get('dateTime', '')
 
-    attendees = []
-    for a in (cal.get('attendees') or []):
-        email = a.get('email', '')
-        name = a.get('displayName', email.split('@')[0] if email else '')
-        if email and not a.get('self'):
-            attendees.append({'email': email, 'name': name})
+    attendees = granola_cache.calendar_attendees(doc)
 
     trans = transcripts.get(doc_id) or []
     has_transcript = len(trans) > 0
@@ -5,6 +5,11 @@ Reads today's calendar from Granola cache (or inbox/calendar/),
 cross-references people files, threads, and commitments,
 and writes a prep markdown file for each upcoming meeting.
 
+Thread matching reads .brain.db when the index is current for threads/
+(see open_thread_index); otherwise every thread file is scanned. Attendees
+are resolved to people files the same way: .brain.db's person_aliases when
+current for people/, else aliases derived from the files (person_aliases.py).
+
 Usage:
     python3 scripts/generate-prep.py <brain-root> [--date YYYY-MM-DD] [--hours-ahead N]
 
@@ -15,10 +20,21 @@ Output:
 import json
 import os
 import re
+import sqlite3
 import sys
 from datetime import datetime, timedelta, timezone
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import granola_cache
+import person_aliases
+import snapshot_store
+
+# search_index has the type column from here on (see MIGRATIONS in indexer.py)
+INDEX_SCHEMA_VERSION = 8
+# ...and person_aliases from here
+ALIAS_SCHEMA_VERSION = 9
 
 
 def load_granola_meetings(cache_path: str, target_date: str) -> List[dict]:
@@ -26,78 +42,79 @@ def load_granola_meetings(cache_path: str, target_date: str) -> List[dict]:
     if not os.path.exists(cache_path):
         return []
 
-    with open(cache_path, 'r') as f:
-        data = json.load(f)
-
-    cache = json.loads(data['cache'])
-    state = cache['state']
-    documents = state.get('documents', {})
-
     meetings = []
-    for doc_id, doc in documents.items():
-        created = doc.get('created_at', '')[:10]
-        if created != target_date:
-            continue
-
-        cal = doc.get('google_calendar_event') or {}
-        start_obj = cal.get('start') or {}
-        start = start_obj.get('dateTime', '')
-
-        attendees = []
-        for a in (cal.get('attendees') or []):
-            email = a.get('email', '')
-            name = a.get('displayName', email.split('@')[0] if email else '')
-            if email and not a.get('self'):
-                attendees.append({'email': email, 'name': name})
+    try:
+        for doc_id, doc in granola_cache.iter_documents(cache_path, target_date):
+            cal = doc.get('google_calendar_event') or {}
+            start_obj = cal.get('start') or {}
+            start = start_obj.get('dateTime', '')
 
-        meetings.append({
-            'id': doc_id,
-            'title': cal.get('summary', doc.get('title', 'Untitled')),
-            'start': start,
-            'attendees': attendees,
-        })
+            meetings.append({
+                'id': doc_id,
+                'title': cal.get('summary', doc.get('title', 'Untitled')),
+                'start': start,
+                'attendees': granola_cache.calendar_attendees(doc),
+            })
+    except ValueError as e:
+        # Mid-write or corrupt: fall back to the inbox snapshots
+        print(f"Warning: could not read Granola cache: {e}", file=sys.stderr)
+        return []
 
     meetings.sort(key=lambda x: x.get('start', ''))
     return meetings
 
 
+def inbox_meeting(doc: dict, fallback_id: str) -> dict:
+    """A meeting from an inbox snapshot, or from a raw Granola document."""
+    cal = doc.get('google_calendar_event')
+    if cal is None:
+        return {
+            'id': doc.get('id', fallback_id),
+            'title': doc.get('title') or 'Untitled',
+            'start': doc.get('start') or '',
+            'attendees': doc.get('attendees') or [],
+        }
+    return {
+        'id': doc.get('id', fallback_id),
+        'title': cal.get('summary', doc.get('title', 'Untitled')),
+        'start': (cal.get('start') or {}).get('dateTime', ''),
+        'attendees': granola_cache.calendar_attendees(doc),
+    }
+
+
 def load_inbox_meetings(inbox_path: str, target_date: str) -> List[dict]:
-    """Load meetings from inbox snapshots as fallback."""
+    """Load meetings from inbox snapshots as fallback.
+
+    snapshot-transcripts.sh files each meeting under the day it was created,
+    so only that day is read: inbox/granola/<date>/*.json, and the day's
+    rows of snapshots.db if there is one.
+    """
     granola_dir = os.path.join(inbox_path, 'granola')
-    if not os.path.isdir(granola_dir):
+    if not os.path.isdir(granola_dir) or not re.fullmatch(r'\d{4}-\d{2}-\d{2}', target_date):
         return []
 
     meetings = []
-    for fname in os.listdir(granola_dir):
-        if not fname.endswith('.json'):
-            continue
-        fpath = os.path.join(granola_dir, fname)
-        try:
-            with open(fpath, 'r') as f:
-                doc = json.load(f)
-            created = doc.get('created_at', '')[:10]
-            if created != target_date:
+    date_dir = os.path.join(granola_dir, target_date)
+    if os.path.isdir(date_dir):
+        for fname in os.listdir(date_dir):
+            if not fname.endswith('.json'):
                 continue
+            try:
+                with open(os.path.join(date_dir, fname), 'r') as f:
+                    doc = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if isinstance(doc, dict):
+                meetings.append(inbox_meeting(doc, fname))
 
-            cal = doc.get('google_calendar_event') or {}
-            start_obj = cal.get('start') or {}
-            start = start_obj.get('dateTime', '')
-
-            attendees = []
-            for a in (cal.get('attendees') or []):
-                email = a.get('email', '')
-                name = a.get('displayName', email.split('@')[0] if email else '')
-                if email and not a.get('self'):
-                    attendees.append({'email': email, 'name': name})
-
-            meetings.append({
-                'id': doc.get('id', fname),
-                'title': cal.get('summary', doc.get('title', 'Untitled')),
-                'start': start,
-                'attendees': attendees,
-            })
-        except (json.JSONDecodeError, KeyError):
-            continue
+    # Snapshots kept in the compressed store: only that day's rows are read
+    store = snapshot_store.open_store(granola_dir)
+    if store:
+        try:
+            for relpath, snap in snapshot_store.iter_snapshots(store, target_date):
+                meetings.append(inbox_meeting(snap, relpath))
+        finally:
+            store.close()
 
     meetings.sort(key=lambda x: x.get('start', ''))
     return meetings
@@ -111,51 +128,25 @@ def slugify(text: str) -> str:
     return slug[:60]
 
 
-def find_people_files(brain_root: str) -> Dict[str, str]:
-    """Build a lookup from name fragments to people file paths."""
-    people_dir = os.path.join(brain_root, 'people')
-    if not os.path.isdir(people_dir):
-        return {}
+def find_people_files(brain_root: str) -> person_aliases.AliasIndex:
+    """Build the attendee alias lookup from the people files themselves."""
+    return person_aliases.AliasIndex.from_files(os.path.join(brain_root, 'people'))
 
-    people = {}
-    for fname in os.listdir(people_dir):
-        if not fname.endswith('.md'):
-            continue
-        slug = fname.replace('.md', '')
-        # Index by full slug and each part of the name
-        people[slug] = os.path.join(people_dir, fname)
-        for part in slug.split('-'):
-            if len(part) > 2:  # skip initials
-                people[part] = os.path.join(people_dir, fname)
-
-    return people
-
-
-def match_attendee_to_person(attendee: dict, people_lookup: Dict[str, str]) -> Optional[str]:
-    """Try to match an attendee to a people file."""
-    name = attendee.get('name', '').lower().strip()
-    email = attendee.get('email', '').lower()
-
-    # Try full name as slug
-    slug = re.sub(r'[^a-z0-9\s]', '', name)
-    slug = re.sub(r'\s+', '-', slug).strip('-')
-    if slug in people_lookup:
-        return people_lookup[slug]
-
-    # Try first name
-    first = name.split()[0] if name else email.split('@')[0]
-    first = re.sub(r'[^a-z]', '', first)
-    if first in people_lookup:
-        return people_lookup[first]
-
-    # Try last name
-    parts = name.split()
-    if len(parts) > 1:
-        last = re.sub(r'[^a-z]', '', parts[-1])
-        if last in people_lookup:
-            return people_lookup[last]
 
-    return None
+def load_people(brain_root: str) -> person_aliases.AliasIndex:
+    """The attendee alias lookup: .brain.db's person_aliases when current for people/."""
+    conn = open_index(brain_root, 'people', ALIAS_SCHEMA_VERSION)
+    if conn is None:
+        return find_people_files(brain_root)
+    try:
+        return person_aliases.AliasIndex.from_db(conn, os.path.join(brain_root, 'people'))
+    finally:
+        conn.close()
+
+
+def match_attendee_to_person(attendee: dict, people_lookup: person_aliases.AliasIndex) -> Optional[str]:
+    """Try to match an attendee to a people file: by email, full name, then first or last name."""
+    return people_lookup.resolve(attendee)
 
 
 def read_file_content(path: str) -> str:
@@ -185,118 +176,316 @@ def expand_name_variants(names: List[str]) -> Dict[str, str]:
     return variants
 
 
-def find_relevant_threads(brain_root: str, attendee_names: List[str]) -> List[dict]:
-    """Find threads that mention any of the attendees."""
-    threads_dir = os.path.join(brain_root, 'threads')
-    if not os.path.isdir(threads_dir):
-        return []
+def open_index(brain_root: str, subdir: str, min_version: int) -> Optional[sqlite3.Connection]:
+    """Open .brain.db read-only, or None if it can't stand in for reading `subdir`.
 
-    name_variants = expand_name_variants(attendee_names)
+    The index is used only when it is at least `min_version` and holds
+    exactly the <subdir>/*.md files on disk, each with the (mtime_ns, size,
+    inode) the indexer recorded for it, so what it derived from them is what
+    reading them would give.
+    """
+    db_path = os.path.join(brain_root, '.brain.db')
+    dir_path = os.path.join(brain_root, subdir)
+    if not os.path.exists(db_path) or not os.path.isdir(dir_path):
+        return None
 
-    relevant = []
-    for fname in os.listdir(threads_dir):
-        if not fname.endswith('.md'):
-            continue
-        content = read_file_content(os.path.join(threads_dir, fname))
-        content_lower = content.lower()
-
-        # Check if any attendee name variant appears in the thread
-        matched_names = set()
-        for variant, display_name in name_variants.items():
-            if len(variant) > 2 and re.search(r'\b' + re.escape(variant) + r'\b', content_lower):
-                matched_names.add(display_name)
-
-        if matched_names:
-            # Extract status if present
-            status_match = re.search(r'\*\*Status\*\*:\s*(.+)', content)
-            status = status_match.group(1).strip() if status_match else 'unknown'
-
-            relevant.append({
-                'name': fname.replace('.md', ''),
+    on_disk = {}
+    for entry in os.scandir(dir_path):
+        if entry.name.endswith('.md') and entry.is_file():
+            st = entry.stat()
+            on_disk[f"{subdir}/{entry.name}"] = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    try:
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        row = conn.execute("SELECT value FROM indexer_meta WHERE key = 'schema_version'").fetchone()
+        if row and int(row[0]) >= min_version:
+            indexed = {path: (mtime_ns, size, inode) for path, mtime_ns, size, inode in conn.execute(
+                "SELECT path, mtime_ns, size, inode FROM documents "
+                "WHERE path LIKE ? AND path NOT LIKE ?", (f"{subdir}/%", f"{subdir}/%/%")
+            )}
+            if indexed == on_disk:
+                return conn
+    except (sqlite3.Error, ValueError):
+        pass
+    conn.close()
+    return None
+
+
+def open_thread_index(brain_root: str) -> Optional[sqlite3.Connection]:
+    """Open .brain.db for thread lookups, or None if it can't stand in for a scan."""
+    return open_index(brain_root, 'threads', INDEX_SCHEMA_VERSION)
+
+
+def trie_pattern(words) -> str:
+    """A regex matching any of `words`, sharing common prefixes.
+
+    At a given position the longest of the words that match there wins,
+    since every optional tail is tried before stopping short.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def is_word_boundary(text: str, i: int) -> bool:
+    """Whether r'\b' matches at position i of text."""
+    before = i > 0 and (text[i - 1].isalnum() or text[i - 1] == '_')
+    after = i < len(text) and (text[i].isalnum() or text[i] == '_')
+    return before != after
+
+
+class NameMatcher:
+    """The name variants of every meeting's attendees, found in one pass.
+
+    Built once per run from {meeting key: attendee names}. matches() reads a
+    text once, whatever the number of meetings and attendees, and reports
+    for each meeting which of its attendees appear. As with a per-meeting
+    expand_name_variants(), variants of two characters or fewer never match.
+    """
+
+    def __init__(self, names_by_meeting: Dict[Hashable, List[str]]):
+        self.owners: Dict[str, List[Tuple[Hashable, str]]] = {}
+        for key, names in names_by_meeting.items():
+            for variant, display_name in expand_name_variants(names).items():
+                if len(variant) > 2:
+                    self.owners.setdefault(variant, []).append((key, display_name))
+        # Every variant matching at a position is a prefix of the longest one
+        self.prefixes = {v: [p for p in self.owners if v.startswith(p)] for v in self.owners}
+        self.pattern = re.compile('(?=(' + trie_pattern(self.owners) + '))') if self.owners else None
+
+    def variants(self) -> List[str]:
+        return list(self.owners)
+
+    def matches(self, text: str, whole_words: bool = True) -> Dict[Hashable, Set[str]]:
+        """{meeting key: attendee names} for the variants found in lowercased `text`.
+
+        With whole_words, a variant only counts between word boundaries
+        (r'\bvariant\b'); otherwise any substring occurrence counts.
+        """
+        found: Set[str] = set()
+        if self.pattern is not None:
+            for m in self.pattern.finditer(text):
+                start = m.start()
+                for variant in self.prefixes[m.group(1)]:
+                    if variant in found:
+                        continue
+                    if whole_words and not (is_word_boundary(text, start)
+                                            and is_word_boundary(text, start + len(variant))):
+                        continue
+                    found.add(variant)
+
+        hits: Dict[Hashable, Set[str]] = {}
+        for variant in found:
+            for key, display_name in self.owners[variant]:
+                hits.setdefault(key, set()).add(display_name)
+        return hits
+
+
+class PrepCorpus:
+    """The brain files prep packets draw on, read and parsed once per run.
+
+    Every meeting of the day is prepared from one corpus, so no file is read
+    twice however many meetings need it. Each part loads on first use; with
+    `index` (from open_thread_index) thread files are not read at all.
+    """
+
+    def __init__(self, brain_root: str, index: Optional[sqlite3.Connection] = None):
+        self.brain_root = brain_root
+        self.index = index
+        self.people: Dict[str, dict] = {}
+
+    @cached_property
+    def threads(self) -> List[Tuple[str, str, str]]:
+        """(path, lowercased content, status) for every file in threads/."""
+        threads_dir = os.path.join(self.brain_root, 'threads')
+        if not os.path.isdir(threads_dir):
+            return []
+        return [
+            parse_thread(os.path.join(threads_dir, fname), read_file_content(os.path.join(threads_dir, fname)))
+            for fname in os.listdir(threads_dir) if fname.endswith('.md')
+        ]
+
+    def threads_naming(self, matcher: 'NameMatcher') -> List[Tuple[str, str, str]]:
+        """The threads that could mention one of the matcher's names.
+
+        The index narrows them with one FTS query; without it, all of them.
+        """
+        if self.index is None:
+            return self.threads
+        phrases = ['"' + v.replace('"', '""') + '"' for v in matcher.variants()]
+        if not phrases or not os.path.isdir(os.path.join(self.brain_root, 'threads')):
+            return []
+        # CROSS JOIN keeps the FTS match as the outer loop
+        rows = self.index.execute("""
+            SELECT d.path, d.content FROM search_index s
+            CROSS JOIN documents d ON d.id = s.rowid
+            WHERE search_index MATCH ? AND d.path NOT LIKE 'threads/%/%'
+            ORDER BY d.path
+        """, (f"content : ({' OR '.join(phrases)}) AND type : thread",)).fetchall()
+        return [parse_thread(os.path.join(self.brain_root, path), content or '') for path, content in rows]
+
+    @cached_property
+    def active_commitments(self) -> List[str]:
+        """The open ('- [ ]') lines of the Active section of commitments.md."""
+        content = read_file_content(os.path.join(self.brain_root, 'commitments.md'))
+
+        # Extract active section
+        active_match = re.search(r'## Active\n(.*?)(?=\n## |\Z)', content, re.DOTALL)
+        if not active_match:
+            return []
+        return [line for line in active_match.group(1).strip().split('\n') if line.startswith('- [ ]')]
+
+    @cached_property
+    def handoff_sections(self) -> List[Tuple[str, str]]:
+        """(header, lowercased text) of the latest handoff.md entries."""
+        content = read_file_content(os.path.join(self.brain_root, 'handoff.md'))
+
+        # Split into date sections
+        sections = re.split(r'^## ', content, flags=re.MULTILINE)[1:]
+        return [(section.split('\n')[0].strip(), section.lower())
+                for section in sections[:5]]  # only check last 5 entries
+
+    def person(self, path: str) -> dict:
+        """Role, focus and most recent note from a people file, read once."""
+        if path not in self.people:
+            content = read_file_content(path)
+            # Extract key sections (role, current focus, etc.)
+            role_match = re.search(r'\*\*Role\*\*:\s*(.+)', content)
+            focus_match = re.search(r'\*\*(?:Current )?Focus\*\*:\s*(.+)', content, re.IGNORECASE)
+            # Extract recent context (last few bullet points from the person file)
+            bullets = re.findall(r'^- .+', content, re.MULTILINE)
+            self.people[path] = {
+                'role': role_match.group(1).strip() if role_match else None,
+                'focus': focus_match.group(1).strip() if focus_match else None,
+                'recent': bullets[-1].replace('- ', '') if bullets else None,
+            }
+        return self.people[path]
+
+
+def parse_thread(path: str, content: str) -> Tuple[str, str, str]:
+    """(path, lowercased content, status) for a thread file."""
+    # Extract status if present
+    status_match = re.search(r'\*\*Status\*\*:\s*(.+)', content)
+    status = status_match.group(1).strip() if status_match else 'unknown'
+    return path, content.lower(), status
+
+
+def threads_by_meeting(corpus: PrepCorpus, matcher: NameMatcher) -> Dict[Hashable, List[dict]]:
+    """Threads mentioning each meeting's attendees, matching each thread once."""
+    relevant: Dict[Hashable, List[dict]] = {}
+    for path, content_lower, status in corpus.threads_naming(matcher):
+        for key, matched_names in matcher.matches(content_lower).items():
+            relevant.setdefault(key, []).append({
+                'name': os.path.basename(path).replace('.md', ''),
                 'status': status,
                 'matched_people': list(matched_names),
-                'path': os.path.join(threads_dir, fname),
+                'path': path,
             })
-
     return relevant
 
 
-def find_relevant_commitments(brain_root: str, attendee_names: List[str]) -> List[str]:
-    """Find active commitments that mention any attendee."""
-    commitments_path = os.path.join(brain_root, 'commitments.md')
-    content = read_file_content(commitments_path)
-    if not content:
-        return []
+def find_relevant_threads(brain_root: str, attendee_names: List[str],
+                          index: Optional[sqlite3.Connection] = None) -> List[dict]:
+    """Find threads that mention any of the attendees."""
+    return threads_by_meeting(PrepCorpus(brain_root, index), NameMatcher({0: attendee_names})).get(0, [])
 
-    # Extract active section
-    active_match = re.search(r'## Active\n(.*?)(?=\n## |\Z)', content, re.DOTALL)
-    if not active_match:
-        return []
 
-    name_variants = expand_name_variants(attendee_names)
-    active_lines = active_match.group(1).strip().split('\n')
-    relevant = []
+def commitments_by_meeting(corpus: PrepCorpus, matcher: NameMatcher) -> Dict[Hashable, List[str]]:
+    """Active commitments mentioning each meeting's attendees."""
+    relevant: Dict[Hashable, List[str]] = {}
+    for line in corpus.active_commitments:
+        for key in matcher.matches(line.lower(), whole_words=False):
+            relevant.setdefault(key, []).append(line.replace('- [ ] ', ''))
+    return relevant
 
-    for line in active_lines:
-        if not line.startswith('- [ ]'):
-            continue
-        line_lower = line.lower()
-        for variant in name_variants:
-            if len(variant) > 2 and variant in line_lower:
-                relevant.append(line.replace('- [ ] ', ''))
-                break
 
-    return relevant
+def find_relevant_commitments(brain_root: str, attendee_names: List[str]) -> List[str]:
+    """Find active commitments that mention any attendee."""
+    return commitments_by_meeting(PrepCorpus(brain_root), NameMatcher({0: attendee_names})).get(0, [])
+
+
+def handoff_mentions_by_meeting(corpus: PrepCorpus, matcher: NameMatcher,
+                                limit: int = 3) -> Dict[Hashable, List[str]]:
+    """Recent handoff entries mentioning each meeting's attendees, `limit` per meeting."""
+    mentions: Dict[Hashable, List[str]] = {}
+    for header, section_lower in corpus.handoff_sections:
+        for key in matcher.matches(section_lower, whole_words=False):
+            found = mentions.setdefault(key, [])
+            if len(found) < limit:
+                found.append(header)
+    return mentions
 
 
 def find_recent_handoff_mentions(brain_root: str, attendee_names: List[str], limit: int = 3) -> List[str]:
     """Find recent handoff entries that mention attendees."""
-    handoff_path = os.path.join(brain_root, 'handoff.md')
-    content = read_file_content(handoff_path)
-    if not content:
-        return []
-
-    name_variants = expand_name_variants(attendee_names)
+    return handoff_mentions_by_meeting(PrepCorpus(brain_root), NameMatcher({0: attendee_names}), limit).get(0, [])
 
-    # Split into date sections
-    sections = re.split(r'^## ', content, flags=re.MULTILINE)[1:]
-    mentions = []
 
-    for section in sections[:5]:  # only check last 5 entries
-        section_lower = section.lower()
-        for variant in name_variants:
-            if len(variant) > 2 and variant in section_lower:
-                header = section.split('\n')[0].strip()
-                mentions.append(header)
-                break
-        if len(mentions) >= limit:
-            break
-
-    return mentions
+def infer_attendees_from_title(title: str, people_lookup: person_aliases.AliasIndex) -> List[dict]:
+    """Try to match known people names in the meeting title."""
+    return people_lookup.in_title(title)
 
 
-def infer_attendees_from_title(title: str, people_lookup: Dict[str, str]) -> List[dict]:
-    """Try to match known people names in the meeting title."""
-    title_lower = title.lower()
-    matched = []
-    seen_paths = set()
-    for key, path in people_lookup.items():
-        if len(key) > 2 and key in title_lower and path not in seen_paths:
-            name = os.path.basename(path).replace('.md', '').replace('-', ' ').title()
-            matched.append({'name': name, 'email': '', '_inferred': True})
-            seen_paths.add(path)
-    return matched
-
-
-def generate_prep(meeting: dict, brain_root: str, people_lookup: Dict[str, str]) -> str:
-    """Generate a prep packet for a single meeting."""
-    title = meeting['title']
-    start = meeting.get('start', '')
+def meeting_attendees(meeting: dict, people_lookup: person_aliases.AliasIndex) -> List[dict]:
+    """The meeting's attendees, inferred from its title if the calendar lists none."""
     attendees = meeting.get('attendees', [])
-
-    # If no attendees from calendar, try to infer from title
     if not attendees:
-        attendees = infer_attendees_from_title(title, people_lookup)
+        attendees = infer_attendees_from_title(meeting['title'], people_lookup)
+    return attendees
+
+
+def attendee_name(attendee: dict) -> str:
+    return attendee.get('name', attendee.get('email', 'Unknown'))
+
+
+def find_related(corpus: PrepCorpus, names_by_meeting: Dict[Hashable, List[str]]) -> Dict[Hashable, dict]:
+    """Threads, commitments and handoff mentions for each meeting's attendees.
+
+    One NameMatcher covers every meeting, so each source is scanned once
+    for the whole day rather than once per meeting.
+    """
+    matcher = NameMatcher(names_by_meeting)
+    threads = threads_by_meeting(corpus, matcher)
+    commitments = commitments_by_meeting(corpus, matcher)
+    mentions = handoff_mentions_by_meeting(corpus, matcher)
+    return {
+        key: {
+            'threads': threads.get(key, []),
+            'commitments': commitments.get(key, []),
+            'mentions': mentions.get(key, []),
+        }
+        for key in names_by_meeting
+    }
+
+
+def generate_prep(meeting: dict, brain_root: str, people_lookup: person_aliases.AliasIndex,
+                  corpus: Optional[PrepCorpus] = None,
+                  related: Optional[dict] = None) -> str:
+    """Generate a prep packet for a single meeting.
+
+    `corpus` is the run's PrepCorpus and `related` this meeting's entry from
+    find_related(); without them the brain is read for this meeting alone.
+    """
+    if corpus is None:
+        corpus = PrepCorpus(brain_root)
+    title = meeting['title']
+    start = meeting.get('start', '')
+    attendees = meeting_attendees(meeting, people_lookup)
 
     # Format time
     time_str = ''
@@ -327,35 +516,36 @@ def generate_prep(meeting: dict, brain_root: str, people_lookup: Dict[str, str])
         lines.append("")
     else:
         for attendee in attendees:
-            name = attendee.get('name', attendee.get('email', 'Unknown'))
+            name = attendee_name(attendee)
             attendee_names.append(name)
             person_path = match_attendee_to_person(attendee, people_lookup)
 
             if person_path:
-                person_content = read_file_content(person_path)
-                # Extract key sections (role, current focus, etc.)
-                role_match = re.search(r'\*\*Role\*\*:\s*(.+)', person_content)
-                focus_match = re.search(r'\*\*(?:Current )?Focus\*\*:\s*(.+)', person_content, re.IGNORECASE)
+                person = corpus.person(person_path)
 
                 slug = os.path.basename(person_path).replace('.md', '')
                 lines.append(f"### {name} → [[{slug}]]")
-                if role_match:
-                    lines.append(f"- Role: {role_match.group(1).strip()}")
-                if focus_match:
-                    lines.append(f"- Focus: {focus_match.group(1).strip()}")
-
-                # Extract recent context (last few bullet points from the person file)
-                bullets = re.findall(r'^- .+', person_content, re.MULTILINE)
-                if bullets:
-                    lines.append(f"- Recent notes: {bullets[-1].replace('- ', '')}")
+                if person['role']:
+                    lines.append(f"- Role: {person['role']}")
+                if person['focus']:
+                    lines.append(f"- Focus: {person['focus']}")
+                if person['recent']:
+                    lines.append(f"- Recent notes: {person['recent']}")
             else:
                 lines.append(f"### {name}")
-                lines.append(f"- _No people file found_")
+                candidates = people_lookup.candidates(attendee)
+                if candidates:
+                    lines.append(f"- _Ambiguous: could be {', '.join(f'[[{c}]]' for c in candidates)}_")
+                else:
+                    lines.append(f"- _No people file found_")
 
             lines.append("")
 
+    if related is None:
+        related = find_related(corpus, {0: attendee_names})[0]
+
     # Relevant threads
-    threads = find_relevant_threads(brain_root, attendee_names)
+    threads = related['threads']
     if threads:
         lines.append("## Relevant Threads")
         lines.append("")
@@ -365,7 +555,7 @@ def generate_prep(meeting: dict, brain_root: str, people_lookup: Dict[str, str])
         lines.append("")
 
     # Open commitments
-    commitments = find_relevant_commitments(brain_root, attendee_names)
+    commitments = related['commitments']
     if commitments:
         lines.append("## Open Commitments")
         lines.append("")
@@ -374,7 +564,7 @@ def generate_prep(meeting: dict, brain_root: str, people_lookup: Dict[str, str])
         lines.append("")
 
     # Recent handoff mentions
-    mentions = find_recent_handoff_mentions(brain_root, attendee_names)
+    mentions = related['mentions']
     if mentions:
         lines.append("## Recent Context")
         lines.append("")
@@ -409,7 +599,7 @@ def main():
 
     # Load config to find cache path
     config_path = os.path.join(brain_root, 'config.md')
-    cache_path = os.path.expanduser('~/Library/Application Support/Granola/cache-v3.json')
+    cache_path = granola_cache.DEFAULT_CACHE_PATH
     if os.path.exists(config_path):
         config = read_file_content(config_path)
         cache_match = re.search(r'Cache path:\s*`([^`]+)`', config)
@@ -447,19 +637,29 @@ def main():
         sys.exit(0)
 
     # Build people lookup
-    people_lookup = find_people_files(brain_root)
+    people_lookup = load_people(brain_root)
+
+    # One freshness check per run; a missing or stale index means scanning
+    index = open_thread_index(brain_root)
+    corpus = PrepCorpus(brain_root, index)
+
+    # Match every meeting's attendees in a single pass over each source
+    related = find_related(corpus, {
+        i: [attendee_name(a) for a in meeting_attendees(meeting, people_lookup)]
+        for i, meeting in enumerate(upcoming)
+    })
 
     # Generate prep for each meeting
     prep_dir = os.path.join(brain_root, 'inbox', 'prep')
     os.makedirs(prep_dir, exist_ok=True)
 
     generated = []
-    for meeting in upcoming:
+    for i, meeting in enumerate(upcoming):
         slug = slugify(meeting['title'])
         filename = f"{target_date}-{slug}.md"
         filepath = os.path.join(prep_dir, filename)
 
-        prep_content = generate_prep(meeting, brain_root, people_lookup)
+        prep_content = generate_prep(meeting, brain_root, people_lookup, corpus, related[i])
 
         with open(filepath, 'w') as f:
             f.write(prep_content)
@@ -467,6 +667,12 @@ def main():
         generated.append(filename)
         print(f"Generated: {filename}")
 
+    if index is not None:
+        index.close()
+
+    for alias, slugs in sorted(people_lookup.ambiguous.items()):
+        print(f"Ambiguous attendee alias '{alias}': {', '.join(slugs)} (not matched)")
+
     print(f"\n{len(generated)} prep packet(s) in {prep_dir}")
 
 
@@ -0,0 +1,335 @@
+"""
+granola_cache.py - Streaming reader for Granola's cache-v3.json.
+
+The one reader for the Granola cache: generate-prep.py, extract-granola.sh
+and snapshot-transcripts.sh all use it.
+
+The cache is {"cache": "<JSON text>"}: the app state is itself JSON,
+stored as a string, and most of it is transcripts. json.load() of the file
+and json.loads() of that string would hold both copies in memory at once.
+Instead the file is read in chunks, the string is unescaped as it streams
+past, and only the parts asked for are decoded: state.documents entries for
+the requested date (an entry that doesn't contain the date string is never
+decoded), then, in a second pass and only if asked, state.transcripts for
+the given document IDs, one at a time. Everything else is skipped without being built.
+A cache whose "cache" value is already an object is read the same way.
+
+Usage (as a library):
+    docs = granola_cache.load_documents(path, "2026-02-15")
+    transcripts = granola_cache.load_transcripts(path, docs)
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/Library/Application Support/Granola/cache-v3.json")
+CHUNK_SIZE = 1 << 20
+
+CACHE_KEY = re.compile(r'"cache"\s*:\s*')
+HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}')
+# Inside a value being skipped: a whole string, a bracket, or the start of
+# a string that runs past the end of the buffer
+SKIP_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"')
+SCALAR_END = re.compile(r'[\s,\]}]')
+WHITESPACE = re.compile(r'\s*')
+DECODER = json.JSONDecoder()
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def backslashes_before(text: str, i: int) -> int:
+    """How many backslashes run up to (not including) position i."""
+    j = i
+    while j > 0 and text[j - 1] == "\\":
+        j -= 1
+    return i - j
+
+
+def safe_cut(text: str) -> int:
+    """A point near the end of a string body that splits no escape.
+
+    Leaves at least the last 12 characters, so that a \\u escape, or a
+    surrogate pair of them, is never cut in two.
+    """
+    cut = len(text) - 12
+    if cut <= 0:
+        return 0
+    # Only an escape starting in the last five characters can run past cut
+    b = text.rfind("\\", max(cut - 5, 0), cut)
+    if b >= 0 and backslashes_before(text, b) % 2 == 0:
+        length = 6 if text[b + 1] == "u" else 2
+        if b + length > cut:
+            cut = b
+    if (cut >= 6 and HIGH_SURROGATE.fullmatch(text, cut - 6, cut)
+            and backslashes_before(text, cut - 6) % 2 == 0):
+        cut -= 6
+    return cut
+
+
+def unescape_string(chunks: Iterator[str], pending: str) -> Iterator[str]:
+    """Decode a JSON string body arriving in chunks, one piece at a time.
+
+    `pending` is whatever of the body has already been read. Each piece is
+    decoded by the json module; stops at the closing quote and raises
+    ValueError if the file ends first.
+    """
+    for chunk in chunks:
+        pending += chunk
+        cut = safe_cut(pending)
+        text, end = DECODER.raw_decode('"' + pending[:cut] + '"')
+        yield text
+        if end < cut + 2:
+            return
+        pending = pending[cut:]
+    text, end = DECODER.raw_decode('"' + pending + '"')
+    if end == len(pending) + 2:
+        raise ValueError("Granola cache ends inside the cache string")
+    yield text
+
+
+def state_text(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """The app state's JSON text, in pieces, without holding all of it."""
+    chunks = read_chunks(path, chunk_size)
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        match = CACHE_KEY.search(buffer)
+        if match and match.end() < len(buffer):
+            break
+        buffer = buffer[-64:]
+    else:
+        raise ValueError("no cache key in Granola cache")
+
+    rest = buffer[match.end():]
+    if rest[0] == '"':
+        yield from unescape_string(chunks, rest[1:])
+    else:
+        # Already an object: the file itself is the state's text
+        yield rest
+        yield from chunks
+
+
+class TextStream:
+    """A forward-only cursor over JSON text that arrives in pieces."""
+
+    def __init__(self, pieces: Iterator[str]):
+        self.pieces = pieces
+        self.buffer = ""
+        self.pos = 0
+
+    def more(self, keep: Optional[int] = None) -> bool:
+        """Append the next piece, discarding what's before `keep` (or pos)."""
+        piece = next(self.pieces, None)
+        if piece is None:
+            return False
+        start = self.pos if keep is None else keep
+        self.buffer = self.buffer[start:] + piece
+        self.pos -= start
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or '' at the end."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in Granola cache")
+        self.pos += 1
+
+    def scan_value(self, keep: bool) -> int:
+        """Step over the next value; returns where it started in the buffer.
+
+        With `keep`, nothing from the value's start on is discarded, so
+        buffer[start:pos] is the value's text afterwards.
+        """
+        first = self.peek()
+        start = self.pos
+        if first not in '"[{':
+            while True:
+                match = SCALAR_END.search(self.buffer, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return start
+                self.pos = len(self.buffer)
+                if not self.more(keep=start if keep else None):
+                    return start
+                start = 0 if keep else self.pos
+        depth = 0
+        while True:
+            match = SKIP_TOKEN.search(self.buffer, self.pos)
+            token = match.group(0) if match else '"'
+            if token == '"':
+                # A string that runs past the buffer, or nothing more here
+                self.pos = match.start() if match else len(self.buffer)
+                if not self.more(keep=start if keep else None):
+                    raise ValueError("Granola cache ends inside a value")
+                start = 0 if keep else self.pos
+                continue
+            self.pos = match.end()
+            if token in "[{":
+                depth += 1
+            elif token in "]}":
+                depth -= 1
+            if depth == 0:
+                return start
+
+    def read_value(self) -> str:
+        """The next value's JSON text, without decoding it."""
+        start = self.scan_value(keep=True)
+        return self.buffer[start:self.pos]
+
+    def decode_value(self):
+        """The next value, decoded."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            # A number cut by the end of the buffer may go on in the next
+            # piece: "12." decodes as 12, so unless a delimiter follows it
+            # there may be more of it to read
+            if (not isinstance(value, (str, list, dict))
+                    and not SCALAR_END.match(self.buffer, end) and self.more()):
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """Step over the next value, decoding at most one child at a time."""
+        first = self.peek()
+        if first == "{":
+            for _ in self.entries():
+                self.decode_value()
+        elif first == "[":
+            for _ in self.elements():
+                self.decode_value()
+        else:
+            self.decode_value()
+
+    def entries(self) -> Iterator[str]:
+        """Keys of the object starting here; consume each value before the next key."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def elements(self) -> Iterator[None]:
+        """Once per element of the array starting here, as for entries()."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_section(path: str, section: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, TextStream]]:
+    """(key, stream positioned at its value) for each entry of state[section].
+
+    The caller reads or skips each value before asking for the next entry.
+    """
+    stream = TextStream(state_text(path, chunk_size))
+    for key in stream.entries():
+        if key != "state":
+            stream.skip_value()
+            continue
+        for name in stream.entries():
+            if name != section or stream.peek() != "{":
+                stream.skip_value()
+                continue
+            yield from ((entry, stream) for entry in stream.entries())
+            return
+        return
+
+
+def iter_documents(path: str, date: Optional[str] = None,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, dict]]:
+    """(id, document) for state.documents, only those created on `date` if given."""
+    for doc_id, stream in iter_section(path, "documents", chunk_size):
+        text = stream.read_value()
+        if date and date not in text:
+            continue
+        doc = json.loads(text)
+        if not isinstance(doc, dict):
+            continue
+        if date and (doc.get("created_at") or "")[:10] != date:
+            continue
+        yield doc_id, doc
+
+
+def load_documents(path: str, date: Optional[str] = None) -> Dict[str, dict]:
+    return dict(iter_documents(path, date))
+
+
+def iter_transcripts(path: str, doc_ids: Iterable[str],
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, List[dict]]]:
+    """(id, transcript) for the state.transcripts entries of `doc_ids`, decoding no others."""
+    wanted = set(doc_ids)
+    if not wanted:
+        return
+    for doc_id, stream in iter_section(path, "transcripts", chunk_size):
+        if doc_id not in wanted:
+            stream.skip_value()
+            continue
+        yield doc_id, stream.decode_value() or []
+        wanted.discard(doc_id)
+        if not wanted:
+            return
+
+
+def load_transcripts(path: str, doc_ids: Iterable[str]) -> Dict[str, List[dict]]:
+    return dict(iter_transcripts(path, doc_ids))
+
+
+def count_dates(path: str) -> Counter:
+    """Number of documents per creation date."""
+    dates = Counter()
+    for _, doc in iter_documents(path):
+        created = (doc.get("created_at") or "")[:10]
+        if created:
+            dates[created] += 1
+    return dates
+
+
+def calendar_attendees(doc: dict) -> List[dict]:
+    """The document's calendar attendees other than yourself, as {email, name}."""
+    cal = doc.get("google_calendar_event") or {}
+    attendees = []
+    for a in (cal.get("attendees") or []):
+        email = a.get("email", "")
+        name = a.get("displayName", email.split("@")[0] if email else "")
+        if email and not a.get("self"):
+            attendees.append({"email": email, "name": name})
+    return attendees
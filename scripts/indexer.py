@@ -6,30 +6,70 @@ Scans all markdown files in the brain directory, extracts entities and
 relationships, and populates the SQLite database for fast search and
 graph queries.
 
-Incremental: only re-indexes files whose content hash has changed.
+Incremental: files whose mtime/size/inode match the last run are skipped
+without being opened; otherwise only files whose content hash has changed
+are re-indexed.
+
+Granola meeting snapshots (inbox/granola, see snapshot-transcripts.sh) go
+into the meetings table, their transcripts into the search index in
+passages; they too are only re-read when a snapshot changes.
+
+Parsing (read + hash + entity extraction) is a pure function of each file,
+so with --jobs it runs in a process pool while the main process remains the
+single SQLite writer.
 
 Usage:
     python3 scripts/indexer.py [brain-root]
     python3 scripts/indexer.py ~/brain --full    # force full re-index
+    python3 scripts/indexer.py ~/brain --jobs 8  # parse files in 8 worker processes
+    python3 scripts/indexer.py ~/brain --watch   # stay running, re-index on change
+    python3 scripts/indexer.py ~/brain --watch --poll  # without inotify
+    python3 scripts/indexer.py ~/brain --pagerank      # also rank entities by PageRank
 """
 
+import ctypes
+import ctypes.util
 import hashlib
 import json
 import os
 import re
+import select
 import sqlite3
+import struct
 import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import person_aliases
+import snapshot_store
 
 # --- Configuration ---
 
 BRAIN_ROOT = Path(sys.argv[1]) if len(sys.argv) > 1 and not sys.argv[1].startswith("--") else Path.home() / "brain"
 FULL_REINDEX = "--full" in sys.argv
+WATCH = "--watch" in sys.argv
+FORCE_POLL = "--poll" in sys.argv
+PAGERANK = "--pagerank" in sys.argv
 DB_PATH = BRAIN_ROOT / ".brain.db"
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 
+
+def parse_jobs(argv: List[str]) -> int:
+    """Read --jobs N from argv. 0 means one worker per CPU; default is serial."""
+    for i, arg in enumerate(argv):
+        if arg == "--jobs" and i + 1 < len(argv):
+            jobs = int(argv[i + 1])
+            return jobs if jobs > 0 else (os.cpu_count() or 1)
+    return 1
+
+
+JOBS = parse_jobs(sys.argv)
+
 # File types to index and their classification
 FILE_PATTERNS = {
     "threads": "thread",
@@ -107,6 +147,136 @@ def extract_commitments(content: str) -> List[Dict]:
     return items
 
 
+# (name, slug) of every person with a people/ file; hashable so the compiled
+# matcher can be cached per process
+People = Tuple[Tuple[str, str], ...]
+
+ATTENDEES_LINE = re.compile(r"^\W*attendees\W*:(.*)$", re.IGNORECASE | re.MULTILINE)
+
+
+@lru_cache(maxsize=4)
+def people_matcher(people: People):
+    """Compile one regex finding any person's full name as a whole word.
+
+    Returns (pattern, (name, slug) by lowercased name, names contained in
+    each name). Longer names win in the alternation, so "Wei" inside "Wei Zhang"
+    is recovered through the containment map instead.
+    """
+    known = {}
+    for name, slug in sorted(people):
+        known.setdefault(name.lower(), (name, slug))
+    if not known:
+        return None, known, {}
+    names = sorted(known, key=lambda n: (-len(n), n))
+    pattern = re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(n) for n in names) + r")(?!\w)", re.IGNORECASE
+    )
+    contained = {}
+    for name in names:
+        words = name.split()
+        spans = {" ".join(words[i:j]) for i in range(len(words))
+                 for j in range(i + 1, len(words) + 1)} - {name}
+        contained[name] = sorted(spans & known.keys())
+    return pattern, known, contained
+
+
+def extract_person_mentions(content: str, people: People) -> List[Dict]:
+    """People named in a meeting: 'attended' if on an Attendees: line, else 'mentioned_in'."""
+    pattern, known, contained = people_matcher(people)
+    if pattern is None:
+        return []
+
+    def names_in(text):
+        """Offset of the first match of each name in text."""
+        found = {}
+        for match in pattern.finditer(text):
+            name = match.group(0).lower()
+            for each in [name] + contained[name]:
+                found.setdefault(each, match.start())
+        return found
+
+    attended = names_in("\n".join(ATTENDEES_LINE.findall(content)))
+    mentioned = names_in(content)
+    return [
+        {"name": known[name][0], "slug": known[name][1],
+         "type": "attended" if name in attended else "mentioned_in",
+         "offset": mentioned[name]}
+        for name in sorted(mentioned)
+    ]
+
+
+DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+WIKI_LINK = re.compile(r"\[\[([^\]]+)\]\]")
+HEADING = re.compile(r"^(#+)\s")
+
+
+def dated_lines(content: str) -> Iterator[Tuple[int, str, str]]:
+    """Yield (offset, date, line) for every line of content that can be dated.
+
+    A line takes the first date on it, else that of the nearest dated heading
+    above it (handoff sessions are "## 2026-01-20 — ..." sections, with
+    undated subheadings).
+    """
+    section, section_level = None, 0
+    offset = 0
+    for line in content.splitlines(keepends=True):
+        match = DATE.search(line)
+        heading = HEADING.match(line)
+        if heading:
+            level = len(heading.group(1))
+            if match:
+                section, section_level = match.group(1), level
+            elif level <= section_level:
+                section = None
+        date = match.group(1) if match else section
+        if date:
+            yield offset, date, line
+        offset += len(line)
+
+
+def meeting_date(rel_path: str, content: str) -> Optional[str]:
+    """When a meeting happened: the date its filename starts with, else its earliest date."""
+    match = DATE.match(os.path.basename(rel_path))
+    if match:
+        return match.group(1)
+    dates = extract_dates(content)
+    return min(dates) if dates else None
+
+
+def extract_timeline(rel_path: str, doc_type: str, content: str, title: str,
+                     mentions: List[Dict] = ()) -> List[Dict]:
+    """Dated mentions in a document: {"name", "type", "slug", "date", "offset"}.
+
+    Threads and people files mention themselves on every dated line, and
+    every document mentions the thread of each [[link]] on a dated line.
+    Everything in a meeting is dated by when it happened, including the
+    people it names (`mentions`, from extract_person_mentions).
+    """
+    own = None
+    if doc_type in ("thread", "person", "meeting"):
+        own = {"name": title, "type": doc_type, "slug": Path(rel_path).stem}
+
+    if doc_type == "meeting":
+        date = meeting_date(rel_path, content)
+        if date is None:
+            return []
+        timeline = [dict(own, date=date, offset=0)]
+        timeline.extend({"name": m["name"], "type": "person", "slug": m["slug"],
+                         "date": date, "offset": m["offset"]} for m in mentions)
+        lines = [(0, date, content)]
+    else:
+        timeline = []
+        lines = dated_lines(content)
+
+    for offset, date, line in lines:
+        if own and doc_type != "meeting":
+            timeline.append(dict(own, date=date, offset=offset))
+        for link in WIKI_LINK.finditer(line):
+            timeline.append({"name": link.group(1), "type": "thread", "slug": link_slug(link.group(1)),
+                             "date": date, "offset": offset + link.start()})
+    return timeline
+
+
 def classify_file(rel_path: str) -> Optional[str]:
     """Determine the document type from its path."""
     filename = os.path.basename(rel_path)
@@ -144,153 +314,327 @@ def find_markdown_files(brain_root: Path) -> List[Path]:
     return files
 
 
+def add_document_columns(conn: sqlite3.Connection, columns: Dict[str, str]):
+    """ALTER TABLE documents for each column it does not have yet."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+    for column, column_type in columns.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {column_type}")
+
+
+def migrate_stat_columns(conn: sqlite3.Connection) -> List[str]:
+    """v1: stat signature columns for skipping unchanged files."""
+    add_document_columns(conn, {"mtime_ns": "INTEGER", "size": "INTEGER", "inode": "INTEGER"})
+    return []
+
+
+def migrate_external_fts(conn: sqlite3.Connection) -> List[str]:
+    """v2: search_index becomes an external-content table over documents.
+
+    Older databases stored a second copy of every document in the FTS table.
+    Its entity_names column moves onto documents and the old table is
+    dropped; schema.sql recreates it and the follow-up rebuilds it.
+    """
+    add_document_columns(conn, {"entity_names": "TEXT"})
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).fetchone()
+    if row and "content='documents'" in row[0]:
+        return []
+    if row:
+        conn.executemany(
+            "UPDATE documents SET entity_names = ? WHERE id = ?",
+            conn.execute("SELECT entity_names, CAST(document_id AS INTEGER) FROM search_index").fetchall()
+        )
+        conn.execute("DROP TABLE search_index")
+    return [
+        "INSERT INTO search_index (search_index) VALUES ('rebuild')",
+        "VACUUM",  # hand the old FTS copy's pages back to the filesystem
+    ]
+
+
+def migrate_covering_rel_indexes(conn: sqlite3.Connection) -> List[str]:
+    """v3: relationship indexes also cover (type, other end) for traversal."""
+    conn.execute("DROP INDEX IF EXISTS idx_rel_source")
+    conn.execute("DROP INDEX IF EXISTS idx_rel_target")
+    return []
+
+
+def migrate_entity_search(conn: sqlite3.Connection) -> List[str]:
+    """v4: trigram entity_search index (created by schema.sql) needs filling."""
+    return ["INSERT INTO entity_search (entity_search) VALUES ('rebuild')"]
+
+
+def migrate_person_mentions(conn: sqlite3.Connection) -> List:
+    """v5: person -> meeting edges, found in already-indexed meetings."""
+    return [backfill_all_person_mentions]
+
+
+def migrate_entity_degree(conn: sqlite3.Connection) -> List:
+    """v6: per-entity degree counts, from the existing relationships."""
+    return [rebuild_entity_degree]
+
+
+def migrate_mentions(conn: sqlite3.Connection) -> List:
+    """v7: dated mentions for the timeline, from stored document content."""
+    return [rebuild_mentions]
+
+
+def migrate_search_type_column(conn: sqlite3.Connection) -> List[str]:
+    """v8: search_index gains a type column, so type filters run inside the FTS query.
+
+    FTS5 tables can't be altered: the table and its triggers are dropped for
+    schema.sql to recreate, and the follow-up refills it from documents.
+    """
+    if "type" in {row[1] for row in conn.execute("PRAGMA table_info(search_index)")}:
+        return []
+    for trigger in ("documents_fts_insert", "documents_fts_delete", "documents_fts_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS search_index")
+    return ["INSERT INTO search_index (search_index) VALUES ('rebuild')"]
+
+
+def migrate_person_aliases(conn: sqlite3.Connection) -> List:
+    """v9: attendee aliases for people files (person_aliases, created by schema.sql)."""
+    return [rebuild_person_aliases]
+
+
+# Ordered schema migrations; a database at version N has had the first N
+# applied. Each one upgrades an existing database in place from data it
+# already holds (never by re-parsing the brain) and must be safe to re-run,
+# since databases from before versioning start at 0 whatever their shape.
+# A migration runs before schema.sql, so new tables, indexes and triggers
+# can be left to the schema; it returns follow-up SQL statements or
+# functions of the connection to run once they exist (e.g. filling a new
+# derived table).
+MIGRATIONS = [
+    migrate_stat_columns,
+    migrate_external_fts,
+    migrate_covering_rel_indexes,
+    migrate_entity_search,
+    migrate_person_mentions,
+    migrate_entity_degree,
+    migrate_mentions,
+    migrate_search_type_column,
+    migrate_person_aliases,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> Optional[int]:
+    """The database's schema version, 0 if it predates versioning, None if empty."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "documents" not in tables:
+        return None
+    if "indexer_meta" not in tables:
+        return 0
+    row = conn.execute("SELECT value FROM indexer_meta WHERE key = 'schema_version'").fetchone()
+    return int(row[0]) if row else 0
+
+
 def init_db(db_path: Path, schema_path: Path) -> sqlite3.Connection:
-    """Initialize the database with schema."""
+    """Initialize the database with schema, migrating an older one in place."""
     conn = sqlite3.connect(str(db_path))
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
 
+    version = get_schema_version(conn)
+    if version is not None and version > SCHEMA_VERSION:
+        conn.close()
+        raise RuntimeError(
+            f"{db_path} has schema version {version}, newer than this indexer "
+            f"({SCHEMA_VERSION}); update the scripts or re-run with --full"
+        )
+
+    follow_up = []
+    if version is not None and version < SCHEMA_VERSION:
+        print(f"Upgrading index schema v{version} -> v{SCHEMA_VERSION}")
+        for migrate in MIGRATIONS[version:]:
+            follow_up.extend(migrate(conn))
+
     with open(schema_path) as f:
         conn.executescript(f.read())
 
+    # The version is only bumped once everything above has succeeded; if
+    # anything fails, the next run repeats the (idempotent) migrations.
+    for step in follow_up:
+        conn.commit()
+        if callable(step):
+            step(conn)
+        else:
+            conn.execute(step)
+    if version != SCHEMA_VERSION:
+        conn.execute(
+            "INSERT OR REPLACE INTO indexer_meta (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),)
+        )
+    conn.commit()
+
     return conn
 
 
+def stat_signature(st: os.stat_result) -> Tuple[int, int, int]:
+    """The (mtime_ns, size, inode) triple used to detect unchanged files."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def load_stat_signatures(conn: sqlite3.Connection) -> Dict[str, Tuple[int, int, int]]:
+    """Map every indexed markdown path to the stat signature recorded for it.
+
+    Transcript chunks aren't files; index_meetings() tracks their snapshots.
+    """
+    return {
+        row[0]: (row[1], row[2], row[3])
+        for row in conn.execute(
+            "SELECT path, mtime_ns, size, inode FROM documents WHERE type != 'transcript'")
+    }
+
+
+# (type, slug) -> [id, name, document_id, metadata_json], kept in step with
+# the entities table so link resolution never has to query SQLite
+EntityCache = Dict[Tuple[str, str], list]
+
+
+def load_entity_cache(conn: sqlite3.Connection) -> EntityCache:
+    """Preload every entity keyed by (type, slug)."""
+    return {
+        (row[0], row[1]): [row[2], row[3], row[4], row[5]]
+        for row in conn.execute("SELECT type, slug, id, name, document_id, metadata FROM entities")
+    }
+
+
 def get_or_create_entity(conn: sqlite3.Connection, name: str, entity_type: str,
                          slug: str = None, document_id: int = None,
-                         metadata: dict = None) -> int:
-    """Find an existing entity or create a new one. Returns entity ID."""
+                         metadata: dict = None, cache: EntityCache = None) -> int:
+    """Find an existing entity or create a new one. Returns entity ID.
+
+    With a cache, lookups are dict hits and the only statements issued are
+    an INSERT for a new entity or an UPDATE when its document/metadata moved.
+    """
     if slug is None:
         slug = re.sub(r"[^\w\s-]", "", name.lower())
         slug = re.sub(r"[\s]+", "-", slug).strip("-")
 
-    row = conn.execute(
-        "SELECT id FROM entities WHERE type = ? AND slug = ?",
-        (entity_type, slug)
-    ).fetchone()
+    key = (entity_type, slug)
+    meta_json = json.dumps(metadata) if metadata else None
+
+    if cache is not None:
+        row = cache.get(key)
+    else:
+        found = conn.execute(
+            "SELECT id, name, document_id, metadata FROM entities WHERE type = ? AND slug = ?",
+            key
+        ).fetchone()
+        row = list(found) if found else None
 
     if row:
         # Update if we have new info
-        if document_id is not None:
+        if document_id is not None and (row[2], row[3]) != (document_id, meta_json):
             conn.execute(
                 "UPDATE entities SET document_id = ?, metadata = ? WHERE id = ?",
-                (document_id, json.dumps(metadata) if metadata else None, row[0])
+                (document_id, meta_json, row[0])
             )
+            row[2], row[3] = document_id, meta_json
         return row[0]
 
     cursor = conn.execute(
         "INSERT INTO entities (name, type, slug, document_id, metadata) VALUES (?, ?, ?, ?, ?)",
-        (name, entity_type, slug, document_id, json.dumps(metadata) if metadata else None)
+        (name, entity_type, slug, document_id, meta_json)
     )
+    if cache is not None:
+        cache[key] = [cursor.lastrowid, name, document_id, meta_json]
     return cursor.lastrowid
 
 
+INSERT_MENTION = "INSERT INTO mentions (entity_id, date, document_id, offset) VALUES (?, ?, ?, ?)"
+INSERT_RELATIONSHIP = (
+    "INSERT INTO relationships (source_id, target_id, type, context, source_document_id, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
 def add_relationship(conn: sqlite3.Connection, source_id: int, target_id: int,
                      rel_type: str, context: str = None,
                      source_document_id: int = None):
     """Add a relationship between two entities."""
     conn.execute(
-        "INSERT INTO relationships (source_id, target_id, type, context, source_document_id, created_at) "
-        "VALUES (?, ?, ?, ?, ?, ?)",
+        INSERT_RELATIONSHIP,
         (source_id, target_id, rel_type, context, source_document_id,
          datetime.now().isoformat())
     )
 
 
-def index_document(conn: sqlite3.Connection, brain_root: Path, file_path: Path):
-    """Index a single markdown file."""
+def link_slug(link: str) -> str:
+    """Slug used for the thread entity a [[wiki-link]] points at."""
+    return link.lower().replace(" ", "-")
+
+
+def parse_document(brain_root: Path, file_path: Path, people: People = ()) -> Optional[Dict]:
+    """Read and parse a single markdown file into a plain record.
+
+    Touches no database state, so it can run in a worker process. The record
+    lists the entities the document defines (the first one is the source of
+    its links), the thread links it makes, the known `people` a meeting
+    names, its dated mentions for the timeline, and the names for the FTS
+    index.
+    """
     rel_path = str(file_path.relative_to(brain_root))
     doc_type = classify_file(rel_path)
     if doc_type is None:
-        return
+        return None
 
+    # Stat before reading so a write racing with us is picked up next run
+    signature = stat_signature(file_path.stat())
     content = file_path.read_text(encoding="utf-8", errors="replace")
-    content_hash = sha256(content)
-
-    # Check if unchanged
-    if not FULL_REINDEX:
-        row = conn.execute(
-            "SELECT id, content_hash FROM documents WHERE path = ?", (rel_path,)
-        ).fetchone()
-        if row and row[1] == content_hash:
-            return  # unchanged
-
     title = extract_title(content, rel_path)
-    now = datetime.now().isoformat()
 
-    # Upsert document
-    existing = conn.execute("SELECT id FROM documents WHERE path = ?", (rel_path,)).fetchone()
-    if existing:
-        doc_id = existing[0]
-        conn.execute(
-            "UPDATE documents SET type=?, title=?, content=?, content_hash=?, updated_at=? WHERE id=?",
-            (doc_type, title, content, content_hash, now, doc_id)
-        )
-        # Clear old relationships from this document
-        conn.execute("DELETE FROM relationships WHERE source_document_id = ?", (doc_id,))
-        # Update FTS
-        conn.execute("DELETE FROM search_index WHERE document_id = ?", (str(doc_id),))
-    else:
-        cursor = conn.execute(
-            "INSERT INTO documents (path, type, title, content, content_hash, created_at, updated_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (rel_path, doc_type, title, content, content_hash, now, now)
-        )
-        doc_id = cursor.lastrowid
-
-    # Extract entities based on document type
+    entities = []
+    links = []
+    mentions = []
     entity_names = []
 
     if doc_type == "thread":
-        slug = file_path.stem
         status = extract_status(content)
         metadata = {"status": status} if status else {}
         dates = extract_dates(content)
         if dates:
             metadata["last_date"] = max(dates)
-        entity_id = get_or_create_entity(conn, title, "thread", slug, doc_id, metadata)
+        entities.append({"name": title, "type": "thread", "slug": file_path.stem,
+                         "metadata": metadata})
         entity_names.append(title)
 
         # Wiki-link relationships
         for link in extract_wiki_links(content):
-            link_slug = link.lower().replace(" ", "-")
-            target_id = get_or_create_entity(conn, link, "thread", link_slug)
-            add_relationship(conn, entity_id, target_id, "related_to",
-                             source_document_id=doc_id)
+            links.append({"name": link, "slug": link_slug(link), "type": "related_to"})
             entity_names.append(link)
 
     elif doc_type == "person":
-        slug = file_path.stem
         role = extract_role(content)
         metadata = {"role": role} if role else {}
         dates = extract_dates(content)
         if dates:
             metadata["last_contact"] = max(dates)
-        entity_id = get_or_create_entity(conn, title, "person", slug, doc_id, metadata)
+        entities.append({"name": title, "type": "person", "slug": file_path.stem,
+                         "metadata": metadata})
         entity_names.append(title)
 
         # Wiki-link relationships (threads this person is connected to)
         for link in extract_wiki_links(content):
-            link_slug = link.lower().replace(" ", "-")
-            target_id = get_or_create_entity(conn, link, "thread", link_slug)
-            add_relationship(conn, entity_id, target_id, "discussed_at",
-                             source_document_id=doc_id)
+            links.append({"name": link, "slug": link_slug(link), "type": "discussed_at"})
 
     elif doc_type == "meeting":
-        slug = file_path.stem
         dates = extract_dates(content)
         metadata = {}
         if dates:
             metadata["date"] = min(dates)
-        entity_id = get_or_create_entity(conn, title, "meeting", slug, doc_id, metadata)
+        entities.append({"name": title, "type": "meeting", "slug": file_path.stem,
+                         "metadata": metadata})
         entity_names.append(title)
 
         # Wiki-link relationships
         for link in extract_wiki_links(content):
-            link_slug = link.lower().replace(" ", "-")
-            target_id = get_or_create_entity(conn, link, "thread", link_slug)
-            add_relationship(conn, entity_id, target_id, "mentioned_in",
-                             source_document_id=doc_id)
+            links.append({"name": link, "slug": link_slug(link), "type": "mentioned_in"})
+        mentions = extract_person_mentions(content, people)
 
     elif doc_type == "commitment":
         for item in extract_commitments(content):
@@ -301,22 +645,1038 @@ def index_document(conn: sqlite3.Connection, brain_root: Path, file_path: Path):
                 "owner": item["owner"],
                 "date": item["date"],
             }
-            entity_id = get_or_create_entity(conn, item["text"][:80], "commitment",
-                                             item_slug, doc_id, metadata)
+            entities.append({"name": item["text"][:80], "type": "commitment",
+                             "slug": item_slug, "metadata": metadata})
             entity_names.append(item["text"][:80])
 
     elif doc_type == "handoff":
-        # Extract thread references from handoff
-        for link in extract_wiki_links(content):
-            link_slug = link.lower().replace(" ", "-")
-            entity_names.append(link)
+        # Thread references only feed the search index
+        entity_names.extend(extract_wiki_links(content))
+
+    return {
+        "path": rel_path,
+        "type": doc_type,
+        "title": title,
+        "content": content,
+        "content_hash": sha256(content),
+        "stat": signature,
+        "entities": entities,
+        "links": links,
+        "mentions": mentions,
+        "timeline": extract_timeline(rel_path, doc_type, content, title, mentions),
+        "entity_names": entity_names,
+    }
+
+
+def store_document(conn: sqlite3.Connection, record: Dict, full: bool = False,
+                   cache: EntityCache = None) -> bool:
+    """Write a parsed record to the database. Returns False if unchanged."""
+    rel_path = record["path"]
+    content_hash = record["content_hash"]
+
+    existing = conn.execute(
+        "SELECT id, content_hash FROM documents WHERE path = ?", (rel_path,)
+    ).fetchone()
+    mtime_ns, size, inode = record["stat"]
+    if existing and not full and existing[1] == content_hash:
+        # Touched but not edited: remember the new signature so the next
+        # run can skip the file without reading it
+        conn.execute(
+            "UPDATE documents SET mtime_ns=?, size=?, inode=? WHERE id=?",
+            (mtime_ns, size, inode, existing[0])
+        )
+        return False  # unchanged
+
+    # The search_index triggers on documents keep FTS in step with these writes
+    now = datetime.now().isoformat()
+    entity_names = " ".join(record["entity_names"])
+    if existing:
+        doc_id = existing[0]
+        conn.execute(
+            "UPDATE documents SET type=?, title=?, content=?, content_hash=?, "
+            "mtime_ns=?, size=?, inode=?, entity_names=?, updated_at=? WHERE id=?",
+            (record["type"], record["title"], record["content"], content_hash,
+             mtime_ns, size, inode, entity_names, now, doc_id)
+        )
+        # Clear old relationships and mentions from this document
+        conn.execute("DELETE FROM relationships WHERE source_document_id = ?", (doc_id,))
+        conn.execute("DELETE FROM mentions WHERE document_id = ?", (doc_id,))
+    else:
+        cursor = conn.execute(
+            "INSERT INTO documents (path, type, title, content, content_hash, "
+            "mtime_ns, size, inode, entity_names, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (rel_path, record["type"], record["title"], record["content"], content_hash,
+             mtime_ns, size, inode, entity_names, now, now)
+        )
+        doc_id = cursor.lastrowid
+
+    source_id = None
+    for entity in record["entities"]:
+        entity_id = get_or_create_entity(conn, entity["name"], entity["type"],
+                                         entity["slug"], doc_id, entity["metadata"], cache)
+        if source_id is None:
+            source_id = entity_id
+
+    if source_id is not None and record["links"]:
+        rows = []
+        for link in record["links"]:
+            target_id = get_or_create_entity(conn, link["name"], "thread", link["slug"],
+                                             cache=cache)
+            rows.append((source_id, target_id, link["type"], None, doc_id, now))
+        conn.executemany(INSERT_RELATIONSHIP, rows)
+
+    # Person -> meeting edges, owned by the meeting like its links
+    if source_id is not None and record.get("mentions"):
+        rows = []
+        for mention in record["mentions"]:
+            person_id = get_or_create_entity(conn, mention["name"], "person", mention["slug"],
+                                             cache=cache)
+            rows.append((person_id, source_id, mention["type"], None, doc_id, now))
+        conn.executemany(INSERT_RELATIONSHIP, rows)
+
+    store_timeline(conn, doc_id, record.get("timeline", ()), cache)
+    return True
+
+
+def store_timeline(conn: sqlite3.Connection, doc_id: int, timeline: List[Dict],
+                   cache: EntityCache = None):
+    """Write a document's dated mentions, creating link targets as links do."""
+    conn.executemany(INSERT_MENTION, [
+        (get_or_create_entity(conn, m["name"], m["type"], m["slug"], cache=cache),
+         m["date"], doc_id, m["offset"])
+        for m in timeline
+    ])
+
+
+class BulkLoader:
+    """Batched writer for rebuilding an empty database (--full).
+
+    Document and entity IDs are assigned in-process, so each batch of records
+    becomes one executemany per table instead of several statements per
+    document and per link. Entities whose metadata changes after they were
+    flushed are updated once, in finish().
+    """
+
+    def __init__(self, conn: sqlite3.Connection, cache: EntityCache = None,
+                 batch_size: int = 500):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.next_doc_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM documents").fetchone()[0] + 1
+        self.next_entity_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM entities").fetchone()[0] + 1
+        self.entities = cache if cache is not None else load_entity_cache(conn)
+        self.dirty = set()
+        self.pending = 0
+        self.documents = []
+        self.new_entities = []
+        self.relationships = []
+        self.mentions = []
+
+    def entity(self, name: str, entity_type: str, slug: str,
+               document_id: int = None, metadata: dict = None) -> int:
+        """Same semantics as get_or_create_entity(), without touching SQLite."""
+        key = (entity_type, slug)
+        meta_json = json.dumps(metadata) if metadata else None
+        row = self.entities.get(key)
+        if row is None:
+            entity_id = self.next_entity_id
+            self.next_entity_id += 1
+            self.entities[key] = [entity_id, name, document_id, meta_json]
+            self.new_entities.append((entity_id, key))
+            return entity_id
+        if document_id is not None and (row[2], row[3]) != (document_id, meta_json):
+            row[2] = document_id
+            row[3] = meta_json
+            self.dirty.add(key)
+        return row[0]
+
+    def add(self, record: Dict):
+        doc_id = self.next_doc_id
+        self.next_doc_id += 1
+        now = datetime.now().isoformat()
+        mtime_ns, size, inode = record["stat"]
+        self.documents.append((
+            doc_id, record["path"], record["type"], record["title"], record["content"],
+            record["content_hash"], mtime_ns, size, inode, " ".join(record["entity_names"]),
+            now, now,
+        ))
+
+        source_id = None
+        for entity in record["entities"]:
+            entity_id = self.entity(entity["name"], entity["type"], entity["slug"],
+                                    doc_id, entity["metadata"])
+            if source_id is None:
+                source_id = entity_id
+        if source_id is not None:
+            for link in record["links"]:
+                target_id = self.entity(link["name"], "thread", link["slug"])
+                self.relationships.append((source_id, target_id, link["type"], None, doc_id, now))
+            for mention in record.get("mentions", ()):
+                person_id = self.entity(mention["name"], "person", mention["slug"])
+                self.relationships.append((person_id, source_id, mention["type"], None, doc_id, now))
+        for m in record.get("timeline", ()):
+            self.mentions.append((self.entity(m["name"], m["type"], m["slug"]),
+                                  m["date"], doc_id, m["offset"]))
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        conn = self.conn
+        conn.executemany(
+            "INSERT INTO documents (id, path, type, title, content, content_hash, "
+            "mtime_ns, size, inode, entity_names, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self.documents
+        )
+        rows = []
+        for entity_id, key in self.new_entities:
+            _, name, document_id, meta_json = self.entities[key]
+            rows.append((entity_id, name, key[0], key[1], document_id, meta_json))
+            self.dirty.discard(key)  # inserted with its latest values
+        conn.executemany(
+            "INSERT INTO entities (id, name, type, slug, document_id, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany(INSERT_RELATIONSHIP, self.relationships)
+        conn.executemany(INSERT_MENTION, self.mentions)
+        self.documents, self.new_entities, self.relationships, self.mentions = [], [], [], []
+        self.pending = 0
+
+    def finish(self):
+        self.flush()
+        self.conn.executemany(
+            "UPDATE entities SET document_id = ?, metadata = ? WHERE id = ?",
+            [(self.entities[key][2], self.entities[key][3], self.entities[key][0])
+             for key in self.dirty]
+        )
+        self.dirty.clear()
+
+
+def drop_deferred_objects(conn: sqlite3.Connection) -> List[str]:
+    """Drop every explicit index and trigger, returning the SQL to recreate them."""
+    rows = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE type IN ('index', 'trigger') AND sql IS NOT NULL"
+    ).fetchall()
+    for obj_type, name, _ in rows:
+        conn.execute(f"DROP {obj_type.upper()} {name}")
+    return [sql for _, _, sql in rows]
+
+
+def rebuild_entity_degree(conn: sqlite3.Connection):
+    """Recount entity_degree from relationships (drops any PageRank scores)."""
+    conn.execute("DELETE FROM entity_degree")
+    conn.execute("""
+        INSERT INTO entity_degree (entity_id, type, in_degree, out_degree)
+        SELECT entity_id, type, SUM(incoming), SUM(outgoing) FROM (
+            SELECT source_id AS entity_id, type, 0 AS incoming, 1 AS outgoing FROM relationships
+            UNION ALL SELECT target_id, type, 1, 0 FROM relationships
+            UNION ALL SELECT source_id, '*', 0, 1 FROM relationships
+            UNION ALL SELECT target_id, '*', 1, 0 FROM relationships
+        )
+        GROUP BY entity_id, type
+    """)
+
+
+def rebuild_derived_tables(conn: sqlite3.Connection):
+    """Recompute what the triggers would have maintained during a bulk load."""
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('rebuild')")
+    conn.execute("INSERT INTO entity_search (entity_search) VALUES ('rebuild')")
+    rebuild_entity_degree(conn)
+
+
+def compute_pagerank(conn: sqlite3.Connection, damping: float = 0.85,
+                     iterations: int = 100, tolerance: float = 1e-6) -> int:
+    """Score every connected entity by PageRank into entity_degree.pagerank.
+
+    Edges are treated as undirected: relationship direction here is a matter
+    of phrasing ("attended" vs "discussed_at"), not of who points at whom.
+    Returns the number of entities scored.
+    """
+    neighbors = defaultdict(list)
+    for source_id, target_id in conn.execute("SELECT source_id, target_id FROM relationships"):
+        neighbors[source_id].append(target_id)
+        neighbors[target_id].append(source_id)
+    if not neighbors:
+        return 0
+
+    base = (1 - damping) / len(neighbors)
+    rank = dict.fromkeys(neighbors, 1 / len(neighbors))
+    for _ in range(iterations):
+        scores = dict.fromkeys(neighbors, base)
+        for node, adjacent in neighbors.items():
+            share = damping * rank[node] / len(adjacent)
+            for other in adjacent:
+                scores[other] += share
+        delta = sum(abs(scores[node] - rank[node]) for node in neighbors)
+        rank = scores
+        if delta < tolerance * len(neighbors):
+            break
+
+    conn.execute("UPDATE entity_degree SET pagerank = NULL WHERE pagerank IS NOT NULL")
+    conn.executemany(
+        "UPDATE entity_degree SET pagerank = ? WHERE entity_id = ? AND type = '*'",
+        ((score, node) for node, score in rank.items())
+    )
+    return len(rank)
+
 
-    # Update FTS index
+def set_bulk_pragmas(conn: sqlite3.Connection, enabled: bool):
+    """Trade durability for speed while rebuilding; the DB is derived anyway."""
+    if enabled:
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+    else:
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-2000")  # SQLite default
+        conn.execute("PRAGMA temp_store=DEFAULT")
+
+
+def known_people(cache: EntityCache) -> People:
+    """(name, slug) of every person that has their own file."""
+    return tuple(sorted((row[1], slug) for (entity_type, slug), row in cache.items()
+                        if entity_type == "person" and row[2] is not None))
+
+
+def backfill_person_mentions(conn: sqlite3.Connection, person_ids: Iterator[int]) -> int:
+    """Recompute person -> meeting edges (and timeline mentions) for these people.
+
+    A meeting only finds the people known when it was parsed, so new and
+    edited people are matched against existing meetings here: an FTS phrase
+    query picks the candidates and the parse-time matcher confirms them.
+    Returns the number of edges written.
+    """
+    now = datetime.now().isoformat()
+    written = 0
+    for person_id in person_ids:
+        row = conn.execute("SELECT name, slug FROM entities WHERE id = ?", (person_id,)).fetchone()
+        if row is None:
+            continue
+        name, slug = row
+        conn.execute(
+            "DELETE FROM relationships WHERE source_id = ? AND type IN ('attended', 'mentioned_in') "
+            "AND source_document_id IN (SELECT id FROM documents WHERE type = 'meeting')",
+            (person_id,)
+        )
+        conn.execute(
+            "DELETE FROM mentions WHERE entity_id = ? "
+            "AND document_id IN (SELECT id FROM documents WHERE type = 'meeting')",
+            (person_id,)
+        )
+        if not re.search(r"\w", name):
+            continue
+        # CROSS JOIN keeps the FTS match as the outer loop; left to itself the
+        # planner scans every meeting entity and re-runs the MATCH for each
+        candidates = conn.execute("""
+            SELECT d.id, d.path, d.content, e.id FROM search_index
+            CROSS JOIN documents d ON d.id = search_index.rowid
+            CROSS JOIN entities e ON e.document_id = d.id AND e.type = 'meeting'
+            WHERE search_index MATCH ? AND d.type = 'meeting'
+        """, ('content : "' + name.replace('"', '""') + '" AND type : meeting',)).fetchall()
+        rows, mentions = [], []
+        for doc_id, rel_path, content, meeting_id in candidates:
+            date = meeting_date(rel_path, content)
+            for mention in extract_person_mentions(content, ((name, slug),)):
+                rows.append((person_id, meeting_id, mention["type"], None, doc_id, now))
+                if date is not None:
+                    mentions.append((person_id, date, doc_id, mention["offset"]))
+        conn.executemany(INSERT_RELATIONSHIP, rows)
+        conn.executemany(INSERT_MENTION, mentions)
+        written += len(rows)
+    return written
+
+
+def rebuild_mentions(conn: sqlite3.Connection):
+    """Re-derive every document's timeline mentions from its stored content."""
+    cache = load_entity_cache(conn)
+    people = known_people(cache)
+    conn.execute("DELETE FROM mentions")
+    documents = conn.execute("SELECT id, path, type, title, content FROM documents")
+    for doc_id, rel_path, doc_type, title, content in documents:
+        mentions = extract_person_mentions(content, people) if doc_type == "meeting" else []
+        store_timeline(conn, doc_id, extract_timeline(rel_path, doc_type, content, title, mentions),
+                       cache)
+
+
+def backfill_all_person_mentions(conn: sqlite3.Connection) -> int:
+    people = conn.execute(
+        "SELECT id FROM entities WHERE type = 'person' AND document_id IS NOT NULL ORDER BY id"
+    ).fetchall()
+    return backfill_person_mentions(conn, (row[0] for row in people))
+
+
+def bulk_load(conn: sqlite3.Connection, records: Iterator[Dict],
+              cache: EntityCache = None) -> int:
+    """Load records into an empty database in one transaction.
+
+    Secondary indexes and triggers are dropped for the duration; indexes are
+    rebuilt and the FTS index is filled in one pass at the end, which is much
+    cheaper than maintaining them row by row.
+    """
+    set_bulk_pragmas(conn, True)
+    deferred_sql = drop_deferred_objects(conn)
+    loader = BulkLoader(conn, cache)
+    loaded = 0
+    for record in records:
+        loader.add(record)
+        loaded += 1
+    loader.finish()
+    for sql in deferred_sql:
+        conn.execute(sql)
+    rebuild_derived_tables(conn)
+    backfill_all_person_mentions(conn)
+    conn.commit()
+    set_bulk_pragmas(conn, False)
+    return loaded
+
+
+def index_document(conn: sqlite3.Connection, brain_root: Path, file_path: Path,
+                   full: bool = False, cache: EntityCache = None) -> bool:
+    """Index a single markdown file. Returns False if skipped."""
+    if not full:
+        row = conn.execute(
+            "SELECT mtime_ns, size, inode FROM documents WHERE path = ?",
+            (str(file_path.relative_to(brain_root)),)
+        ).fetchone()
+        if row and tuple(row) == stat_signature(file_path.stat()):
+            return False
+    record = parse_document(brain_root, file_path, known_people(cache) if cache else ())
+    if record is None:
+        return False
+    return store_document(conn, record, full, cache)
+
+
+def purge_documents(conn: sqlite3.Connection, rel_paths: List[str],
+                    cache: EntityCache = None) -> int:
+    """Drop documents that are gone from disk, in one set-based pass.
+
+    Their relationships and mentions go with them, as do meetings' edges to
+    and mentions of deleted people, and the documents triggers drop their
+    FTS entries. Entities they defined are deleted unless other documents
+    still link to or mention them, in which case they stay as placeholders
+    with no document or metadata, as a rebuild would create them.
+    Placeholders that only these documents referred to are deleted too.
+    Returns the number of documents removed.
+    """
+    if not rel_paths:
+        return 0
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS purged (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM purged")
+    conn.executemany(
+        "INSERT OR IGNORE INTO purged (id) SELECT id FROM documents WHERE path = ?",
+        [(p,) for p in rel_paths]
+    )
+    owned = conn.execute(
+        "SELECT id, type, slug FROM entities WHERE document_id IN (SELECT id FROM purged)"
+    ).fetchall()
+    # Placeholders these documents link to or mention, which may have no
+    # other referrers once they're gone
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS unlinked (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM unlinked")
+    conn.execute("""
+        INSERT OR IGNORE INTO unlinked (id)
+        SELECT target_id FROM relationships WHERE source_document_id IN (SELECT id FROM purged)
+        UNION SELECT entity_id FROM mentions WHERE document_id IN (SELECT id FROM purged)
+    """)
+
+    conn.execute("DELETE FROM relationships WHERE source_document_id IN (SELECT id FROM purged)")
+    conn.execute("DELETE FROM mentions WHERE document_id IN (SELECT id FROM purged)")
+    # Person -> meeting edges are owned by the meetings but only exist
+    # because the people file did; a rebuild wouldn't find them
+    people = "SELECT id FROM entities WHERE type = 'person' AND document_id IN (SELECT id FROM purged)"
+    meetings = "SELECT id FROM documents WHERE type = 'meeting'"
     conn.execute(
-        "INSERT INTO search_index (title, content, entity_names, path, document_id, type) "
-        "VALUES (?, ?, ?, ?, ?, ?)",
-        (title, content, " ".join(entity_names), rel_path, str(doc_id), doc_type)
+        f"DELETE FROM relationships WHERE source_id IN ({people}) "
+        f"AND type IN ('attended', 'mentioned_in') AND source_document_id IN ({meetings})"
     )
+    conn.execute(f"DELETE FROM mentions WHERE entity_id IN ({people}) AND document_id IN ({meetings})")
+    unreferenced = """
+          AND NOT EXISTS (SELECT 1 FROM relationships WHERE source_id = entities.id)
+          AND NOT EXISTS (SELECT 1 FROM relationships WHERE target_id = entities.id)
+          AND NOT EXISTS (SELECT 1 FROM mentions WHERE entity_id = entities.id)
+    """
+    orphans = conn.execute(
+        "SELECT id, type, slug FROM entities WHERE id IN (SELECT id FROM unlinked) "
+        "AND document_id IS NULL" + unreferenced
+    ).fetchall()
+    conn.executemany("DELETE FROM entities WHERE id = ?", [(row[0],) for row in orphans])
+    conn.execute("DELETE FROM entities WHERE document_id IN (SELECT id FROM purged)" + unreferenced)
+    # What's left is a placeholder, as a link to a missing file creates
+    conn.execute("UPDATE entities SET metadata = NULL WHERE document_id IN (SELECT id FROM purged)")
+    removed = conn.execute("DELETE FROM documents WHERE id IN (SELECT id FROM purged)").rowcount
+
+    if cache is not None:
+        for entity_id, entity_type, slug in owned:
+            kept = conn.execute("SELECT 1 FROM entities WHERE id = ?", (entity_id,)).fetchone()
+            if kept:
+                cache[(entity_type, slug)][2:] = [None, None]
+            else:
+                cache.pop((entity_type, slug), None)
+        for _, entity_type, slug in orphans:
+            cache.pop((entity_type, slug), None)
+    return removed
+
+
+def remove_document(conn: sqlite3.Connection, rel_path: str,
+                    cache: EntityCache = None) -> bool:
+    """Drop a single vanished document. Returns False if it wasn't indexed."""
+    return purge_documents(conn, [rel_path], cache) > 0
+
+
+def rename_document(conn: sqlite3.Connection, old_path: str, record: Dict,
+                    cache: EntityCache = None) -> bool:
+    """Re-point an indexed document at its new path without re-indexing it.
+
+    The search index is keyed by document id, so it needs no change at all.
+
+    Only valid when record has the same content as the document at old_path.
+    Entities named after the file follow the new filename. Returns False,
+    changing nothing, when that isn't a clean move (type or title changed,
+    the new slug already belongs to another entity, or other documents still
+    refer to the old one); the caller should then purge and re-insert.
+    """
+    row = conn.execute(
+        "SELECT id, type, title FROM documents WHERE path = ?", (old_path,)
+    ).fetchone()
+    if not row or (row[1], row[2]) != (record["type"], record["title"]):
+        return False
+    doc_id = row[0]
+
+    owned = {(r[1], r[2]): r[0] for r in conn.execute(
+        "SELECT id, type, slug FROM entities WHERE document_id = ?", (doc_id,))}
+    new_keys = [(e["type"], e["slug"]) for e in record["entities"]]
+    moved = None
+    if set(owned) != set(new_keys):
+        if len(owned) != 1 or len(new_keys) != 1:
+            return False
+        old_key, new_key = next(iter(owned)), new_keys[0]
+        taken = (new_key in cache) if cache is not None else conn.execute(
+            "SELECT 1 FROM entities WHERE type = ? AND slug = ?", new_key).fetchone()
+        if old_key[0] != new_key[0] or taken:
+            return False
+        # Links from other documents name the old slug; a rebuild would
+        # leave them on a placeholder for it, not follow the file
+        entity_id = owned[old_key]
+        linked = conn.execute("""
+            SELECT 1 FROM relationships
+            WHERE (source_id = ? OR target_id = ?) AND source_document_id IS NOT ?
+            UNION ALL
+            SELECT 1 FROM mentions WHERE entity_id = ? AND document_id != ?
+            LIMIT 1
+        """, (entity_id, entity_id, doc_id, entity_id, doc_id)).fetchone()
+        if linked:
+            return False
+        moved = (old_key, new_key)
+
+    if moved:
+        conn.execute("UPDATE entities SET slug = ? WHERE id = ?", (moved[1][1], owned[moved[0]]))
+        if cache is not None and moved[0] in cache:
+            cache[moved[1]] = cache.pop(moved[0])
+    mtime_ns, size, inode = record["stat"]
+    conn.execute(
+        "UPDATE documents SET path=?, mtime_ns=?, size=?, inode=?, updated_at=? WHERE id=?",
+        (record["path"], mtime_ns, size, inode, datetime.now().isoformat(), doc_id)
+    )
+    return True
+
+
+def _parse_safely(brain_root: Path, file_path: Path,
+                  people: People = ()) -> Tuple[Optional[Dict], Optional[str]]:
+    """parse_document wrapper that reports errors instead of raising across processes."""
+    try:
+        return parse_document(brain_root, file_path, people), None
+    except Exception as e:
+        return None, str(e)
+
+
+def parse_files(brain_root: Path, files: List[Path], jobs: int = 1,
+                people: People = ()) -> Iterator[Tuple[Path, Optional[Dict], Optional[str]]]:
+    """Yield (path, record, error) for each file, in order.
+
+    With jobs > 1 the files are parsed in a process pool; results stream back
+    to the caller, which stays the only process touching the database.
+    """
+    if jobs <= 1 or len(files) < 2:
+        for file_path in files:
+            yield (file_path,) + _parse_safely(brain_root, file_path, people)
+        return
+
+    chunksize = max(1, min(64, len(files) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(partial(_parse_safely, brain_root, people=people), files,
+                           chunksize=chunksize)
+        for file_path, (record, error) in zip(files, results):
+            yield file_path, record, error
+
+
+def sync_documents(conn: sqlite3.Connection, brain_root: Path, files: List[Path],
+                   vanished: List[str], cache: EntityCache = None,
+                   jobs: int = 1) -> Dict[str, int]:
+    """Bring the index in line with changed files and vanished paths.
+
+    A file at a path the index has never seen whose content hash matches a
+    vanished document of the same type is a rename, and becomes a path
+    update. Whatever is still vanished afterwards is purged in one pass.
+    Returns counts of indexed, skipped, renamed and removed documents.
+    """
+    stats = {"indexed": 0, "skipped": 0, "renamed": 0, "removed": 0}
+    orphans = {}  # content_hash -> vanished paths with that content
+    for rel_path in vanished:
+        row = conn.execute(
+            "SELECT content_hash FROM documents WHERE path = ?", (rel_path,)
+        ).fetchone()
+        if row:
+            orphans.setdefault(row[0], []).append(rel_path)
+    vanished = set(vanished)
+    if cache is None:
+        cache = load_entity_cache(conn)
+    people_changed = []
+
+    for file_path, record, error in parse_files(brain_root, files, jobs, known_people(cache)):
+        if error is not None:
+            print(f"  Error indexing {file_path}: {error}", file=sys.stderr)
+            continue
+        if record is None:
+            stats["skipped"] += 1
+            continue
+        try:
+            candidates = orphans.get(record["content_hash"])
+            if candidates and not conn.execute(
+                    "SELECT 1 FROM documents WHERE path = ?", (record["path"],)).fetchone():
+                old_path = next((p for p in candidates if p in vanished
+                                 and rename_document(conn, p, record, cache)), None)
+                if old_path:
+                    candidates.remove(old_path)
+                    vanished.discard(old_path)
+                    stats["renamed"] += 1
+                    continue
+            if store_document(conn, record, cache=cache):
+                stats["indexed"] += 1
+                if record["type"] == "person":
+                    people_changed.append(cache[("person", record["entities"][0]["slug"])][0])
+            else:
+                stats["skipped"] += 1
+        except Exception as e:
+            print(f"  Error indexing {record['path']}: {e}", file=sys.stderr)
+
+    stats["removed"] = purge_documents(conn, sorted(vanished), cache)
+    backfill_person_mentions(conn, people_changed)
+    return stats
+
+
+# --- Meetings (Granola snapshots) ---
+
+GRANOLA_INBOX = "inbox/granola"
+TRANSCRIPT_CHUNK_WORDS = 300
+
+
+def chunk_transcript(text: str, size: int = TRANSCRIPT_CHUNK_WORDS) -> List[str]:
+    """Split a transcript into passages of about `size` words, on line breaks where possible.
+
+    Search ranks and snippets each passage on its own, so a hit lands near
+    where it was said rather than somewhere in an hour-long meeting.
+    """
+    chunks, lines, count = [], [], 0
+    for line in text.splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if count + len(words) > size and lines:
+            chunks.append("\n".join(lines))
+            lines, count = [], 0
+        while len(words) > size:
+            chunks.append(" ".join(words[:size]))
+            words = words[size:]
+        lines.append(" ".join(words))
+        count += len(words)
+    if lines:
+        chunks.append("\n".join(lines))
+    return chunks
+
+
+def find_snapshots(brain_root: Path) -> Dict[str, Tuple[Optional[int], int, Optional[str]]]:
+    """{source: (mtime_ns, size, store ID)} for every snapshot, without reading any.
+
+    Sources are paths under inbox/granola: <date>/*.json files (store ID
+    None) and the rows of snapshots.db (mtime_ns None). A file wins over a
+    store row at the same path.
+    """
+    inbox_dir = brain_root / GRANOLA_INBOX
+    snapshots = {}
+    store = snapshot_store.open_store(str(inbox_dir)) if inbox_dir.is_dir() else None
+    if store:
+        try:
+            for source, (doc_id, size) in snapshot_store.listing(store).items():
+                snapshots[source] = (None, size, doc_id)
+        finally:
+            store.close()
+    if inbox_dir.is_dir():
+        for date_dir in inbox_dir.iterdir():
+            if not date_dir.is_dir() or not DATE.fullmatch(date_dir.name):
+                continue
+            for entry in os.scandir(date_dir):
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    snapshots[f"{date_dir.name}/{entry.name}"] = (st.st_mtime_ns, st.st_size, None)
+    return snapshots
+
+
+def transcript_path(source: str, n: int) -> str:
+    return f"{GRANOLA_INBOX}/{source}#{n}"
+
+
+def drop_meeting(conn: sqlite3.Connection, source: str):
+    """Remove a snapshot's meetings row and its transcript documents.
+
+    Transcript documents own no entities, links or mentions; the documents
+    triggers drop their FTS entries.
+    """
+    row = conn.execute("SELECT chunks FROM meetings WHERE source = ?", (source,)).fetchone()
+    if row is None:
+        return
+    conn.executemany("DELETE FROM documents WHERE path = ?",
+                     [(transcript_path(source, n),) for n in range(row[0])])
+    conn.execute("DELETE FROM meetings WHERE source = ?", (source,))
+
+
+def store_meeting(conn: sqlite3.Connection, source: str, snapshot: Dict,
+                  signature: Tuple[Optional[int], int]):
+    """(Re)write one snapshot's meetings row and transcript documents."""
+    drop_meeting(conn, source)
+    title = snapshot.get("title") or "Untitled"
+    date = (snapshot.get("created_at") or "")[:10] or source.split("/", 1)[0]
+    attendees = [a for a in snapshot.get("attendees") or [] if isinstance(a, dict)]
+    transcript = snapshot.get("transcript") or ""
+    # A meeting without a transcript still gets one (empty) document, so
+    # its title and attendees are searchable
+    chunks = chunk_transcript(transcript) or [""]
+
+    now = datetime.now().isoformat()
+    chunk_title = f"{title} ({date})"
+    entity_names = " ".join(a.get("name") or a.get("email", "") for a in attendees)
+    conn.executemany(
+        "INSERT INTO documents (path, type, title, content, content_hash, entity_names, "
+        "created_at, updated_at) VALUES (?, 'transcript', ?, ?, ?, ?, ?, ?)",
+        [(transcript_path(source, n), chunk_title, text, sha256(text), entity_names, now, now)
+         for n, text in enumerate(chunks)]
+    )
+    conn.execute(
+        "INSERT INTO meetings (source, id, title, date, start_time, end_time, attendees, "
+        "word_count, chunks, mtime_ns, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (source, snapshot["id"], title, date, snapshot.get("start") or "", snapshot.get("end") or "",
+         json.dumps(attendees), snapshot.get("word_count", len(transcript.split())),
+         len(chunks), signature[0], signature[1])
+    )
+
+
+def index_meetings(conn: sqlite3.Connection, brain_root: Path) -> Dict[str, int]:
+    """Bring the meetings table and transcript documents in line with the snapshots.
+
+    Incremental by snapshot: only those whose (mtime_ns, size) changed since
+    they were indexed are read (decompressing just that row for the store),
+    and those that are gone are dropped. Returns counts of indexed, skipped
+    and removed snapshots.
+    """
+    stats = {"indexed": 0, "skipped": 0, "removed": 0}
+    indexed = {row[0]: (row[1], row[2])
+               for row in conn.execute("SELECT source, mtime_ns, size FROM meetings")}
+    snapshots = find_snapshots(brain_root)
+    inbox_dir = brain_root / GRANOLA_INBOX
+    store = None
+    try:
+        for source in sorted(snapshots):
+            mtime_ns, size, store_id = snapshots[source]
+            if indexed.pop(source, None) == (mtime_ns, size):
+                stats["skipped"] += 1
+                continue
+            try:
+                if store_id is None:
+                    with open(inbox_dir / source, "r", encoding="utf-8") as f:
+                        snapshot = json.load(f)
+                else:
+                    store = store or snapshot_store.open_store(str(inbox_dir))
+                    snapshot = snapshot_store.get(store, store_id)
+            except (OSError, ValueError) as e:
+                print(f"  Error indexing {GRANOLA_INBOX}/{source}: {e}", file=sys.stderr)
+                continue
+            if not isinstance(snapshot, dict) or not snapshot.get("id"):
+                stats["skipped"] += 1
+                continue
+            store_meeting(conn, source, snapshot, (mtime_ns, size))
+            stats["indexed"] += 1
+    finally:
+        if store:
+            store.close()
+    for source in indexed:
+        drop_meeting(conn, source)
+        stats["removed"] += 1
+    return stats
+
+
+def rebuild_person_aliases(conn: sqlite3.Connection) -> int:
+    """Recompute person_aliases from people files and meeting attendees.
+
+    Only top-level people/<slug>.md files count, the ones generate-prep.py
+    links to. An attendee's email becomes an alias of the person whose
+    full name they were listed under, unless a people file claims it.
+    Returns the number of aliases written.
+    """
+    rows = set()
+    for slug, title, content in conn.execute("""
+        SELECT e.slug, e.name, d.content FROM entities e
+        JOIN documents d ON d.id = e.document_id
+        WHERE e.type = 'person' AND d.path = 'people/' || e.slug || '.md'
+    """):
+        rows.update((kind, alias, slug) for kind, alias in person_aliases.person_aliases(slug, title, content))
+
+    names, known = defaultdict(list), set()
+    for kind, alias, slug in sorted(rows):
+        if kind == "name":
+            names[alias].append(slug)
+        elif kind == "email":
+            known.add(alias)
+    for (attendees,) in conn.execute("SELECT attendees FROM meetings"):
+        try:
+            parsed = [a for a in json.loads(attendees or "[]") if isinstance(a, dict)]
+        except ValueError:
+            continue
+        rows.update(("email", email, slug)
+                    for email, slug in person_aliases.attendee_emails(parsed, names, known))
+
+    conn.execute("DELETE FROM person_aliases")
+    conn.executemany("INSERT INTO person_aliases (kind, alias, slug) VALUES (?, ?, ?)", sorted(rows))
+    return len(rows)
+
+
+# --- Watch mode ---
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# Returned by a watcher when it lost track of events and the caller should
+# diff the whole tree against the database instead
+RESCAN = Path("<rescan>")
+
+
+def is_watched_dir(brain_root: Path, path: Path) -> bool:
+    """True for the brain root, indexed directories, and their ancestors."""
+    if path == brain_root:
+        return True
+    try:
+        rel = path.relative_to(brain_root).as_posix()
+    except ValueError:
+        return False
+    for prefix in FILE_PATTERNS:
+        if rel == prefix or rel.startswith(prefix + "/") or prefix.startswith(rel + "/"):
+            return True
+    return False
+
+
+def scan_changes(conn: sqlite3.Connection, brain_root: Path) -> Set[Path]:
+    """Paths whose on-disk state differs from the index: new, modified or gone."""
+    signatures = load_stat_signatures(conn)
+    changed = set()
+    for file_path in find_markdown_files(brain_root):
+        rel_path = str(file_path.relative_to(brain_root))
+        try:
+            if signatures.pop(rel_path, None) != stat_signature(file_path.stat()):
+                changed.add(file_path)
+        except OSError:
+            changed.add(file_path)
+    changed.update(brain_root / rel_path for rel_path in signatures)
+    return changed
+
+
+class InotifyWatcher:
+    """Recursive inotify(7) watch over the indexed directories (Linux only)."""
+
+    def __init__(self, brain_root: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._rm_watch = libc.inotify_rm_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.brain_root = brain_root
+        self.dirs = {}  # watch descriptor -> directory
+        self.add_tree(brain_root)
+
+    def add_tree(self, top: Path) -> Set[Path]:
+        """Watch top and its indexed subdirectories; return the .md files found."""
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(top):
+            directory = Path(dirpath)
+            if not is_watched_dir(self.brain_root, directory):
+                dirnames[:] = []
+                continue
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self.dirs[wd] = directory
+            found.update(directory / f for f in filenames if f.endswith(".md"))
+            dirnames[:] = [d for d in dirnames if is_watched_dir(self.brain_root, directory / d)]
+        return found
+
+    def forget_tree(self, top: Path):
+        """Stop watching a directory that was moved away or deleted."""
+        for wd, directory in list(self.dirs.items()):
+            if directory == top or top in directory.parents:
+                self._rm_watch(self.fd, wd)
+                del self.dirs[wd]
+
+    def poll(self, timeout: Optional[float]) -> Set[Path]:
+        """Wait up to timeout seconds (None = forever) and return touched paths."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = b""
+        while True:
+            try:
+                data += os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].split(b"\0", 1)[0]
+            offset += 16 + length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    if is_watched_dir(self.brain_root, path):
+                        changed.update(self.add_tree(path))
+                else:
+                    self.forget_tree(path)
+                    changed.add(path)
+            elif path.suffix == ".md" and mask & (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE):
+                changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Portable fallback: diff stat signatures of the indexed files every interval."""
+
+    def __init__(self, brain_root: Path, interval: float = 1.0):
+        self.brain_root = brain_root
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> Dict[Path, Tuple[int, int, int]]:
+        snapshot = {}
+        for file_path in find_markdown_files(self.brain_root):
+            try:
+                snapshot[file_path] = stat_signature(file_path.stat())
+            except OSError:
+                pass
+        return snapshot
+
+    def poll(self, timeout: Optional[float]) -> Set[Path]:
+        while True:
+            time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+            current = self.scan()
+            changed = {p for p, sig in current.items() if self.snapshot.get(p) != sig}
+            changed.update(p for p in self.snapshot if p not in current)
+            self.snapshot = current
+            if changed or timeout is not None:
+                return changed
+
+
+def make_watcher(brain_root: Path, force_poll: bool = False):
+    """inotify where available, polling everywhere else."""
+    if not force_poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(brain_root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(brain_root)
+
+
+def apply_changes(conn: sqlite3.Connection, brain_root: Path, paths: Set[Path],
+                  cache: EntityCache = None) -> Dict[str, int]:
+    """Re-index changed paths and drop vanished ones (see sync_documents)."""
+    if RESCAN in paths:
+        paths = (paths - {RESCAN}) | scan_changes(conn, brain_root)
+
+    files = []
+    vanished = []
+    for path in sorted(paths):
+        rel_path = path.relative_to(brain_root).as_posix()
+        if path.is_file():
+            if classify_file(rel_path):
+                files.append(path)
+        elif path.suffix == ".md":
+            vanished.append(rel_path)
+        elif not path.exists():
+            # A directory went away: everything indexed beneath it did too
+            vanished.extend(r[0] for r in conn.execute(
+                "SELECT path FROM documents WHERE path >= ? AND path < ?",
+                (rel_path + "/", rel_path + "0")
+            ))
+    return sync_documents(conn, brain_root, files, vanished, cache)
+
+
+def watch(conn: sqlite3.Connection, brain_root: Path, cache: EntityCache,
+          watcher=None, debounce: float = 0.25, max_delay: float = 1.0):
+    """Keep the index in step with the brain until interrupted.
+
+    Bursts of events (an editor save, a wind-down commit touching dozens of
+    files) are coalesced: changes are applied once the tree has been quiet
+    for `debounce` seconds, or at most `max_delay` after the first event.
+    """
+    watcher = watcher or make_watcher(brain_root)
+    print(f"Watching {brain_root} ({type(watcher).__name__}). Ctrl-C to stop.")
+    pending = set()
+    first_seen = 0.0
+    while True:
+        timeout = None
+        if pending:
+            timeout = max(0.0, min(debounce, first_seen + max_delay - time.monotonic()))
+        changed = watcher.poll(timeout)
+        if changed:
+            if not pending:
+                first_seen = time.monotonic()
+            pending |= changed
+            if time.monotonic() - first_seen < max_delay:
+                continue
+        if not pending:
+            continue
+
+        stats = apply_changes(conn, brain_root, pending, cache)
+        if stats["indexed"] or stats["renamed"] or stats["removed"]:
+            rebuild_person_aliases(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO indexer_meta (key, value) VALUES (?, ?)",
+            ("last_indexed", datetime.now().isoformat())
+        )
+        conn.commit()
+        pending = set()
+        if stats["indexed"] or stats["renamed"] or stats["removed"]:
+            print(f"{datetime.now().strftime('%H:%M:%S')} Indexed {stats['indexed']}, "
+                  f"renamed {stats['renamed']}, removed {stats['removed']}")
 
 
 def main():
@@ -329,26 +1689,55 @@ def main():
         sys.exit(1)
 
     print(f"Indexing brain at {BRAIN_ROOT}...")
+    if JOBS > 1:
+        print(f"Parsing with {JOBS} worker processes")
     if FULL_REINDEX:
         print("Mode: full re-index")
         if DB_PATH.exists():
             DB_PATH.unlink()
 
-    conn = init_db(DB_PATH, SCHEMA_PATH)
+    try:
+        conn = init_db(DB_PATH, SCHEMA_PATH)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     files = find_markdown_files(BRAIN_ROOT)
-    indexed = 0
-    skipped = 0
+    cache = load_entity_cache(conn)
+    stats = {"indexed": 0, "skipped": 0, "renamed": 0, "removed": 0}
 
-    for file_path in files:
-        try:
-            before = conn.total_changes
-            index_document(conn, BRAIN_ROOT, file_path)
-            if conn.total_changes > before:
-                indexed += 1
+    if FULL_REINDEX:
+        def parsed_records():
+            for file_path, record, error in parse_files(BRAIN_ROOT, files, JOBS):
+                if error is not None:
+                    print(f"  Error indexing {file_path}: {error}", file=sys.stderr)
+                elif record is None:
+                    stats["skipped"] += 1
+                else:
+                    yield record
+
+        stats["indexed"] = bulk_load(conn, parsed_records(), cache)
+    else:
+        # Only files whose stat signature moved need to be opened at all;
+        # indexed paths that no longer exist on disk are renames or deletions
+        signatures = load_stat_signatures(conn)
+        to_parse = []
+        for file_path in files:
+            known = signatures.pop(str(file_path.relative_to(BRAIN_ROOT)), None)
+            try:
+                unchanged = known is not None and known == stat_signature(file_path.stat())
+            except OSError:
+                unchanged = False  # let the parse step report it
+            if unchanged:
+                stats["skipped"] += 1
             else:
-                skipped += 1
-        except Exception as e:
-            print(f"  Error indexing {file_path}: {e}", file=sys.stderr)
+                to_parse.append(file_path)
+
+        changed = sync_documents(conn, BRAIN_ROOT, to_parse, list(signatures), cache, JOBS)
+        for key, value in changed.items():
+            stats[key] += value
+
+    meeting_stats = index_meetings(conn, BRAIN_ROOT)
+    rebuild_person_aliases(conn)
 
     # Update indexer metadata
     conn.execute(
@@ -360,6 +1749,11 @@ def main():
         ("document_count", str(len(files)))
     )
 
+    if PAGERANK:
+        start = time.perf_counter()
+        scored = compute_pagerank(conn)
+        print(f"PageRank: scored {scored} entities in {time.perf_counter() - start:.2f}s")
+
     conn.commit()
 
     # Report stats
@@ -367,12 +1761,21 @@ def main():
     entity_count = conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
     rel_count = conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0]
 
-    print(f"Done. Indexed {indexed}, skipped {skipped} unchanged.")
+    print(f"Done. Indexed {stats['indexed']}, skipped {stats['skipped']} unchanged, "
+          f"renamed {stats['renamed']}, removed {stats['removed']}.")
+    print(f"  Meetings:  indexed {meeting_stats['indexed']}, skipped {meeting_stats['skipped']} unchanged, "
+          f"removed {meeting_stats['removed']}")
     print(f"  Documents: {doc_count}")
     print(f"  Entities:  {entity_count}")
     print(f"  Relations: {rel_count}")
     print(f"  DB size:   {DB_PATH.stat().st_size / 1024:.1f} KB")
 
+    if WATCH:
+        try:
+            watch(conn, BRAIN_ROOT, cache, make_watcher(BRAIN_ROOT, FORCE_POLL))
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+
     conn.close()
 
 
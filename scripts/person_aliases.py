@@ -0,0 +1,183 @@
+"""
+person_aliases.py - Resolve meeting attendees to people files.
+
+Every person with a people/<slug>.md file is known by a set of aliases:
+
+    email   addresses on the file's **Email**: line, plus (in the index)
+            addresses seen on meeting attendees whose full name is theirs
+    name    the slug and the file's title, in slug form ("wei-zhang")
+    part    each word of those longer than two letters ("wei", "zhang")
+
+indexer.py stores them in .brain.db's person_aliases table; generate-prep.py
+loads that, or derives the same aliases from the people files when the
+index isn't current. Lookups are dict hits. An alias that belongs to more
+than one person resolves to nobody and is recorded in `ambiguous`, rather
+than going to whichever file happened to be read last.
+
+Usage (as a library):
+    aliases = person_aliases.AliasIndex.from_files(people_dir)
+    path = aliases.resolve({"name": "Wei Zhang", "email": "wei@example.com"})
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+KINDS = ("email", "name", "part")
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+EMAIL_LINE = re.compile(r"^\W*e-?mails?\W*:(.*)$", re.IGNORECASE | re.MULTILINE)
+TITLE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+
+
+def name_key(name: str) -> str:
+    """A name in slug form: "Wei Zhang" -> "wei-zhang"."""
+    key = re.sub(r"[^a-z0-9\s-]", "", name.lower())
+    return re.sub(r"[\s-]+", "-", key).strip("-")
+
+
+def name_parts(key: str) -> List[str]:
+    """The words of a slug-form name worth matching on their own (not initials)."""
+    return [part for part in key.split("-") if len(part) > 2]
+
+
+def file_emails(content: str) -> List[str]:
+    """Addresses on a people file's Email: line(s)."""
+    return [email.lower() for line in EMAIL_LINE.findall(content) for email in EMAIL.findall(line)]
+
+
+def person_aliases(slug: str, title: str, content: str) -> Set[Tuple[str, str]]:
+    """(kind, alias) pairs for one people file."""
+    aliases = {("email", email) for email in file_emails(content)}
+    for key in {slug, name_key(title)} - {""}:
+        aliases.add(("name", key))
+        aliases.update(("part", part) for part in name_parts(key))
+    return aliases
+
+
+def file_title(content: str, slug: str) -> str:
+    match = TITLE.search(content)
+    return match.group(1).strip() if match else slug.replace("-", " ").title()
+
+
+def attendee_emails(attendees: Iterable[dict], names: Dict[str, List[str]],
+                    known: Set[str]) -> Iterator[Tuple[str, str]]:
+    """(email, slug) for attendees whose full name is exactly one person's.
+
+    `names` maps name aliases to slugs; addresses already in `known` (from
+    people files) are left as they are.
+    """
+    for attendee in attendees:
+        email = (attendee.get("email") or "").lower()
+        slugs = names.get(name_key(attendee.get("name") or ""), [])
+        if email and email not in known and len(slugs) == 1:
+            yield email, slugs[0]
+
+
+class AliasIndex:
+    """Alias -> people file lookups for one run of generate-prep.py."""
+
+    def __init__(self, people_dir: str, rows: Iterable[Tuple[str, str, str]]):
+        self.people_dir = people_dir
+        self.slugs: Dict[Tuple[str, str], List[str]] = {}
+        for kind, alias, slug in rows:
+            owners = self.slugs.setdefault((kind, alias), [])
+            if slug not in owners:
+                owners.append(slug)
+        for owners in self.slugs.values():
+            owners.sort()
+        self.ambiguous: Dict[str, List[str]] = {}
+        self._longest_name = None
+
+    @classmethod
+    def from_files(cls, people_dir: str) -> "AliasIndex":
+        """Derive the aliases from people/*.md (no meeting-attendee emails)."""
+        rows = []
+        if os.path.isdir(people_dir):
+            for fname in sorted(os.listdir(people_dir)):
+                if not fname.endswith(".md"):
+                    continue
+                slug = fname[:-3]
+                try:
+                    with open(os.path.join(people_dir, fname), "r") as f:
+                        content = f.read()
+                except OSError:
+                    continue
+                rows.extend((kind, alias, slug)
+                            for kind, alias in person_aliases(slug, file_title(content, slug), content))
+        return cls(people_dir, rows)
+
+    @classmethod
+    def from_db(cls, conn, people_dir: str) -> "AliasIndex":
+        return cls(people_dir, conn.execute("SELECT kind, alias, slug FROM person_aliases"))
+
+    def __contains__(self, alias: str) -> bool:
+        return any((kind, alias) in self.slugs for kind in KINDS)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted({alias for _, alias in self.slugs}))
+
+    def path(self, slug: str) -> str:
+        return os.path.join(self.people_dir, slug + ".md")
+
+    def lookup(self, kind: str, alias: str) -> Optional[str]:
+        """The one slug with this alias, or None (noting it if several share it)."""
+        owners = self.slugs.get((kind, alias), [])
+        if len(owners) > 1:
+            self.ambiguous[alias] = owners
+            return None
+        return owners[0] if owners else None
+
+    def candidates(self, attendee: dict) -> List[str]:
+        """Slugs an unresolved attendee's aliases are shared between."""
+        keys = self.attendee_keys(attendee)
+        return sorted({slug for kind, alias in keys for slug in self.slugs.get((kind, alias), [])})
+
+    def attendee_keys(self, attendee: dict) -> List[Tuple[str, str]]:
+        """(kind, alias) to try for an attendee, most specific first."""
+        name = (attendee.get("name") or "").strip()
+        email = (attendee.get("email") or "").lower().strip()
+        keys = [("email", email)] if email else []
+        key = name_key(name)
+        if key:
+            keys.append(("name", key))
+        words = key.split("-") if key else [re.sub(r"[^a-z]", "", email.split("@")[0])]
+        keys.append(("part", words[0]))
+        if len(words) > 1:
+            keys.append(("part", words[-1]))
+        return [(kind, alias) for kind, alias in keys if alias]
+
+    def resolve(self, attendee: dict) -> Optional[str]:
+        """The attendee's people file: by email, then full name, then first or last name."""
+        for kind, alias in self.attendee_keys(attendee):
+            slug = self.lookup(kind, alias)
+            if slug:
+                return self.path(slug)
+        return None
+
+    def in_title(self, title: str) -> List[dict]:
+        """People named in a meeting title, as inferred attendees.
+
+        Names and name parts are matched as whole words, longest first, so
+        "Wei Zhang" is one match rather than "wei" and "zhang".
+        """
+        if self._longest_name is None:
+            self._longest_name = max((alias.count("-") + 1 for kind, alias in self.slugs if kind == "name"),
+                                     default=1)
+        words = name_key(title).split("-")
+        matched, seen = [], set()
+        i = 0
+        while i < len(words):
+            for n in range(min(self._longest_name, len(words) - i), 0, -1):
+                alias = "-".join(words[i:i + n])
+                kind = "name" if n > 1 else "part"
+                if len(alias) > 2 and (kind, alias) in self.slugs:
+                    break
+            else:
+                i += 1
+                continue
+            i += n
+            slug = self.lookup(kind, alias)
+            if slug and slug not in seen:
+                seen.add(slug)
+                matched.append({"name": slug.replace("-", " ").title(), "email": "", "_inferred": True})
+        return matched
@@ -11,50 +11,370 @@ Usage:
     python3 scripts/query-graph.py [brain-root] connections <entity-name>
     python3 scripts/query-graph.py [brain-root] person <name>
     python3 scripts/query-graph.py [brain-root] thread <name>
-    python3 scripts/query-graph.py [brain-root] timeline <entity-name>
+    python3 scripts/query-graph.py [brain-root] timeline <entity-name> [--since DATE] [--until DATE] [--limit N] [--after CURSOR]
+    python3 scripts/query-graph.py [brain-root] search <query> [--type T,..] [--limit N] [--after CURSOR]
     python3 scripts/query-graph.py [brain-root] stats
+    python3 scripts/query-graph.py [brain-root] neighborhood <entity-name> [--depth N] [--rel T,..] [--type T,..]
+    python3 scripts/query-graph.py [brain-root] path <entity-name> --to "<entity-name>" [--depth N] [--rel T,..]
+    python3 scripts/query-graph.py [brain-root] resolve <name> [--type T] [--limit N]
+    python3 scripts/query-graph.py [brain-root] serve
+
+Names resolve to the best-ranked entity: exact slug, exact name, name
+prefix, substring, then a fuzzy match for typos; `resolve` lists them.
+
+Add `--format json` (one object per command) or `--format ndjson` (one
+line per record, tagged with its "section") for machine-readable output.
+
+`serve` keeps a warm connection open in a long-lived process listening on
+<brain-root>/.brain.sock. While it runs, the other commands are forwarded to
+it instead of opening the database themselves; without it they run locally.
 """
 
+# Forwarding a command to `serve` needs only these. Everything else is
+# imported after the forward is tried (hence the quoted annotations below),
+# so while a server runs a call costs little more than starting Python.
 import json
 import os
-import sqlite3
+import socket
 import sys
+
+SOCKET_NAME = ".brain.sock"
+
+
+def brain_root() -> str:
+    if len(sys.argv) > 2 and not sys.argv[1].startswith("--"):
+        return sys.argv[1]
+    return os.path.join(os.path.expanduser("~"), "brain")
+
+
+def command_args(argv: "List[str]") -> "List[str]":
+    """The command's words: argv without the script and any brain-root directory."""
+    args = argv[1:]
+    if args and not args[0].startswith("--") and os.path.isdir(args[0]):
+        args = args[1:]
+    return args
+
+
+def forward(args: "List[str]", socket_path: "Optional[str]" = None) -> "Optional[dict]":
+    """Send a command to a running `serve` process; None if there isn't one."""
+    socket_path = str(socket_path or SOCKET_PATH)
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({"args": args}).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    return json.loads(line) if line else None
+
+
+def forward_command() -> None:
+    """Hand the command line to a running `serve` and exit with its reply; returns if there is none."""
+    args = command_args(sys.argv)
+    if not args or args[0] == "serve":
+        return
+    reply = forward(args, os.path.join(brain_root(), SOCKET_NAME))
+    if reply is not None:
+        sys.stdout.write(reply["stdout"])
+        sys.stderr.write(reply["stderr"])
+        sys.exit(reply["code"])
+
+
+if __name__ == "__main__":
+    forward_command()
+
+import io
+import math
+import re
+import signal
+import socketserver
+import sqlite3
+from collections import Counter
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-BRAIN_ROOT = Path(sys.argv[1]) if len(sys.argv) > 2 and not sys.argv[1].startswith("--") else Path.home() / "brain"
+import brain_search
+
+BRAIN_ROOT = Path(brain_root())
 DB_PATH = BRAIN_ROOT / ".brain.db"
+SOCKET_PATH = BRAIN_ROOT / SOCKET_NAME
+
+# Oldest index schema (indexer.py SCHEMA_VERSION) these queries work against
+MIN_SCHEMA_VERSION = 8
+
+_conn = None
+_conn_id = None
 
 
 def get_conn():
+    """Return the shared connection, reopening it if the database was replaced.
+
+    Reusing one connection keeps sqlite3's statement cache warm, so repeated
+    queries in `serve` mode skip re-preparing their SQL. A --full re-index
+    swaps in a new file, which shows up as a new inode.
+    """
+    global _conn, _conn_id
     if not DB_PATH.exists():
         print(f"Error: Database not found at {DB_PATH}", file=sys.stderr)
         print("Run: python3 scripts/indexer.py", file=sys.stderr)
         sys.exit(1)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+    st = DB_PATH.stat()
+    conn_id = (st.st_dev, st.st_ino)
+    if _conn is None or _conn_id != conn_id:
+        if _conn is not None:
+            _conn.close()
+        _conn = sqlite3.connect(str(DB_PATH), cached_statements=256)
+        _conn.row_factory = sqlite3.Row
+        _conn_id = conn_id
+        try:
+            row = _conn.execute("SELECT value FROM indexer_meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if not row or int(row[0]) < MIN_SCHEMA_VERSION:
+            _conn.close()
+            _conn = None
+            print(f"Error: {DB_PATH} was built by an older indexer", file=sys.stderr)
+            print("Run: python3 scripts/indexer.py (upgrades it in place)", file=sys.stderr)
+            sys.exit(1)
+    return _conn
+
+
+def row_dict(row) -> dict:
+    """A result row as a plain dict, with any metadata JSON decoded."""
+    record = dict(row)
+    if isinstance(record.get("metadata"), str):
+        record["metadata"] = json.loads(record["metadata"])
+    return record
+
+
+class TextEmitter:
+    """The human-readable output: each command supplies its own line format."""
+
+    def object(self, key: str, obj, text: Callable):
+        print(text(obj))
+
+    def rows(self, key: str, rows: Iterable, line: Callable, heading: Optional[str] = None,
+             gap: bool = True, always: bool = False, empty: Optional[str] = None) -> int:
+        """Print rows under a heading.
+
+        With no rows, print nothing (just the heading if `always`, or the
+        `empty` message if given).
+        """
+        count = 0
+        if always and heading is not None:
+            print(heading)
+        for row in rows:
+            if count == 0 and heading is not None and not always:
+                print(heading)
+            print(line(row_dict(row)))
+            count += 1
+        if (count or always) and gap:
+            print()
+        if not count and empty is not None:
+            print(empty)
+        return count
+
+    def missing(self, key: str, message: str):
+        print(message)
+
+    def close(self):
+        pass
+
+
+class JsonEmitter:
+    """One JSON object per command, written as rows come off the cursor."""
+
+    def __init__(self):
+        self.started = False
+
+    def key(self, key: str):
+        sys.stdout.write(", " if self.started else "{")
+        sys.stdout.write(f"{json.dumps(key)}: ")
+        self.started = True
+
+    def object(self, key: str, obj, text: Callable):
+        self.key(key)
+        sys.stdout.write(json.dumps(obj))
+
+    def rows(self, key: str, rows: Iterable, line: Callable, heading: Optional[str] = None,
+             gap: bool = True, always: bool = False, empty: Optional[str] = None) -> int:
+        self.key(key)
+        count = 0
+        for row in rows:
+            sys.stdout.write(",\n  " if count else "[\n  ")
+            sys.stdout.write(json.dumps(row_dict(row)))
+            count += 1
+        sys.stdout.write("\n]" if count else "[]")
+        return count
+
+    def missing(self, key: str, message: str):
+        self.key(key)
+        sys.stdout.write("null")
+
+    def close(self):
+        sys.stdout.write("}\n" if self.started else "{}\n")
+
+
+class NdjsonEmitter:
+    """One JSON line per record, tagged with the section it belongs to."""
+
+    def object(self, key: str, obj, text: Callable):
+        record = obj if isinstance(obj, dict) else {"value": obj}
+        print(json.dumps({"section": key, **record}))
+
+    def rows(self, key: str, rows: Iterable, line: Callable, heading: Optional[str] = None,
+             gap: bool = True, always: bool = False, empty: Optional[str] = None) -> int:
+        count = 0
+        for row in rows:
+            print(json.dumps({"section": key, **row_dict(row)}))
+            count += 1
+        return count
+
+    def missing(self, key: str, message: str):
+        pass
+
+    def close(self):
+        pass
+
+
+EMITTERS = {
+    "text": TextEmitter,
+    "json": JsonEmitter,
+    "ndjson": NdjsonEmitter,
+}
+
+
+def entity_text(entity: dict, heading: Optional[str] = None) -> str:
+    """The '=== Name ===' header plus one line per metadata field."""
+    lines = [heading or f"=== {entity['name']} ==="]
+    lines += [f"  {k}: {v}" for k, v in (entity["metadata"] or {}).items()]
+    return "\n".join(lines) + "\n"
+
+
+def trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two trigram sets."""
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def fts_phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+# Trigram similarity below which a fuzzy candidate is not considered a match
+FUZZY_THRESHOLD = 0.3
+# Most candidates scored for one fuzzy lookup
+FUZZY_CANDIDATES = 200
+
 
+def rank_entities(conn, name: str, entity_type: Optional[str] = None, limit: int = 10) -> List[dict]:
+    """Candidate entities for `name`, best first, from indexed lookups only.
 
-def cmd_connections(name):
+    Tiers, in order: exact slug, exact name (case-insensitive), name prefix,
+    substring of name or slug, then fuzzy (trigram similarity) for typos.
+    Within a tier, shorter names come first, then alphabetical, then id, so
+    the same query always resolves to the same entity.
+    """
+    name = name.strip()
+    if not name:
+        return []
+    type_sql, type_params = ("", []) if entity_type is None else (" AND e.type = ?", [entity_type])
+    order = " ORDER BY length(e.name), e.name COLLATE NOCASE, e.id LIMIT ?"
+    prefix = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    tiers = [
+        ("slug", "SELECT e.* FROM entities e WHERE e.slug = ?", [name.lower().replace(" ", "-")]),
+        ("name", "SELECT e.* FROM entities e WHERE e.name = ? COLLATE NOCASE", [name]),
+        ("prefix", "SELECT e.* FROM entities e WHERE e.name LIKE ? ESCAPE '\\'", [prefix + "%"]),
+    ]
+    if len(name) >= 3:
+        tiers.append(("substring", "SELECT e.* FROM entity_search s JOIN entities e ON e.id = s.rowid "
+                                   "WHERE entity_search MATCH ?", [fts_phrase(name)]))
+    else:
+        # Too short for trigrams; short names are rare enough to scan for
+        tiers.append(("substring", "SELECT e.* FROM entities e WHERE e.name LIKE ? OR e.slug LIKE ?",
+                      [f"%{name}%", f"%{name}%"]))
+
+    ranked, seen = [], set()
+    for match, sql, params in tiers:
+        for row in conn.execute(sql + type_sql + order, params + type_params + [limit]):
+            if row["id"] not in seen and len(ranked) < limit:
+                seen.add(row["id"])
+                ranked.append({**row_dict(row), "match": match})
+        if len(ranked) >= limit:
+            return ranked
+
+    grams = trigrams(name)
+    if ranked or not grams:
+        return ranked
+    # Fuzzy: a candidate at the similarity threshold shares at least `need`
+    # of the query's trigrams that exist in the index, so it must contain
+    # one of the (existing - need + 1) rarest. Looking up only those keeps
+    # common trigrams from matching half the table.
+    need = max(1, math.ceil(FUZZY_THRESHOLD * len(grams)))
+    counts = dict(conn.execute(
+        "SELECT term, doc FROM entity_search_vocab WHERE term IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(grams)),)
+    ).fetchall())
+    present = sorted((g for g in grams if g in counts), key=lambda g: (counts[g], g))
+    probe = present[:len(present) - need + 1]
+    if not probe:
+        return ranked
+    hits = Counter()
+    for gram in probe:
+        hits.update(row[0] for row in conn.execute(
+            "SELECT rowid FROM entity_search WHERE entity_search MATCH ?", (fts_phrase(gram),)))
+    pool = sorted(hits, key=lambda rowid: (-hits[rowid], rowid))[:FUZZY_CANDIDATES]
+    rows = conn.execute(
+        "SELECT e.* FROM entities e WHERE e.id IN (SELECT value FROM json_each(?))" + type_sql,
+        [json.dumps(pool)] + type_params,
+    )
+    scored = []
+    for row in rows:
+        score = max(similarity(grams, trigrams(row["name"])),
+                    similarity(grams, trigrams(row["slug"] or "")))
+        if score >= FUZZY_THRESHOLD:
+            scored.append((-score, len(row["name"]), row["name"].lower(), row["id"], row))
+    for *_, row in sorted(scored)[:limit]:
+        ranked.append({**row_dict(row), "match": "fuzzy"})
+    return ranked
+
+
+def find_entity(conn, name: str, entity_type: Optional[str] = None) -> Optional[dict]:
+    """The best-ranked entity for `name`, or None."""
+    ranked = rank_entities(conn, name, entity_type, limit=1)
+    return ranked[0] if ranked else None
+
+
+def cmd_connections(name, out):
     """Show all entities connected to the given entity."""
     conn = get_conn()
 
     # Find the entity
-    entity = conn.execute(
-        "SELECT * FROM entities WHERE name LIKE ? OR slug LIKE ?",
-        (f"%{name}%", f"%{name}%")
-    ).fetchone()
+    entity = find_entity(conn, name)
 
     if not entity:
-        print(f"No entity found matching '{name}'")
+        out.missing("entity", f"No entity found matching '{name}'")
         return
 
-    print(f"=== {entity['name']} ({entity['type']}) ===")
-    if entity['metadata']:
-        meta = json.loads(entity['metadata'])
-        for k, v in meta.items():
-            print(f"  {k}: {v}")
-    print()
+    out.object("entity", entity,
+               lambda e: entity_text(e, f"=== {e['name']} ({e['type']}) ==="))
+
+    def line(arrow):
+        def fmt(row):
+            ctx = f" — {row['context']}" if row['context'] else ""
+            return f"  {arrow} {row['name']} ({row['type']}) [{row['rel_type']}]{ctx}"
+        return fmt
 
     # Outgoing relationships
     outgoing = conn.execute("""
@@ -63,14 +383,8 @@ def cmd_connections(name):
         JOIN entities e2 ON r.target_id = e2.id
         WHERE r.source_id = ?
         ORDER BY e2.type, e2.name
-    """, (entity['id'],)).fetchall()
-
-    if outgoing:
-        print("Connects to:")
-        for row in outgoing:
-            ctx = f" — {row['context']}" if row['context'] else ""
-            print(f"  → {row['name']} ({row['type']}) [{row['rel_type']}]{ctx}")
-        print()
+    """, (entity['id'],))
+    out.rows("outgoing", outgoing, line("→"), "Connects to:")
 
     # Incoming relationships
     incoming = conn.execute("""
@@ -79,34 +393,25 @@ def cmd_connections(name):
         JOIN entities e1 ON r.source_id = e1.id
         WHERE r.target_id = ?
         ORDER BY e1.type, e1.name
-    """, (entity['id'],)).fetchall()
+    """, (entity['id'],))
+    out.rows("incoming", incoming, line("←"), "Referenced by:", gap=False)
 
-    if incoming:
-        print("Referenced by:")
-        for row in incoming:
-            ctx = f" — {row['context']}" if row['context'] else ""
-            print(f"  ← {row['name']} ({row['type']}) [{row['rel_type']}]{ctx}")
 
-
-def cmd_person(name):
+def cmd_person(name, out):
     """Show full context for a person: their threads, meetings, connections."""
     conn = get_conn()
 
-    person = conn.execute(
-        "SELECT * FROM entities WHERE type = 'person' AND (name LIKE ? OR slug LIKE ?)",
-        (f"%{name}%", f"%{name}%")
-    ).fetchone()
+    person = find_entity(conn, name, "person")
 
     if not person:
-        print(f"No person found matching '{name}'")
+        out.missing("person", f"No person found matching '{name}'")
         return
 
-    print(f"=== {person['name']} ===")
-    if person['metadata']:
-        meta = json.loads(person['metadata'])
-        for k, v in meta.items():
-            print(f"  {k}: {v}")
-    print()
+    out.object("person", person, entity_text)
+
+    def thread_line(t):
+        status = (t['metadata'] or {}).get('status')
+        return f"  • {t['name']}" + (f" [{status}]" if status else "")
 
     # What threads are they connected to?
     threads = conn.execute("""
@@ -119,52 +424,33 @@ def cmd_person(name):
         FROM relationships r
         JOIN entities e1 ON r.source_id = e1.id
         WHERE r.target_id = ? AND e1.type = 'thread'
-    """, (person['id'], person['id'])).fetchall()
-
-    if threads:
-        print("Threads:")
-        for t in threads:
-            status = ""
-            if t['metadata']:
-                meta = json.loads(t['metadata'])
-                status = f" [{meta.get('status', '')}]" if meta.get('status') else ""
-            print(f"  • {t['name']}{status}")
-        print()
-
-    # What meetings reference them?
+    """, (person['id'], person['id']))
+    out.rows("threads", threads, thread_line, "Threads:")
+
+    # What meetings reference them? (person -> meeting edges from the indexer)
     meetings = conn.execute("""
         SELECT DISTINCT d.path, d.title
-        FROM documents d
-        WHERE d.type = 'meeting'
-        AND d.content LIKE ?
+        FROM relationships r
+        JOIN documents d ON d.id = r.source_document_id
+        WHERE r.source_id = ? AND r.type IN ('attended', 'mentioned_in')
+        AND d.type = 'meeting'
         ORDER BY d.path DESC
-    """, (f"%{person['name']}%",)).fetchall()
-
-    if meetings:
-        print("Meetings:")
-        for m in meetings:
-            print(f"  • {m['title']} ({m['path']})")
+    """, (person['id'],))
+    out.rows("meetings", meetings, lambda m: f"  • {m['title']} ({m['path']})",
+             "Meetings:", gap=False)
 
 
-def cmd_thread(name):
+def cmd_thread(name, out):
     """Show full context for a thread: people involved, meetings, status."""
     conn = get_conn()
 
-    thread = conn.execute(
-        "SELECT * FROM entities WHERE type = 'thread' AND (name LIKE ? OR slug LIKE ?)",
-        (f"%{name}%", f"%{name}%")
-    ).fetchone()
+    thread = find_entity(conn, name, "thread")
 
     if not thread:
-        print(f"No thread found matching '{name}'")
+        out.missing("thread", f"No thread found matching '{name}'")
         return
 
-    print(f"=== {thread['name']} ===")
-    if thread['metadata']:
-        meta = json.loads(thread['metadata'])
-        for k, v in meta.items():
-            print(f"  {k}: {v}")
-    print()
+    out.object("thread", thread, entity_text)
 
     # Related threads
     related = conn.execute("""
@@ -172,13 +458,12 @@ def cmd_thread(name):
         FROM relationships r
         JOIN entities e2 ON r.target_id = e2.id
         WHERE r.source_id = ? AND e2.type = 'thread'
-    """, (thread['id'],)).fetchall()
+    """, (thread['id'],))
+    out.rows("related_threads", related, lambda t: f"  • {t['name']}", "Related threads:")
 
-    if related:
-        print("Related threads:")
-        for t in related:
-            print(f"  • {t['name']}")
-        print()
+    def meeting_line(m):
+        date = (m['metadata'] or {}).get('date')
+        return f"  • {m['name']}" + (f" ({date})" if date else "")
 
     # Meetings that mention this thread
     meetings = conn.execute("""
@@ -186,17 +471,8 @@ def cmd_thread(name):
         FROM relationships r
         JOIN entities e1 ON r.source_id = e1.id
         WHERE r.target_id = ? AND e1.type = 'meeting'
-    """, (thread['id'],)).fetchall()
-
-    if meetings:
-        print("Discussed in:")
-        for m in meetings:
-            date = ""
-            if m['metadata']:
-                meta = json.loads(m['metadata'])
-                date = f" ({meta.get('date', '')})" if meta.get('date') else ""
-            print(f"  • {m['name']}{date}")
-        print()
+    """, (thread['id'],))
+    out.rows("meetings", meetings, meeting_line, "Discussed in:")
 
     # People connected to this thread
     people = conn.execute("""
@@ -209,109 +485,480 @@ def cmd_thread(name):
         FROM relationships r
         JOIN entities e2 ON r.target_id = e2.id
         WHERE r.source_id = ? AND e2.type = 'person'
-    """, (thread['id'], thread['id'])).fetchall()
+    """, (thread['id'], thread['id']))
+    out.rows("people", people, lambda p: f"  • {p['name']}", "People involved:", gap=False)
+
+
+TIMELINE_PAGE = 20
+SNIPPET_WIDTH = 120
+
+
+def parse_date(value: Optional[str], option: str) -> Optional[str]:
+    if value is not None and not re.fullmatch(r"\d{4}-\d{2}-\d{2}", value):
+        print(f"Error: --{option} must be a YYYY-MM-DD date", file=sys.stderr)
+        sys.exit(1)
+    return value
+
+
+def parse_cursor(value: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    """A timeline --after cursor, DATE:DOCUMENT:OFFSET, as printed at the end of a page."""
+    if value is None:
+        return None
+    match = re.fullmatch(r"(\d{4}-\d{2}-\d{2}):(\d+):(\d+)", value)
+    if not match:
+        print("Error: --after must be a cursor from a previous page (DATE:DOCUMENT:OFFSET)",
+              file=sys.stderr)
+        sys.exit(1)
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def snippet_at(text: str, offset: int) -> str:
+    """The line of text around offset, clipped to SNIPPET_WIDTH."""
+    start = text.rfind("\n", 0, offset) + 1
+    end = text.find("\n", offset)
+    line = text[start:end if end >= 0 else len(text)].strip()
+    return line if len(line) <= SNIPPET_WIDTH else line[:SNIPPET_WIDTH - 3] + "..."
 
-    if people:
-        print("People involved:")
-        for p in people:
-            print(f"  • {p['name']}")
 
+def cmd_timeline(name, out, since=None, until=None, limit=None, after=None):
+    """Show an entity's dated mentions across all documents, oldest first.
 
-def cmd_timeline(name):
-    """Show chronological mentions of an entity across all documents."""
+    Pages come straight off the (entity_id, date, document_id, offset) index:
+    each ends with a cursor, and --after resumes from it without re-reading
+    the mentions before it, however many there are.
+    """
     conn = get_conn()
+    since, until = parse_date(since, "since"), parse_date(until, "until")
+    cursor = parse_cursor(after)
+    count = int(limit) if limit and limit.isdigit() and int(limit) > 0 else TIMELINE_PAGE
 
-    # Search across all documents for mentions
-    results = conn.execute("""
-        SELECT type, path, title, snippet(search_index, 1, '>>>', '<<<', '...', 40) as snippet
-        FROM search_index
-        WHERE search_index MATCH ?
-        ORDER BY path
-        LIMIT 20
-    """, (name,)).fetchall()
-
-    if not results:
-        print(f"No mentions found for '{name}'")
+    entity = find_entity(conn, name)
+    if not entity:
+        out.missing("entity", f"No mentions found for '{name}'")
         return
 
-    print(f"=== Timeline: {name} ===\n")
-    for row in results:
-        print(f"[{row['type']}] {row['title']}")
-        print(f"  {row['path']}")
-        print(f"  {row['snippet']}")
-        print()
+    conditions, params = ["m.entity_id = ?"], [entity["id"]]
+    if since:
+        conditions.append("m.date >= ?")
+        params.append(since)
+    if until:
+        conditions.append("m.date <= ?")
+        params.append(until)
+    if cursor:
+        conditions.append("(m.date, m.document_id, m.offset) > (?, ?, ?)")
+        params.extend(cursor)
+    rows = conn.execute(f"""
+        SELECT m.date, m.document_id, m.offset, d.type, d.path, d.title,
+               max(0, m.offset - {SNIPPET_WIDTH}) as context_start,
+               substr(d.content, max(0, m.offset - {SNIPPET_WIDTH}) + 1, {2 * SNIPPET_WIDTH}) as context
+        FROM mentions m
+        JOIN documents d ON d.id = m.document_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY m.date, m.document_id, m.offset
+        LIMIT ?
+    """, params + [count + 1]).fetchall()
+
+    page = []
+    for row in rows[:count]:
+        mention = dict(row)
+        context, start = mention.pop("context"), mention.pop("context_start")
+        mention["snippet"] = snippet_at(context, mention["offset"] - start)
+        page.append(mention)
+
+    out.object("entity", entity, lambda e: f"=== Timeline: {e['name']} ({e['type']}) ===\n")
+    out.rows(
+        "mentions", page,
+        lambda m: f"{m['date']} [{m['type']}] {m['title']}\n  {m['path']}\n  {m['snippet']}\n",
+        gap=False, empty=f"No mentions found for '{name}'",
+    )
+    if len(rows) > count:
+        last = page[-1]
+        out.object("next", f"{last['date']}:{last['document_id']}:{last['offset']}",
+                   lambda c: f"More: --after {c}")
+
+
+def cmd_search(query, out, type=None, limit=None, after=None):
+    """Show documents matching a full-text query, best first, a page at a time."""
+    conn = get_conn()
+    count = int(limit) if limit and limit.isdigit() and int(limit) > 0 else brain_search.PAGE_SIZE
+    try:
+        results, cursor = brain_search.search(conn, query, parse_list(type), count, after)
+    except ValueError:
+        print("Error: --after must be a cursor from a previous page", file=sys.stderr)
+        sys.exit(1)
+
+    out.rows(
+        "results", results,
+        lambda row: f"[{row['type']}] {row['title']}\n  {row['path']}\n  {row['snippet']}\n",
+        f"=== Search: {query} ===\n", gap=False, empty=f"No documents found for '{query}'",
+    )
+    if cursor:
+        out.object("next", cursor, lambda c: f"More: --after {c}")
 
 
-def cmd_stats():
+def cmd_stats(out):
     """Show overall graph statistics."""
     conn = get_conn()
 
-    doc_count = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
-    entity_count = conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
-    rel_count = conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0]
-
-    print(f"=== Brain Graph Stats ===")
-    print(f"  Documents: {doc_count}")
-    print(f"  Entities:  {entity_count}")
-    print(f"  Relations: {rel_count}")
-    print()
+    totals = {
+        "documents": conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+        "entities": conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0],
+        "relations": conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0],
+    }
+    out.object("totals", totals, lambda t: (
+        f"=== Brain Graph Stats ===\n"
+        f"  Documents: {t['documents']}\n"
+        f"  Entities:  {t['entities']}\n"
+        f"  Relations: {t['relations']}\n"
+    ))
 
     # Breakdown by type
-    print("Documents by type:")
-    for row in conn.execute("SELECT type, COUNT(*) as n FROM documents GROUP BY type ORDER BY n DESC"):
-        print(f"  {row['type']}: {row['n']}")
-    print()
-
-    print("Entities by type:")
-    for row in conn.execute("SELECT type, COUNT(*) as n FROM entities GROUP BY type ORDER BY n DESC"):
-        print(f"  {row['type']}: {row['n']}")
-    print()
-
-    # Most connected entities
-    print("Most connected entities:")
-    for row in conn.execute("""
-        SELECT e.name, e.type,
-            (SELECT COUNT(*) FROM relationships WHERE source_id = e.id) +
-            (SELECT COUNT(*) FROM relationships WHERE target_id = e.id) as connections
-        FROM entities e
-        ORDER BY connections DESC
+    by_type = lambda row: f"  {row['type']}: {row['n']}"
+    out.rows("documents_by_type", conn.execute(
+        "SELECT type, COUNT(*) as n FROM documents GROUP BY type ORDER BY n DESC"
+    ), by_type, "Documents by type:", always=True)
+    out.rows("entities_by_type", conn.execute(
+        "SELECT type, COUNT(*) as n FROM entities GROUP BY type ORDER BY n DESC"
+    ), by_type, "Entities by type:", always=True)
+
+    # Most connected entities, from the degree counts the indexer keeps
+    out.rows("most_connected", conn.execute("""
+        SELECT e.name, e.type, d.degree as connections
+        FROM entity_degree d
+        JOIN entities e ON e.id = d.entity_id
+        WHERE d.type = '*'
+        ORDER BY d.degree DESC
+        LIMIT 10
+    """), lambda row: f"  {row['name']} ({row['type']}): {row['connections']} connections",
+        "Most connected entities:", gap=False, always=True)
+
+    # Only present once the indexer has been run with --pagerank
+    out.rows("most_central", conn.execute("""
+        SELECT e.name, e.type, d.pagerank
+        FROM entity_degree d
+        JOIN entities e ON e.id = d.entity_id
+        WHERE d.pagerank IS NOT NULL
+        ORDER BY d.pagerank DESC
         LIMIT 10
-    """):
-        print(f"  {row['name']} ({row['type']}): {row['connections']} connections")
+    """), lambda row: f"  {row['name']} ({row['type']}): {row['pagerank']:.4f}",
+        "\nMost central entities (PageRank):", gap=False)
 
     # Last indexed
     meta = conn.execute("SELECT value FROM indexer_meta WHERE key = 'last_indexed'").fetchone()
     if meta:
-        print(f"\nLast indexed: {meta[0]}")
+        out.object("last_indexed", meta[0], lambda value: f"\nLast indexed: {value}")
 
 
-def main():
-    args = sys.argv[1:]
-    # Skip brain root arg if it's a path
-    if args and not args[0].startswith("--") and os.path.isdir(args[0]):
-        args = args[1:]
+def cmd_resolve(name, out, type=None, limit=None):
+    """Show the ranked candidates a name resolves to, best first."""
+    conn = get_conn()
+    count = int(limit) if limit and limit.isdigit() else 10
+    candidates = rank_entities(conn, name, type, count)
+    out.rows("candidates", candidates,
+             lambda e: f"  {e['name']} ({e['type']}) [{e['match']}]",
+             f"=== Candidates: {name} ===", gap=False,
+             empty=f"No entity found matching '{name}'")
 
-    if not args:
-        print(__doc__)
-        sys.exit(0)
 
-    command = args[0]
-    query = " ".join(args[1:]) if len(args) > 1 else ""
+MAX_DEPTH = 6
+
+
+def parse_depth(value: Optional[str], default: int) -> int:
+    if value is None:
+        return default
+    if not value.isdigit() or not 1 <= int(value) <= MAX_DEPTH:
+        print(f"Error: --depth must be between 1 and {MAX_DEPTH}", file=sys.stderr)
+        sys.exit(1)
+    return int(value)
+
+
+def parse_list(value: Optional[str]) -> List[str]:
+    """A comma-separated option value, e.g. --rel mentioned_in,attended."""
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+def rel_filter(rel_types: List[str], alias: str = "r") -> Tuple[str, list]:
+    """SQL condition (and its params) restricting edges to `rel_types`."""
+    if not rel_types:
+        return "", []
+    return f" AND {alias}.type IN ({','.join('?' * len(rel_types))})", list(rel_types)
 
-    if command == "connections":
-        cmd_connections(query)
-    elif command == "person":
-        cmd_person(query)
-    elif command == "thread":
-        cmd_thread(query)
-    elif command == "timeline":
-        cmd_timeline(query)
-    elif command == "stats":
-        cmd_stats()
+
+def cmd_neighborhood(name, out, depth=None, rel=None, type=None):
+    """Show every entity within --depth hops, ignoring edge direction.
+
+    One recursive CTE walks the graph level by level. UNION keeps each
+    (entity, depth) pair once, so a level costs one indexed lookup per
+    entity on it rather than one per path leading there.
+    """
+    conn = get_conn()
+    max_depth = parse_depth(depth, 2)
+    rel_types, entity_types = parse_list(rel), parse_list(type)
+
+    entity = find_entity(conn, name)
+    if not entity:
+        out.missing("entity", f"No entity found matching '{name}'")
+        return
+
+    out.object("entity", entity, lambda e: f"=== Neighborhood: {e['name']} ({e['type']}), "
+                                           f"depth {max_depth} ===\n")
+
+    edge_sql, edge_params = rel_filter(rel_types)
+    type_sql = ""
+    if entity_types:
+        type_sql = f" AND e.type IN ({','.join('?' * len(entity_types))})"
+    rows = conn.execute(f"""
+        WITH RECURSIVE reach(id, depth) AS (
+            SELECT ?, 0
+            UNION
+            SELECT r.target_id, reach.depth + 1
+            FROM reach JOIN relationships r ON r.source_id = reach.id
+            WHERE reach.depth < ?{edge_sql}
+            UNION
+            SELECT r.source_id, reach.depth + 1
+            FROM reach JOIN relationships r ON r.target_id = reach.id
+            WHERE reach.depth < ?{edge_sql}
+        )
+        SELECT e.id, e.name, e.type, MIN(reach.depth) AS depth
+        FROM reach JOIN entities e ON e.id = reach.id
+        WHERE e.id != ?{type_sql}
+        GROUP BY e.id
+        ORDER BY depth, e.type, e.name
+    """, [entity["id"], max_depth, *edge_params, max_depth, *edge_params,
+          entity["id"], *entity_types])
+    out.rows("neighbors", rows,
+             lambda row: f"  [{row['depth']}] {row['name']} ({row['type']})",
+             gap=False, empty="No connected entities")
+
+
+def expand(conn, frontier: List[int], rel_types: List[str]):
+    """Every edge touching `frontier`, as (from_id, to_id, rel_type, forward)."""
+    edge_sql, edge_params = rel_filter(rel_types)
+    ids = json.dumps(frontier)
+    return conn.execute(f"""
+        SELECT r.source_id, r.target_id, r.type, 1 FROM relationships r
+        WHERE r.source_id IN (SELECT value FROM json_each(?)){edge_sql}
+        UNION ALL
+        SELECT r.target_id, r.source_id, r.type, 0 FROM relationships r
+        WHERE r.target_id IN (SELECT value FROM json_each(?)){edge_sql}
+    """, [ids, *edge_params, ids, *edge_params])
+
+
+def shortest_path(conn, start: int, goal: int, max_depth: int,
+                  rel_types: List[str]) -> Optional[List[Tuple[int, Optional[str], bool]]]:
+    """Bidirectional BFS; returns [(entity_id, rel_type, forward), ...] or None.
+
+    Each step expands whichever side has the smaller frontier with a single
+    indexed query, so the work is bounded by the entities actually visited
+    rather than by the size of the graph. rel_type/forward describe the edge
+    leading into each entity (None for the start).
+    """
+    if start == goal:
+        return [(start, None, True)]
+    # entity -> (previous entity, rel_type, edge points away from start)
+    parents = [{start: None}, {goal: None}]
+    frontiers = [[start], [goal]]
+    for _ in range(max_depth):
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen, other = parents[side], parents[1 - side]
+        next_frontier, meet = [], None
+        for from_id, to_id, rel_type, forward in expand(conn, frontiers[side], rel_types):
+            if to_id in seen:
+                continue
+            # Seen from the goal side, an edge's direction relative to the start flips
+            seen[to_id] = (from_id, rel_type, bool(forward) == (side == 0))
+            next_frontier.append(to_id)
+            if to_id in other:
+                meet = to_id
+                break
+        if meet is not None:
+            break
+        if not next_frontier:
+            return None
+        frontiers[side] = next_frontier
     else:
+        return None
+
+    # Walk back to the start, then forward to the goal
+    steps = []
+    node = meet
+    while node is not None:
+        link = parents[0][node]
+        steps.append((node, link))
+        node = link[0] if link else None
+    steps.reverse()
+    path = [(node, link[1] if link else None, link[2] if link else True) for node, link in steps]
+    node = meet
+    while parents[1][node] is not None:
+        prev, rel_type, forward = parents[1][node]
+        path.append((prev, rel_type, forward))
+        node = prev
+    return path
+
+
+def cmd_path(name, out, to=None, depth=None, rel=None):
+    """Show the shortest chain of relationships between two entities."""
+    conn = get_conn()
+    if not to:
+        print("Usage: query-graph.py path <entity> --to <entity>", file=sys.stderr)
+        sys.exit(1)
+    max_depth = parse_depth(depth, MAX_DEPTH)
+
+    ends = []
+    for key, query in (("from", name), ("to", to)):
+        entity = find_entity(conn, query)
+        if not entity:
+            out.missing(key, f"No entity found matching '{query}'")
+            return
+        ends.append(entity)
+
+    path = shortest_path(conn, ends[0]["id"], ends[1]["id"], max_depth, parse_list(rel))
+    names = {}
+    if path:
+        ids = json.dumps([node for node, _, _ in path])
+        names = {row["id"]: row for row in conn.execute(
+            "SELECT id, name, type FROM entities WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+        )}
+    steps = [
+        {"step": i, "id": node, "name": names[node]["name"], "type": names[node]["type"],
+         "rel_type": rel_type, "direction": None if rel_type is None else ("out" if forward else "in")}
+        for i, (node, rel_type, forward) in enumerate(path or [])
+    ]
+
+    def line(step):
+        entity = f"{step['name']} ({step['type']})"
+        if step["rel_type"] is None:
+            return f"  {entity}"
+        arrow = f"—[{step['rel_type']}]→" if step["direction"] == "out" else f"←[{step['rel_type']}]—"
+        return f"    {arrow} {entity}"
+
+    hops = max(len(steps) - 1, 0)
+    out.rows("path", steps, line,
+             f"=== Path: {ends[0]['name']} → {ends[1]['name']} ({hops} hop{'s' if hops != 1 else ''}) ===",
+             gap=False,
+             empty=f"No path between '{ends[0]['name']}' and '{ends[1]['name']}' "
+                   f"within {max_depth} hops")
+
+
+COMMANDS = {
+    "connections": cmd_connections,
+    "person": cmd_person,
+    "thread": cmd_thread,
+    "timeline": cmd_timeline,
+    "search": cmd_search,
+    "stats": lambda query, out: cmd_stats(out),
+    "neighborhood": cmd_neighborhood,
+    "path": cmd_path,
+    "resolve": cmd_resolve,
+}
+
+# Options each command accepts besides --format, passed as keyword arguments
+COMMAND_OPTIONS = {
+    "timeline": {"since", "until", "limit", "after"},
+    "search": {"type", "limit", "after"},
+    "neighborhood": {"depth", "rel", "type"},
+    "path": {"to", "depth", "rel"},
+    "resolve": {"type", "limit"},
+}
+
+
+def split_options(args: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """Separate `--name value` / `--name=value` options from the other words."""
+    options, rest = {}, []
+    i = 0
+    while i < len(args):
+        if args[i].startswith("--") and "=" in args[i]:
+            name, value = args[i][2:].split("=", 1)
+            options[name] = value
+        elif args[i].startswith("--") and i + 1 < len(args):
+            options[args[i][2:]] = args[i + 1]
+            i += 1
+        else:
+            rest.append(args[i])
+        i += 1
+    return options, rest
+
+
+def run_command(args: List[str]):
+    """Run one query command; exits non-zero on errors, like the CLI."""
+    options, args = split_options(args)
+    fmt = options.pop("format", "text")
+    if fmt not in EMITTERS:
+        print(f"Error: --format must be one of {', '.join(EMITTERS)}", file=sys.stderr)
+        sys.exit(1)
+    command = args[0] if args else ""
+    query = " ".join(args[1:]) if len(args) > 1 else ""
+    if command not in COMMANDS:
         print(f"Unknown command: {command}")
         print(__doc__)
         sys.exit(1)
+    unknown = set(options) - COMMAND_OPTIONS.get(command, set())
+    if unknown:
+        print(f"Error: {command} does not take --{', --'.join(sorted(unknown))}", file=sys.stderr)
+        sys.exit(1)
+    out = EMITTERS[fmt]()
+    COMMANDS[command](query, out, **options)
+    out.close()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """One request per connection: a JSON argv line in, a JSON result line out."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        stdout, stderr, code = io.StringIO(), io.StringIO(), 0
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                run_command(json.loads(line)["args"])
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                print(f"Error: {e}", file=sys.stderr)
+                code = 1
+        reply = {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "code": code}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+def serve():
+    """Answer forwarded commands on SOCKET_PATH until interrupted."""
+    if SOCKET_PATH.exists():
+        if forward(["stats"]) is not None:
+            print(f"Error: already serving on {SOCKET_PATH}", file=sys.stderr)
+            sys.exit(1)
+        SOCKET_PATH.unlink()  # left behind by a server that died
+    get_conn()
+    # Requests are handled one at a time on this thread, which is all the
+    # shared sqlite3 connection allows; each query takes milliseconds.
+    server = socketserver.UnixStreamServer(str(SOCKET_PATH), QueryHandler)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving {DB_PATH} on {SOCKET_PATH}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        server.server_close()
+        SOCKET_PATH.unlink(missing_ok=True)
+
+
+def main():
+    args = command_args(sys.argv)
+    if not args:
+        print(__doc__)
+        sys.exit(0)
+
+    if args[0] == "serve":
+        serve()
+        return
+
+    # forward_command() has already tried a running server
+    try:
+        run_command(args)
+    except BrokenPipeError:
+        # Reader (e.g. `head`) stopped early; don't traceback on the way out
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
 
 if __name__ == "__main__":
@@ -4,15 +4,23 @@
 -- Markdown files remain the source of truth. The DB is derived and rebuildable.
 --
 -- Location: ~/brain/.brain.db (gitignored)
+--
+-- Changes to existing tables need a matching entry in MIGRATIONS (indexer.py)
+-- so older databases are upgraded in place; new objects only need IF NOT EXISTS.
 
 -- All markdown files tracked by the system
 CREATE TABLE IF NOT EXISTS documents (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     path TEXT UNIQUE NOT NULL,           -- relative path from brain root (e.g., "threads/ai-topic-map.md")
-    type TEXT NOT NULL,                  -- thread, person, handoff, commitment, meeting, config, health, preferences
+    type TEXT NOT NULL,                  -- thread, person, handoff, commitment, meeting, config, health, preferences,
+                                         -- transcript (a chunk of a Granola snapshot; see meetings)
     title TEXT,                          -- extracted title (first # heading or filename)
     content TEXT,                        -- full file content
     content_hash TEXT,                   -- SHA-256 of content for change detection
+    mtime_ns INTEGER,                    -- file stat signature: lets unchanged files be
+    size INTEGER,                        --   skipped without reading them; the hash is
+    inode INTEGER,                       --   only checked when the signature differs
+    entity_names TEXT,                   -- space-separated entity names mentioned in this doc
     created_at TEXT,                     -- first seen
     updated_at TEXT                      -- last modified
 );
@@ -29,6 +37,38 @@ CREATE TABLE IF NOT EXISTS entities (
 );
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_entities_type_slug ON entities(type, slug);
+-- Name resolution (query-graph.py): exact slug, then exact/prefix name
+CREATE INDEX IF NOT EXISTS idx_entities_slug ON entities(slug);
+CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_entities_document ON entities(document_id);
+
+-- Trigram index over entity names and slugs, for substring and fuzzy
+-- matching without scanning entities. External content, like search_index.
+CREATE VIRTUAL TABLE IF NOT EXISTS entity_search USING fts5(
+    name,
+    slug,
+    content='entities',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+-- Per-trigram entity counts, so fuzzy lookups can skip the most common trigrams
+CREATE VIRTUAL TABLE IF NOT EXISTS entity_search_vocab USING fts5vocab(entity_search, 'row');
+
+CREATE TRIGGER IF NOT EXISTS entities_fts_insert AFTER INSERT ON entities BEGIN
+    INSERT INTO entity_search (rowid, name, slug) VALUES (new.id, new.name, new.slug);
+END;
+
+CREATE TRIGGER IF NOT EXISTS entities_fts_delete AFTER DELETE ON entities BEGIN
+    INSERT INTO entity_search (entity_search, rowid, name, slug)
+    VALUES ('delete', old.id, old.name, old.slug);
+END;
+
+CREATE TRIGGER IF NOT EXISTS entities_fts_update AFTER UPDATE OF name, slug ON entities BEGIN
+    INSERT INTO entity_search (entity_search, rowid, name, slug)
+    VALUES ('delete', old.id, old.name, old.slug);
+    INSERT INTO entity_search (rowid, name, slug) VALUES (new.id, new.name, new.slug);
+END;
 
 -- Relationships between entities
 CREATE TABLE IF NOT EXISTS relationships (
@@ -36,6 +76,7 @@ CREATE TABLE IF NOT EXISTS relationships (
     source_id INTEGER NOT NULL,          -- entity that references
     target_id INTEGER NOT NULL,          -- entity being referenced
     type TEXT NOT NULL,                  -- mentioned_in, discussed_at, committed_to, related_to, attended
+                                         -- (person -> meeting: attended / mentioned_in)
     context TEXT,                        -- snippet showing the connection
     source_document_id INTEGER,          -- document where this relationship was found
     created_at TEXT,
@@ -44,21 +85,136 @@ CREATE TABLE IF NOT EXISTS relationships (
     FOREIGN KEY (source_document_id) REFERENCES documents(id) ON DELETE SET NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_rel_source ON relationships(source_id);
-CREATE INDEX IF NOT EXISTS idx_rel_target ON relationships(target_id);
+-- Covering indexes: graph traversal (query-graph.py neighborhood/path) walks
+-- edges in both directions and filters by type without touching the table
+CREATE INDEX IF NOT EXISTS idx_rel_source ON relationships(source_id, type, target_id);
+CREATE INDEX IF NOT EXISTS idx_rel_target ON relationships(target_id, type, source_id);
 CREATE INDEX IF NOT EXISTS idx_rel_type ON relationships(type);
 
--- Full-text search index across all document content and entity names
+-- Edge counts per entity and relationship type, so hubs are an index scan
+-- rather than a count over relationships. type '*' totals every type.
+-- Kept current by the triggers below (bulk loads recompute it instead).
+CREATE TABLE IF NOT EXISTS entity_degree (
+    entity_id INTEGER NOT NULL,
+    type TEXT NOT NULL,                  -- relationship type, or '*' for all types
+    in_degree INTEGER NOT NULL DEFAULT 0,  -- edges with this entity as target
+    out_degree INTEGER NOT NULL DEFAULT 0, -- edges with this entity as source
+    degree INTEGER GENERATED ALWAYS AS (in_degree + out_degree) STORED,
+    pagerank REAL,                       -- '*' rows only, as of the last indexer.py --pagerank
+    PRIMARY KEY (entity_id, type)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_entity_degree_top ON entity_degree(type, degree DESC);
+CREATE INDEX IF NOT EXISTS idx_entity_degree_rank ON entity_degree(pagerank DESC)
+    WHERE pagerank IS NOT NULL;
+
+CREATE TRIGGER IF NOT EXISTS relationships_degree_insert AFTER INSERT ON relationships BEGIN
+    INSERT INTO entity_degree (entity_id, type, out_degree)
+    VALUES (new.source_id, new.type, 1), (new.source_id, '*', 1)
+    ON CONFLICT DO UPDATE SET out_degree = out_degree + 1;
+    INSERT INTO entity_degree (entity_id, type, in_degree)
+    VALUES (new.target_id, new.type, 1), (new.target_id, '*', 1)
+    ON CONFLICT DO UPDATE SET in_degree = in_degree + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS relationships_degree_delete AFTER DELETE ON relationships BEGIN
+    UPDATE entity_degree SET out_degree = out_degree - 1
+    WHERE entity_id = old.source_id AND type IN (old.type, '*');
+    UPDATE entity_degree SET in_degree = in_degree - 1
+    WHERE entity_id = old.target_id AND type IN (old.type, '*');
+    DELETE FROM entity_degree
+    WHERE entity_id IN (old.source_id, old.target_id) AND type IN (old.type, '*')
+      AND in_degree = 0 AND out_degree = 0;
+END;
+
+-- Dated mentions of entities, for query-graph.py timeline: a thread or
+-- person on each dated line of its own file, link targets on dated lines
+-- anywhere (handoff lines are dated by their session heading), and
+-- everything a meeting names, dated by the meeting
+CREATE TABLE IF NOT EXISTS mentions (
+    entity_id INTEGER NOT NULL,
+    date TEXT NOT NULL,                  -- YYYY-MM-DD
+    document_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,             -- character offset of the mention in documents.content
+    FOREIGN KEY (entity_id) REFERENCES entities(id) ON DELETE CASCADE,
+    FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
+);
+
+-- Covers timeline pages: keyset-ordered by (date, document_id, offset)
+CREATE INDEX IF NOT EXISTS idx_mentions_entity_date ON mentions(entity_id, date, document_id, offset);
+CREATE INDEX IF NOT EXISTS idx_mentions_document ON mentions(document_id);
+
+-- Full-text search index across all document content and entity names.
+-- External-content table: the text lives only in documents, and rowid is
+-- documents.id (join on it for path/type). The triggers below keep the two
+-- in sync, so the indexer only ever writes documents. The type column is
+-- there so searches can filter by document type inside the MATCH (see
+-- brain_search.py); it carries no weight in ranking.
 CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
     title,
     content,
-    entity_names,                        -- space-separated entity names mentioned in this doc
-    path UNINDEXED,                      -- for linking back to source file
-    document_id UNINDEXED,               -- for joining
-    type UNINDEXED,                      -- for filtering results by type
+    entity_names,
+    type,
+    content='documents',
+    content_rowid='id',
     tokenize='porter unicode61'          -- stemming + unicode support
 );
 
+-- ORDER BY rank is BM25 with per-column weights: a title hit counts ten
+-- content hits, a mentioned entity's name five. Stored in the index, so
+-- every reader (query-graph.py, the web UI) ranks the same way.
+INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 1.0, 5.0, 0.0)');
+
+CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+    INSERT INTO search_index (rowid, title, content, entity_names, type)
+    VALUES (new.id, new.title, new.content, new.entity_names, new.type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+    INSERT INTO search_index (search_index, rowid, title, content, entity_names, type)
+    VALUES ('delete', old.id, old.title, old.content, old.entity_names, old.type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF title, content, entity_names, type ON documents BEGIN
+    INSERT INTO search_index (search_index, rowid, title, content, entity_names, type)
+    VALUES ('delete', old.id, old.title, old.content, old.entity_names, old.type);
+    INSERT INTO search_index (rowid, title, content, entity_names, type)
+    VALUES (new.id, new.title, new.content, new.entity_names, new.type);
+END;
+
+-- Granola meeting snapshots (inbox/granola/<date>/*.json, or rows of
+-- inbox/granola/snapshots.db), one row per snapshot. Each transcript is
+-- split into chunks stored as 'transcript' documents at
+-- "inbox/granola/<source>#<n>", n < chunks, so search_index covers them.
+-- A snapshot is re-read only when its signature changes.
+CREATE TABLE IF NOT EXISTS meetings (
+    source TEXT PRIMARY KEY,             -- snapshot path under inbox/granola (e.g., "2026-02-10/weekly-sync--0a1b2c3d.json")
+    id TEXT NOT NULL,                    -- Granola document ID
+    title TEXT,
+    date TEXT,                           -- YYYY-MM-DD the meeting was created
+    start_time TEXT,                     -- calendar event start/end (ISO 8601), '' if unknown
+    end_time TEXT,
+    attendees TEXT,                      -- JSON list of {email, name}
+    word_count INTEGER,
+    chunks INTEGER NOT NULL,             -- number of transcript documents
+    mtime_ns INTEGER,                    -- snapshot file's mtime (NULL for snapshots.db rows)
+    size INTEGER                         -- snapshot size in bytes (uncompressed)
+);
+
+CREATE INDEX IF NOT EXISTS idx_meetings_date ON meetings(date, start_time);
+CREATE INDEX IF NOT EXISTS idx_meetings_id ON meetings(id);
+
+-- What each person with a people/<slug>.md file is called, for resolving
+-- meeting attendees (generate-prep.py; see person_aliases.py). Rebuilt from
+-- the people files and meeting attendees on every indexer run. An alias
+-- with several slugs is ambiguous and resolves to none of them.
+CREATE TABLE IF NOT EXISTS person_aliases (
+    kind TEXT NOT NULL,                  -- email, name (slug or title in slug form), part (a word of a name)
+    alias TEXT NOT NULL,                 -- lowercased (e.g., "wei@example.com", "wei-zhang", "wei")
+    slug TEXT NOT NULL,                  -- people file slug
+    PRIMARY KEY (kind, alias, slug)
+) WITHOUT ROWID;
+
 -- Metadata table for tracking indexer state
 CREATE TABLE IF NOT EXISTS indexer_meta (
     key TEXT PRIMARY KEY,
@@ -2,15 +2,29 @@
 # snapshot-transcripts.sh - Snapshot Granola transcripts to inbox before they expire
 #
 # Usage:
-#   ./scripts/snapshot-transcripts.sh [brain-root]
+#   ./scripts/snapshot-transcripts.sh [brain-root] [--store]
 #
 # Copies new meeting transcripts from Granola cache to inbox/granola/YYYY-MM-DD/
-# as individual JSON files. Only copies documents not already snapshotted.
+# as individual JSON files. Only copies documents not already snapshotted,
+# as recorded in inbox/granola/.manifest.json, and does nothing at all when
+# the cache file hasn't changed since the last run.
+#
+# --store keeps snapshots compressed in inbox/granola/snapshots.db instead
+# (see snapshot_store.py) and moves the existing JSON files into it. Once
+# that store exists, every later run writes to it, with or without --store.
 #
 # Designed to run frequently (e.g., every 30 min via launchd) as a safety net
 # against Granola's ~1 day cache retention.
 
-BRAIN_ROOT="${1:-$HOME/brain}"
+BRAIN_ROOT="$HOME/brain"
+SNAPSHOT_STORE=""
+for arg in "$@"; do
+    case "$arg" in
+        --store) SNAPSHOT_STORE=1 ;;
+        *) BRAIN_ROOT="$arg" ;;
+    esac
+done
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 INBOX_DIR="$BRAIN_ROOT/inbox/granola"
 CACHE_PATH="${GRANOLA_CACHE_PATH:-$HOME/Library/Application Support/Granola/cache-v3.json}"
 LOG_PREFIX="[snapshot-transcripts]"
@@ -30,6 +44,8 @@ mkdir -p "$INBOX_DIR"
 export BRAIN_ROOT="$BRAIN_ROOT"
 export INBOX_DIR="$INBOX_DIR"
 export CACHE_PATH="$CACHE_PATH"
+export SCRIPT_DIR="$SCRIPT_DIR"
+export SNAPSHOT_STORE="$SNAPSHOT_STORE"
 
 python3 << 'PYEOF'
 import json
@@ -42,65 +58,120 @@ brain_root = os.environ.get("BRAIN_ROOT", os.path.expanduser("~/brain"))
 inbox_dir = os.environ.get("INBOX_DIR", os.path.join(brain_root, "inbox", "granola"))
 cache_path = os.environ.get("CACHE_PATH", os.path.expanduser("~/Library/Application Support/Granola/cache-v3.json"))
 
-try:
-    with open(cache_path, "r") as f:
-        data = json.load(f)
-except (json.JSONDecodeError, FileNotFoundError) as e:
-    print(f"[snapshot-transcripts] ERROR: Failed to read cache: {e}", file=sys.stderr)
-    sys.exit(1)
-
-try:
-    cache = json.loads(data["cache"])
-    state = cache["state"]
-    documents = state.get("documents") or {}
-    transcripts = state.get("transcripts") or {}
-except (KeyError, json.JSONDecodeError) as e:
-    print(f"[snapshot-transcripts] ERROR: Failed to parse cache structure: {e}", file=sys.stderr)
-    sys.exit(1)
+manifest_path = os.path.join(inbox_dir, ".manifest.json")
+
+sys.path.insert(0, os.environ["SCRIPT_DIR"])
+import granola_cache
+import snapshot_store
+
+
+def log(message):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[snapshot-transcripts] {now} {message}")
+
+
+def seed_manifest():
+    """Manifest entries for snapshots written before there was a manifest."""
+    snapshots = snapshot_store.relpaths(store) if store else {}
+    for date in sorted(os.listdir(inbox_dir)):
+        date_dir = os.path.join(inbox_dir, date)
+        if not os.path.isdir(date_dir):
+            continue
+        for fname in sorted(os.listdir(date_dir)):
+            if not fname.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(date_dir, fname), "r") as f:
+                    doc_id = json.load(f).get("id")
+            except (OSError, ValueError, AttributeError):
+                continue
+            if doc_id:
+                snapshots.setdefault(doc_id, f"{date}/{fname}")
+    return {"version": 1, "cache": None, "snapshots": snapshots}
+
+
+def load_manifest():
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == 1 and isinstance(manifest.get("snapshots"), dict):
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return seed_manifest()
+
+
+def save_manifest(manifest):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+store = snapshot_store.open_store(inbox_dir, create=bool(os.environ.get("SNAPSHOT_STORE")))
+if store and os.environ.get("SNAPSHOT_STORE"):
+    moved = snapshot_store.import_files(store, inbox_dir)
+    if moved:
+        log(f"Moved {moved} snapshot files into {snapshot_store.STORE_NAME}")
+stored_paths = set(snapshot_store.relpaths(store).values()) if store else set()
+
+# The manifest records every snapshot (doc ID -> path under inbox/granola)
+# and the cache file as of the last complete run. If the cache hasn't been
+# written since, there is nothing new to snapshot.
+manifest = load_manifest()
+snapshots = manifest["snapshots"]
+st = os.stat(cache_path)
+fingerprint = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+if manifest.get("cache") == fingerprint:
+    log(f"Cache unchanged, {len(snapshots)} meetings already snapshotted")
+    sys.exit(0)
 
 new_count = 0
 skip_count = 0
+pending = {}
+claimed = set()
 
-for doc_id, doc in documents.items():
-    created = doc.get("created_at", "")[:10]
-    if not created:
-        continue
+# Documents first; transcripts are then read only for the new ones
+try:
+    for doc_id, doc in granola_cache.iter_documents(cache_path):
+        created = doc.get("created_at", "")[:10]
+        if not created:
+            continue
+
+        if doc_id in snapshots:
+            skip_count += 1
+            continue
+
+        # Build a filesystem-safe slug from the title
+        cal = doc.get("google_calendar_event") or {}
+        title = cal.get("summary", doc.get("title", "untitled"))
+        slug = re.sub(r"[^\w\s-]", "", title.lower())
+        slug = re.sub(r"[\s]+", "-", slug).strip("-")[:60]
+        relpath = f"{created}/{slug}--{doc_id[:8]}.json"
+
+        # Another meeting that day with the same title and ID prefix
+        if (relpath in claimed or relpath in stored_paths
+                or os.path.exists(os.path.join(inbox_dir, relpath))):
+            skip_count += 1
+            continue
+
+        claimed.add(relpath)
+        pending[doc_id] = (doc, title, relpath)
+except (ValueError, FileNotFoundError) as e:
+    print(f"[snapshot-transcripts] ERROR: Failed to read cache: {e}", file=sys.stderr)
+    sys.exit(1)
 
-    # Create date directory
-    date_dir = os.path.join(inbox_dir, created)
-    os.makedirs(date_dir, exist_ok=True)
 
-    # Build a filesystem-safe slug from the title
+def write_snapshot(doc_id, trans):
+    doc, title, relpath = pending.pop(doc_id)
     cal = doc.get("google_calendar_event") or {}
-    title = cal.get("summary", doc.get("title", "untitled"))
-    slug = re.sub(r"[^\w\s-]", "", title.lower())
-    slug = re.sub(r"[\s]+", "-", slug).strip("-")[:60]
-    filename = f"{slug}--{doc_id[:8]}.json"
-    filepath = os.path.join(date_dir, filename)
-
-    # Skip if already snapshotted
-    if os.path.exists(filepath):
-        skip_count += 1
-        continue
-
-    # Also check if this doc_id was already saved under a different slug
-    existing = [f for f in os.listdir(date_dir) if doc_id[:8] in f]
-    if existing:
-        skip_count += 1
-        continue
 
     # Extract transcript
-    trans = transcripts.get(doc_id) or []
     transcript_text = "\n".join(t.get("text", "") for t in trans)
     word_count = len(transcript_text.split()) if transcript_text.strip() else 0
 
     # Extract attendees
-    attendees = []
-    for a in (cal.get("attendees") or []):
-        email = a.get("email", "")
-        name = a.get("displayName", email.split("@")[0] if email else "")
-        if email and not a.get("self"):
-            attendees.append({"email": email, "name": name})
+    attendees = granola_cache.calendar_attendees(doc)
 
     # Extract calendar event timing
     start_obj = cal.get("start") or {}
@@ -120,11 +191,34 @@ for doc_id, doc in documents.items():
         "snapshotted_at": datetime.now().isoformat(),
     }
 
-    with open(filepath, "w") as f:
-        json.dump(snapshot, f, indent=2)
+    if store:
+        snapshot_store.put(store, relpath, snapshot)
+    else:
+        filepath = os.path.join(inbox_dir, relpath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "w") as f:
+            json.dump(snapshot, f, indent=2)
+    snapshots[doc_id] = relpath
+
 
-    new_count += 1
+# Write each snapshot as its transcript streams past, then those without one.
+# Whatever was written is recorded even if the cache turns out to be
+# unreadable part way; the fingerprint only once the whole cache was read.
+try:
+    for doc_id, trans in granola_cache.iter_transcripts(cache_path, list(pending)):
+        write_snapshot(doc_id, trans)
+        new_count += 1
+    for doc_id in list(pending):
+        write_snapshot(doc_id, [])
+        new_count += 1
+    manifest["cache"] = fingerprint
+except (ValueError, FileNotFoundError) as e:
+    print(f"[snapshot-transcripts] ERROR: Failed to read cache: {e}", file=sys.stderr)
+    sys.exit(1)
+finally:
+    if store:
+        store.commit()
+    save_manifest(manifest)
 
-now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-print(f"[snapshot-transcripts] {now} Snapshotted {new_count} new meetings, skipped {skip_count} existing")
+log(f"Snapshotted {new_count} new meetings, skipped {skip_count} existing")
 PYEOF
@@ -0,0 +1,128 @@
+"""
+snapshot_store.py - Compressed store for Granola meeting snapshots.
+
+snapshot-transcripts.sh writes one pretty-printed JSON file per meeting
+under inbox/granola/<date>/. With --store it writes into
+inbox/granola/snapshots.db instead, a SQLite table holding each snapshot
+as zlib-compressed JSON, one row per meeting, indexed by meeting ID and by
+date, and moves the existing files in. Once the store exists, later runs
+keep writing to it.
+
+Each meeting is compressed on its own, so reading one meeting (or one
+day's meetings) decompresses only those rows. Snapshots keep the relative
+path they would have had as a file (<date>/<slug>--<id>.json), which is
+what the snapshot manifest records either way.
+
+Usage (as a library):
+    conn = snapshot_store.open_store(inbox_dir)
+    if conn:
+        for relpath, snapshot in snapshot_store.iter_snapshots(conn, "2026-02-15"):
+            ...
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+STORE_NAME = "snapshots.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id TEXT PRIMARY KEY,                 -- Granola document ID
+    date TEXT NOT NULL,                  -- YYYY-MM-DD the meeting was created
+    relpath TEXT NOT NULL UNIQUE,        -- <date>/<slug>--<id8>.json, as a file would be named
+    title TEXT,
+    size INTEGER NOT NULL,               -- uncompressed JSON bytes
+    data BLOB NOT NULL                   -- zlib-compressed snapshot JSON
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots(date, relpath);
+"""
+
+
+def store_path(inbox_dir: str) -> str:
+    return os.path.join(inbox_dir, STORE_NAME)
+
+
+def open_store(inbox_dir: str, create: bool = False) -> Optional[sqlite3.Connection]:
+    """The store under inbox/granola, or None if there isn't one (and not `create`)."""
+    path = store_path(inbox_dir)
+    if not create and not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def put(conn: sqlite3.Connection, relpath: str, snapshot: Dict):
+    """Add or replace a snapshot; the caller commits."""
+    data = json.dumps(snapshot).encode("utf-8")
+    conn.execute(
+        "INSERT OR REPLACE INTO snapshots (id, date, relpath, title, size, data) VALUES (?, ?, ?, ?, ?, ?)",
+        (snapshot["id"], relpath.split("/", 1)[0], relpath, snapshot.get("title"), len(data),
+         zlib.compress(data))
+    )
+
+
+def decode(data: bytes) -> Dict:
+    return json.loads(zlib.decompress(data))
+
+
+def get(conn: sqlite3.Connection, doc_id: str) -> Optional[Dict]:
+    row = conn.execute("SELECT data FROM snapshots WHERE id = ?", (doc_id,)).fetchone()
+    return decode(row[0]) if row else None
+
+
+def iter_snapshots(conn: sqlite3.Connection, date: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    """(relpath, snapshot) for every snapshot, or those of one date, in path order."""
+    if date is None:
+        rows = conn.execute("SELECT relpath, data FROM snapshots ORDER BY relpath")
+    else:
+        rows = conn.execute("SELECT relpath, data FROM snapshots WHERE date = ? ORDER BY relpath", (date,))
+    for relpath, data in rows:
+        yield relpath, decode(data)
+
+
+def relpaths(conn: sqlite3.Connection) -> Dict[str, str]:
+    """{document ID: relpath} for everything in the store, without decompressing."""
+    return dict(conn.execute("SELECT id, relpath FROM snapshots"))
+
+
+def listing(conn: sqlite3.Connection) -> Dict[str, Tuple[str, int]]:
+    """{relpath: (document ID, uncompressed size)} for everything in the store."""
+    return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT relpath, id, size FROM snapshots")}
+
+
+def import_files(conn: sqlite3.Connection, inbox_dir: str) -> int:
+    """Move the <date>/*.json snapshot files under inbox_dir into the store.
+
+    Each file is removed once the store holding it is committed. Files
+    that aren't snapshots (no "id") are left alone. Returns the number moved.
+    """
+    moved = []
+    for date in sorted(os.listdir(inbox_dir)):
+        date_dir = os.path.join(inbox_dir, date)
+        if not os.path.isdir(date_dir):
+            continue
+        for fname in sorted(os.listdir(date_dir)):
+            if not fname.endswith(".json"):
+                continue
+            path = os.path.join(date_dir, fname)
+            try:
+                with open(path, "r") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(snapshot, dict) or not snapshot.get("id"):
+                continue
+            put(conn, f"{date}/{fname}", snapshot)
+            moved.append(path)
+    conn.commit()
+    for path in moved:
+        os.remove(path)
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass  # not empty yet
+    return len(moved)
@@ -0,0 +1,73 @@
+"""Tests for scripts/brain_search.py"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import brain_search
+import indexer
+
+
+@pytest.fixture
+def conn(brain_dir, sample_threads, sample_people):
+    """An index of the sample brain plus a few documents about 'rollout'."""
+    root = Path(brain_dir)
+    (root / "threads" / "rollout.md").write_text("# Rollout\n\n**Status**: Active\n")
+    (root / "threads" / "launch.md").write_text("# Launch\n\nThe rollout slipped a week.\n")
+    meetings = root / "archive" / "meetings"
+    meetings.mkdir(parents=True, exist_ok=True)
+    for i in range(5):
+        (meetings / f"2026-02-0{i + 1}-standup.md").write_text(
+            f"# Standup {i}\n\nRollout status, rollout risks, rollout dates.\n")
+    db = indexer.init_db(root / ".brain.db", indexer.SCHEMA_PATH)
+    indexer.sync_documents(db, root, indexer.find_markdown_files(root), [])
+    db.commit()
+    yield db
+    db.close()
+
+
+def paths(results):
+    return [r["path"] for r in results]
+
+
+class TestSearch:
+    """Test BM25 ranking, type filters and cursor paging."""
+
+    def test_title_outranks_body(self, conn):
+        results, _ = brain_search.search(conn, "rollout", types=["thread"])
+        assert paths(results) == ["threads/rollout.md", "threads/launch.md"]
+
+    def test_type_filter(self, conn):
+        results, cursor = brain_search.search(conn, "rollout", types=["meeting"])
+        assert len(results) == 5 and cursor is None
+        assert {r["type"] for r in results} == {"meeting"}
+        assert brain_search.search(conn, "rollout", types=["person"]) == ([], None)
+
+    def test_type_words_not_matched_as_text(self, conn):
+        assert brain_search.search(conn, "meeting") == ([], None)
+
+    def test_pages_cover_every_result_once(self, conn):
+        everything, _ = brain_search.search(conn, "rollout", limit=50)
+        seen, cursor = [], None
+        while True:
+            page, cursor = brain_search.search(conn, "rollout", limit=2, after=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert paths(seen) == paths(everything)
+        assert len(seen) == 7
+
+    def test_snippet_marks(self, conn):
+        results, _ = brain_search.search(conn, "slipped", marks=("<mark>", "</mark>"))
+        assert "<mark>slipped</mark>" in results[0]["snippet"]
+
+    def test_invalid_syntax_searched_as_words(self, conn):
+        results, _ = brain_search.search(conn, 'rollout" (')
+        assert "threads/rollout.md" in paths(results)
+
+    def test_bad_cursor(self, conn):
+        with pytest.raises(ValueError):
+            brain_search.search(conn, "rollout", after="page-2")
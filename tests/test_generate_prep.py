@@ -1,15 +1,30 @@
 """Tests for scripts/generate-prep.py"""
+import json
 import os
+import re
 import sys
+from pathlib import Path
 
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
 import importlib
+import indexer
 gp = importlib.import_module('generate-prep')
 
 
+@pytest.fixture
+def brain_db(brain_dir, sample_threads, sample_people):
+    """Index the sample brain into .brain.db."""
+    root = Path(brain_dir)
+    conn = indexer.init_db(root / ".brain.db", indexer.SCHEMA_PATH)
+    files = indexer.find_markdown_files(root)
+    indexer.bulk_load(conn, (r for _, r, _ in indexer.parse_files(root, files) if r is not None))
+    conn.close()
+    return root / ".brain.db"
+
+
 class TestNameExpansion:
     """Test expand_name_variants for first/last name matching."""
 
@@ -91,6 +106,74 @@ class TestThreadMatching:
         assert len(threads) == 0
 
 
+class TestThreadIndex:
+    """Test thread matching through .brain.db."""
+
+    def by_name(self, threads):
+        return {t['name']: (t['status'], sorted(t['matched_people']), t['path']) for t in threads}
+
+    def test_index_matches_scan(self, brain_dir, brain_db):
+        index = gp.open_thread_index(brain_dir)
+        assert index is not None
+        for names in (["Wei Zhang"], ["Wei Zhang", "Simone Cirillo"], ["Nobody Known"], ["Al"]):
+            assert self.by_name(gp.find_relevant_threads(brain_dir, names, index)) == \
+                self.by_name(gp.find_relevant_threads(brain_dir, names))
+        index.close()
+
+    def test_missing_index(self, brain_dir, sample_threads):
+        assert gp.open_thread_index(brain_dir) is None
+
+    def test_edited_thread_makes_index_stale(self, brain_dir, brain_db):
+        with open(os.path.join(brain_dir, "threads", "old-project.md"), "a") as f:
+            f.write("- 2026-01-19: Wei picked this back up\n")
+        assert gp.open_thread_index(brain_dir) is None
+
+    def test_new_thread_makes_index_stale(self, brain_dir, brain_db):
+        with open(os.path.join(brain_dir, "threads", "new-thread.md"), "w") as f:
+            f.write("# New Thread\n")
+        assert gp.open_thread_index(brain_dir) is None
+
+    def test_old_schema_ignored(self, brain_dir, brain_db):
+        conn = indexer.init_db(brain_db, indexer.SCHEMA_PATH)
+        conn.execute("UPDATE indexer_meta SET value = '7' WHERE key = 'schema_version'")
+        conn.commit()
+        conn.close()
+        assert gp.open_thread_index(brain_dir) is None
+
+
+class TestNameMatcher:
+    """Test the single-pass matcher over all meetings' attendees."""
+
+    def test_reports_meetings_hit(self):
+        matcher = gp.NameMatcher({"sync": ["Wei Zhang"], "review": ["Simone Cirillo", "Ann Lee"]})
+        assert matcher.matches("wei and simone met") == {"sync": {"Wei Zhang"}, "review": {"Simone Cirillo"}}
+        assert matcher.matches("nobody here") == {}
+
+    def test_overlapping_variants(self):
+        matcher = gp.NameMatcher({1: ["Ann Lee"], 2: ["Anna Berg"], 3: ["Anna Bergman"]})
+        assert matcher.matches("anna bergman joined") == {2: {"Anna Berg"}, 3: {"Anna Bergman"}}
+        assert matcher.matches("anna bergman joined", whole_words=False) == \
+            {1: {"Ann Lee"}, 2: {"Anna Berg"}, 3: {"Anna Bergman"}}
+
+    def test_same_as_per_variant_search(self):
+        names = ["Wei Zhang", "Ann", "Anna Berg", "Jean-Luc Picard", "O'Brien", "Al Li"]
+        matcher = gp.NameMatcher({0: names})
+        variants = gp.expand_name_variants(names)
+        for text in ["wei_zhang", "zhang's notes", "anna-berg", "annabelle", "jean-luc said",
+                     "luc", "picard.", "o'brien", "obrien", "al li", "bergs", "(ann)"]:
+            expected = {d for v, d in variants.items()
+                        if len(v) > 2 and re.search(r'\b' + re.escape(v) + r'\b', text)}
+            assert matcher.matches(text).get(0, set()) == expected, text
+            expected = {d for v, d in variants.items() if len(v) > 2 and v in text}
+            assert matcher.matches(text, whole_words=False).get(0, set()) == expected, text
+
+    def test_find_related_per_meeting(self, brain_dir, sample_threads, sample_commitments):
+        related = gp.find_related(gp.PrepCorpus(brain_dir), {"a": ["Wei Zhang"], "b": ["Nobody Known"]})
+        assert [t['name'] for t in related["a"]["threads"]] == ["aisp-integration"]
+        assert related["a"]["commitments"] == ["Share WA+AISP spec with Wei — added 2026-01-15"]
+        assert related["b"] == {"threads": [], "commitments": [], "mentions": []}
+
+
 class TestCommitmentMatching:
     """Test finding commitments relevant to attendees."""
 
@@ -126,6 +209,44 @@ class TestInferAttendeesFromTitle:
         assert len(names) == 1
 
 
+class TestInboxMeetings:
+    """Test the inbox fallback reading only the target day's snapshots."""
+
+    def write(self, brain_dir, relpath, doc):
+        path = os.path.join(brain_dir, "inbox", "granola", relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(doc, f)
+
+    def test_reads_date_directory(self, brain_dir):
+        self.write(brain_dir, "2026-02-11/late--bbbbbbbb.json", {
+            "id": "bbbbbbbb-2", "title": "Late", "start": "2026-02-11T15:00:00Z",
+            "attendees": [{"email": "wei@example.com", "name": "Wei Zhang"}]})
+        self.write(brain_dir, "2026-02-11/early--cccccccc.json", {
+            "id": "cccccccc-3", "created_at": "2026-02-11T09:00:00Z",
+            "google_calendar_event": {"summary": "Early", "start": {"dateTime": "2026-02-11T09:00:00Z"},
+                                      "attendees": [{"email": "wei@example.com", "displayName": "Wei Zhang"}]}})
+        self.write(brain_dir, "2026-02-10/other--aaaaaaaa.json", {"id": "aaaaaaaa-1", "title": "Other"})
+        meetings = gp.load_inbox_meetings(os.path.join(brain_dir, "inbox"), "2026-02-11")
+        assert [(m["id"], m["title"]) for m in meetings] == [("cccccccc-3", "Early"), ("bbbbbbbb-2", "Late")]
+        assert meetings[0]["attendees"] == meetings[1]["attendees"] == [
+            {"email": "wei@example.com", "name": "Wei Zhang"}]
+
+    def test_other_days_not_read(self, brain_dir, monkeypatch):
+        self.write(brain_dir, "2026-02-11/sync--aaaaaaaa.json", {"id": "aaaaaaaa-1", "title": "Sync"})
+        for day in range(1, 10):
+            self.write(brain_dir, f"2026-01-0{day}/old--bbbbbbbb.json", {"id": f"old-{day}"})
+        opened = []
+        real_open = open
+        monkeypatch.setattr("builtins.open", lambda path, *a, **k: opened.append(path) or real_open(path, *a, **k))
+        meetings = gp.load_inbox_meetings(os.path.join(brain_dir, "inbox"), "2026-02-11")
+        assert [m["title"] for m in meetings] == ["Sync"]
+        assert all("2026-02-11" in str(path) for path in opened)
+
+    def test_bad_date(self, brain_dir):
+        assert gp.load_inbox_meetings(os.path.join(brain_dir, "inbox"), "../..") == []
+
+
 class TestPrepGeneration:
     """Test full prep packet generation."""
 
@@ -140,3 +261,26 @@ class TestPrepGeneration:
         assert "# Meeting Prep:" in prep
         assert "Wei Zhang" in prep
         assert "Relevant Threads" in prep or "Attendee Context" in prep
+
+    def test_shared_corpus_reads_each_file_once(self, brain_dir, sample_people, sample_threads,
+                                                sample_commitments, sample_handoff, monkeypatch):
+        lookup = gp.find_people_files(brain_dir)
+        meetings = [
+            {"title": "Sync", "attendees": [{"name": "Wei Zhang", "email": "wei@example.com"}]},
+            {"title": "Planning", "attendees": [{"name": "Wei Zhang", "email": "wei@example.com"},
+                                                {"name": "Simone Cirillo", "email": "simone@example.com"}]},
+        ]
+        alone = [gp.generate_prep(m, brain_dir, lookup) for m in meetings]
+
+        reads = []
+        read_file_content = gp.read_file_content
+        monkeypatch.setattr(gp, "read_file_content", lambda path: reads.append(path) or read_file_content(path))
+        corpus = gp.PrepCorpus(brain_dir)
+        related = gp.find_related(corpus, {
+            i: [gp.attendee_name(a) for a in gp.meeting_attendees(m, lookup)] for i, m in enumerate(meetings)
+        })
+        shared = [gp.generate_prep(m, brain_dir, lookup, corpus, related[i]) for i, m in enumerate(meetings)]
+
+        strip = lambda prep: prep.rsplit("_Auto-generated", 1)[0]
+        assert list(map(strip, shared)) == list(map(strip, alone))
+        assert len(reads) == len(set(reads))
@@ -0,0 +1,135 @@
+"""Tests for scripts/granola_cache.py"""
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import granola_cache
+gp = importlib.import_module('generate-prep')
+
+
+def make_state():
+    documents, transcripts = {}, {}
+    for i in range(12):
+        day = f"2026-02-{10 + i % 3}"
+        doc_id = f"doc-{i}-é"
+        documents[doc_id] = {
+            "id": doc_id,
+            "created_at": f"{day}T1{i % 10}:00:00Z",
+            "title": f'Sync "{i}" \\ 🟢 tab\t',
+            "google_calendar_event": {
+                "summary": f"Sync {i}",
+                "start": {"dateTime": f"{day}T1{i % 10}:00:00Z"},
+                "attendees": [
+                    {"email": "wei@example.com", "displayName": "Wei Zhang"},
+                    {"email": "me@example.com", "self": True},
+                ],
+            },
+            "flags": [1, 2.5, True, None, {}],
+        }
+        transcripts[doc_id] = [{"text": f"line {j} of {i} \"quoted\" 😀", "start": 12.5 + j,
+                                "end": -3e10, "final": j % 2 == 0, "speaker": None} for j in range(i % 4)]
+    return {"state": {"misc": [{"a": "]}"}, 1234567, 0.125, -1e-7, True, False, None], "transcripts": transcripts,
+                      "documents": documents, "tail": 3}}
+
+
+@pytest.fixture
+def state():
+    return make_state()
+
+
+@pytest.fixture(params=["escaped", "unicode", "object"])
+def cache_path(request, tmp_path, state):
+    """The same state written as Granola does and in two variants."""
+    path = tmp_path / "cache-v3.json"
+    if request.param == "escaped":
+        path.write_text(json.dumps({"cache": json.dumps(state)}))
+    elif request.param == "unicode":
+        # \uXXXX surrogate escapes in the outer string only
+        path.write_text(json.dumps({"cache": json.dumps(state, ensure_ascii=False, indent=1)}))
+    else:
+        path.write_text(json.dumps({"version": 3, "cache": state}, indent=2))
+    return str(path)
+
+
+class TestStreaming:
+    """Test reading the cache in pieces against json.load."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, granola_cache.CHUNK_SIZE])
+    def test_documents_for_date(self, cache_path, state, chunk_size):
+        expected = {k: v for k, v in state["state"]["documents"].items()
+                    if v["created_at"].startswith("2026-02-11")}
+        assert dict(granola_cache.iter_documents(cache_path, "2026-02-11", chunk_size)) == expected
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64])
+    def test_transcripts_for_ids(self, cache_path, state, chunk_size):
+        ids = ["doc-3-é", "doc-7-é", "missing"]
+        got = dict(granola_cache.iter_transcripts(cache_path, ids, chunk_size))
+        assert got == {i: state["state"]["transcripts"][i] for i in ids[:2]}
+
+    def test_all_documents(self, cache_path, state):
+        assert granola_cache.load_documents(cache_path) == state["state"]["documents"]
+        assert granola_cache.count_dates(cache_path) == {"2026-02-10": 4, "2026-02-11": 4, "2026-02-12": 4}
+
+    def test_no_cache_key(self, tmp_path):
+        path = tmp_path / "cache-v3.json"
+        path.write_text(json.dumps({"other": "{}"}))
+        with pytest.raises(ValueError):
+            granola_cache.load_documents(str(path))
+
+    def test_truncated_cache(self, tmp_path, state):
+        path = tmp_path / "cache-v3.json"
+        path.write_text(json.dumps({"cache": json.dumps(state)})[:-200])
+        with pytest.raises(ValueError):
+            granola_cache.load_transcripts(str(path), ["doc-11-é"])
+
+
+class TestSplitValues:
+    """Test values cut by a piece boundary at every offset."""
+
+    TEXT = json.dumps({"n": 12.5, "big": -3e10, "int": 1234567, "flags": [True, False, None],
+                       "s": "tab\t \"q\" \\ é 😀", "last": 7})
+
+    def read(self, stream):
+        """Decode TEXT child by child, as skip_value and iter_transcripts do."""
+        out = {}
+        for key in stream.entries():
+            if key == "flags":
+                out[key] = [stream.decode_value() for _ in stream.elements()]
+            else:
+                out[key] = stream.decode_value()
+        return out
+
+    @pytest.mark.parametrize("escaped", [False, True])
+    def test_every_offset(self, escaped):
+        text = json.dumps(self.TEXT)[1:-1] if escaped else self.TEXT
+        for cut in range(1, len(text)):
+            if escaped:
+                # The state as it arrives from inside the cache string
+                pieces = granola_cache.unescape_string(iter([text[:cut], text[cut:] + '"']), "")
+            else:
+                pieces = iter([text[:cut], text[cut:]])
+            assert self.read(granola_cache.TextStream(pieces)) == json.loads(self.TEXT), cut
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+    def test_skipped_numbers(self, cache_path, state, chunk_size):
+        got = dict(granola_cache.iter_transcripts(cache_path, ["doc-11-é"], chunk_size))
+        assert got == {"doc-11-é": state["state"]["transcripts"]["doc-11-é"]}
+
+
+class TestPrepMeetings:
+    """Test generate-prep.py reading the day's meetings through the reader."""
+
+    def test_load_granola_meetings(self, cache_path):
+        meetings = gp.load_granola_meetings(cache_path, "2026-02-12")
+        assert [m["title"] for m in meetings] == ["Sync 11", "Sync 2", "Sync 5", "Sync 8"]
+        assert meetings[0]["attendees"] == [{"email": "wei@example.com", "name": "Wei Zhang"}]
+
+    def test_unreadable_cache_falls_back(self, tmp_path, state):
+        path = tmp_path / "cache-v3.json"
+        path.write_text(json.dumps({"cache": json.dumps(state)})[:-200])
+        assert gp.load_granola_meetings(str(path), "2026-02-12") == []
@@ -0,0 +1,749 @@
+"""Tests for scripts/indexer.py"""
+import json
+import os
+import pickle
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import indexer
+import snapshot_store
+
+
+@pytest.fixture
+def sample_meeting(brain_dir):
+    """Create an archived meeting file linking to a thread."""
+    meetings_dir = os.path.join(brain_dir, "archive", "meetings")
+    os.makedirs(meetings_dir, exist_ok=True)
+    path = os.path.join(meetings_dir, "2026-01-20-weekly-sync.md")
+    with open(path, "w") as f:
+        f.write("# Weekly Sync\n\n2026-01-20 with Wei Zhang\n\n- Discussed [[AISP Integration]]\n")
+    return path
+
+
+@pytest.fixture
+def conn(brain_dir):
+    """Open a fresh index database inside the brain directory."""
+    db = indexer.init_db(Path(brain_dir) / ".brain.db", indexer.SCHEMA_PATH)
+    yield db
+    db.close()
+
+
+def index_all(conn, brain_dir, jobs=1):
+    root = Path(brain_dir)
+    files = indexer.find_markdown_files(root)
+    stored = 0
+    for _path, record, error in indexer.parse_files(root, files, jobs):
+        assert error is None
+        if record is not None and indexer.store_document(conn, record):
+            stored += 1
+    conn.commit()
+    return stored
+
+
+class TestParseDocument:
+    """Test the database-free parse step."""
+
+    def test_thread_record(self, brain_dir, sample_threads):
+        record = indexer.parse_document(
+            Path(brain_dir), Path(sample_threads) / "aisp-integration.md")
+        assert record["type"] == "thread"
+        assert record["title"] == "AISP Integration"
+        assert record["entities"][0]["slug"] == "aisp-integration"
+        assert record["entities"][0]["metadata"]["status"] == "Active"
+        assert record["content_hash"] == indexer.sha256(record["content"])
+
+    def test_meeting_links(self, brain_dir, sample_meeting):
+        record = indexer.parse_document(Path(brain_dir), Path(sample_meeting))
+        assert record["links"] == [
+            {"name": "AISP Integration", "slug": "aisp-integration", "type": "mentioned_in"}
+        ]
+
+    def test_record_is_picklable(self, brain_dir, sample_people):
+        record = indexer.parse_document(
+            Path(brain_dir), Path(sample_people) / "wei-zhang.md")
+        assert pickle.loads(pickle.dumps(record)) == record
+
+    def test_unclassified_file_returns_none(self, brain_dir):
+        path = Path(brain_dir) / "inbox" / "notes.md"
+        path.write_text("# Stray\n")
+        assert indexer.parse_document(Path(brain_dir), path) is None
+
+
+class TestParallelParsing:
+    """Test the --jobs process pool."""
+
+    def test_pool_matches_serial(self, brain_dir, sample_threads, sample_people,
+                                 sample_commitments, sample_meeting):
+        root = Path(brain_dir)
+        files = indexer.find_markdown_files(root)
+        serial = list(indexer.parse_files(root, files, jobs=1))
+        pooled = list(indexer.parse_files(root, files, jobs=2))
+        assert pooled == serial
+
+    def test_errors_are_reported_not_raised(self, brain_dir):
+        root = Path(brain_dir)
+        missing = root / "threads" / "gone.md"
+        results = list(indexer.parse_files(root, [missing, missing], jobs=2))
+        assert all(record is None and error for _p, record, error in results)
+
+
+class TestStoreDocument:
+    """Test writing parsed records to SQLite."""
+
+    def test_indexes_entities_and_links(self, conn, brain_dir, sample_threads, sample_meeting):
+        index_all(conn, brain_dir)
+        rels = conn.execute("""
+            SELECT e1.slug, e2.slug, r.type FROM relationships r
+            JOIN entities e1 ON e1.id = r.source_id
+            JOIN entities e2 ON e2.id = r.target_id
+        """).fetchall()
+        assert ("2026-01-20-weekly-sync", "aisp-integration", "mentioned_in") in rels
+
+    def test_unchanged_documents_are_skipped(self, conn, brain_dir, sample_threads):
+        assert index_all(conn, brain_dir) > 0
+        assert index_all(conn, brain_dir) == 0
+
+
+class TestStatSignatures:
+    """Test skipping unchanged files by mtime/size/inode."""
+
+    def test_signature_recorded(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        path = Path(sample_threads) / "aisp-integration.md"
+        sigs = indexer.load_stat_signatures(conn)
+        assert sigs["threads/aisp-integration.md"] == indexer.stat_signature(path.stat())
+
+    def test_unchanged_stat_skips_without_reading(self, conn, brain_dir, sample_threads, monkeypatch):
+        index_all(conn, brain_dir)
+        path = Path(sample_threads) / "aisp-integration.md"
+
+        def fail_read(*args, **kwargs):
+            raise AssertionError("file should not be read")
+
+        monkeypatch.setattr(Path, "read_text", fail_read)
+        assert indexer.index_document(conn, Path(brain_dir), path) is False
+
+    def test_touch_refreshes_signature_only(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        path = Path(sample_threads) / "aisp-integration.md"
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert indexer.index_document(conn, Path(brain_dir), path) is False
+        sigs = indexer.load_stat_signatures(conn)
+        assert sigs["threads/aisp-integration.md"] == indexer.stat_signature(path.stat())
+
+    def test_old_database_gains_stat_columns(self, brain_dir):
+        db_path = Path(brain_dir) / ".brain.db"
+        old = sqlite3.connect(str(db_path))
+        old.execute("CREATE TABLE documents (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                    "type TEXT NOT NULL, title TEXT, content TEXT, content_hash TEXT, "
+                    "created_at TEXT, updated_at TEXT)")
+        old.commit()
+        old.close()
+        upgraded = indexer.init_db(db_path, indexer.SCHEMA_PATH)
+        columns = {row[1] for row in upgraded.execute("PRAGMA table_info(documents)")}
+        upgraded.close()
+        assert {"mtime_ns", "size", "inode"} <= columns
+
+
+class TestBulkLoad:
+    """Test the batched --full rebuild path."""
+
+    def snapshot(self, conn):
+        return [
+            conn.execute("SELECT id, path, type, title, content_hash FROM documents ORDER BY id").fetchall(),
+            conn.execute("SELECT * FROM entities ORDER BY id").fetchall(),
+            conn.execute("SELECT source_id, target_id, type, source_document_id "
+                         "FROM relationships ORDER BY id").fetchall(),
+            conn.execute("SELECT rowid, title, entity_names "
+                         "FROM search_index ORDER BY rowid").fetchall(),
+            conn.execute("SELECT rowid FROM search_index WHERE search_index MATCH 'aisp' "
+                         "ORDER BY rowid").fetchall(),
+            conn.execute("SELECT * FROM mentions ORDER BY entity_id, date, document_id, offset").fetchall(),
+            conn.execute("SELECT * FROM entity_degree ORDER BY entity_id, type").fetchall(),
+        ]
+
+    def test_matches_per_document_path(self, brain_dir, sample_threads, sample_people,
+                                       sample_commitments, sample_meeting, sample_handoff):
+        root = Path(brain_dir)
+        files = indexer.find_markdown_files(root)
+        records = [r for _, r, _ in indexer.parse_files(root, files) if r is not None]
+
+        slow = indexer.init_db(root / "slow.db", indexer.SCHEMA_PATH)
+        for record in records:
+            indexer.store_document(slow, record)
+        indexer.backfill_all_person_mentions(slow)  # as sync_documents does for new people
+        slow.commit()
+
+        fast = indexer.init_db(root / "fast.db", indexer.SCHEMA_PATH)
+        assert indexer.bulk_load(fast, iter(records)) == len(records)
+
+        assert self.snapshot(fast) == self.snapshot(slow)
+        slow.close()
+        fast.close()
+
+    def test_indexes_restored(self, conn, brain_dir, sample_threads):
+        before = sorted(r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'"))
+        root = Path(brain_dir)
+        records = [r for _, r, _ in indexer.parse_files(root, indexer.find_markdown_files(root)) if r]
+        indexer.bulk_load(conn, iter(records))
+        after = sorted(r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'"))
+        assert after == before
+
+
+class TestEntityCache:
+    """Test the preloaded (type, slug) -> entity map."""
+
+    def test_cache_matches_table(self, conn, brain_dir, sample_threads, sample_meeting):
+        index_all(conn, brain_dir)
+        cache = indexer.load_entity_cache(conn)
+        assert len(cache) == conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+        assert ("thread", "aisp-integration") in cache
+
+    def test_cached_lookup_issues_no_select(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        cache = indexer.load_entity_cache(conn)
+        statements = []
+        conn.set_trace_callback(statements.append)
+        entity_id = indexer.get_or_create_entity(conn, "AISP Integration", "thread",
+                                                 "aisp-integration", cache=cache)
+        conn.set_trace_callback(None)
+        assert entity_id == cache[("thread", "aisp-integration")][0]
+        assert statements == []
+
+    def test_update_only_when_metadata_changes(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        cache = indexer.load_entity_cache(conn)
+        entity_id, _, doc_id, meta_json = cache[("thread", "aisp-integration")]
+        statements = []
+        conn.set_trace_callback(statements.append)
+        indexer.get_or_create_entity(conn, "AISP Integration", "thread", "aisp-integration",
+                                     doc_id, json.loads(meta_json), cache)
+        indexer.get_or_create_entity(conn, "AISP Integration", "thread", "aisp-integration",
+                                     doc_id, {"status": "Resolved"}, cache)
+        conn.set_trace_callback(None)
+        assert len([s for s in statements if s.startswith("UPDATE")]) == 1
+        assert cache[("thread", "aisp-integration")][3] == '{"status": "Resolved"}'
+        assert cache[("thread", "aisp-integration")][0] == entity_id
+
+
+class TestWatchMode:
+    """Test incremental application of filesystem changes."""
+
+    def test_apply_changes_indexes_and_removes(self, conn, brain_dir, sample_threads):
+        root = Path(brain_dir)
+        index_all(conn, brain_dir)
+        gone = root / "threads" / "old-project.md"
+        gone.unlink()
+        added = root / "threads" / "new-topic.md"
+        added.write_text("# New Topic\n\nSee [[AISP Integration]]\n")
+
+        cache = indexer.load_entity_cache(conn)
+        stats = indexer.apply_changes(conn, root, {gone, added}, cache)
+        assert (stats["indexed"], stats["removed"]) == (1, 1)
+        paths = {r[0] for r in conn.execute("SELECT path FROM documents")}
+        assert "threads/new-topic.md" in paths
+        assert "threads/old-project.md" not in paths
+        assert ("thread", "old-project") not in cache
+        assert conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH 'dormant'"
+                            ).fetchone()[0] == 0
+
+    def test_removed_thread_kept_while_still_linked(self, conn, brain_dir, sample_threads, sample_meeting):
+        root = Path(brain_dir)
+        index_all(conn, brain_dir)
+        indexer.remove_document(conn, "threads/aisp-integration.md")
+        row = conn.execute("SELECT document_id FROM entities WHERE slug = 'aisp-integration'").fetchone()
+        assert row == (None,)
+
+    def test_rescan_diffs_against_database(self, conn, brain_dir, sample_threads):
+        root = Path(brain_dir)
+        index_all(conn, brain_dir)
+        (root / "threads" / "deployment-planning.md").unlink()
+        assert indexer.scan_changes(conn, root) == {root / "threads" / "deployment-planning.md"}
+
+    def test_polling_watcher_reports_changes(self, brain_dir, sample_threads):
+        root = Path(brain_dir)
+        watcher = indexer.PollingWatcher(root, interval=0.01)
+        path = root / "threads" / "aisp-integration.md"
+        path.write_text("# AISP Integration\n\nEdited\n")
+        assert path in watcher.poll(timeout=0.01)
+        assert watcher.poll(timeout=0.01) == set()
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_watcher_reports_changes(self, brain_dir, sample_threads):
+        root = Path(brain_dir)
+        watcher = indexer.InotifyWatcher(root)
+        path = root / "threads" / "aisp-integration.md"
+        path.write_text("# AISP Integration\n\nEdited\n")
+        (root / "threads" / "old-project.md").unlink()
+        changed = watcher.poll(timeout=1.0)
+        assert path in changed
+        assert root / "threads" / "old-project.md" in changed
+
+
+class TestRenamesAndOrphans:
+    """Test reconciling the index with files moved or deleted on disk."""
+
+    def sync(self, conn, root):
+        cache = indexer.load_entity_cache(conn)
+        changed = indexer.scan_changes(conn, root)
+        files = [p for p in changed if p.exists()]
+        vanished = [str(p.relative_to(root)) for p in changed if not p.exists()]
+        return indexer.sync_documents(conn, root, files, vanished, cache), cache
+
+    def test_rename_is_a_path_update(self, conn, brain_dir, sample_threads, sample_meeting):
+        root = Path(brain_dir)
+        index_all(conn, brain_dir)
+        doc_id = conn.execute("SELECT id FROM documents WHERE path = 'threads/old-project.md'").fetchone()[0]
+        os.rename(root / "threads" / "old-project.md", root / "threads" / "legacy-project.md")
+
+        stats, cache = self.sync(conn, root)
+        assert (stats["renamed"], stats["indexed"], stats["removed"]) == (1, 0, 0)
+        assert conn.execute("SELECT path FROM documents WHERE id = ?", (doc_id,)).fetchone() == (
+            "threads/legacy-project.md",)
+        assert ("thread", "legacy-project") in cache
+        assert ("thread", "old-project") not in cache
+        assert conn.execute("SELECT COUNT(*) FROM entities WHERE slug = 'legacy-project' "
+                            "AND document_id = ?", (doc_id,)).fetchone()[0] == 1
+
+    def test_rename_onto_linked_slug_reindexes(self, conn, brain_dir, sample_threads, sample_meeting):
+        root = Path(brain_dir)
+        index_all(conn, brain_dir)
+        # The meeting already links to aisp-integration, so that slug is taken
+        os.remove(root / "threads" / "aisp-integration.md")
+        os.rename(root / "threads" / "old-project.md", root / "threads" / "aisp-integration.md")
+
+        stats, _ = self.sync(conn, root)
+        assert stats["renamed"] == 0
+        assert stats["removed"] == 1
+        title = conn.execute("SELECT title FROM documents WHERE path = 'threads/aisp-integration.md'")
+        assert title.fetchone() == ("Old Project",)
+
+    def graph(self, conn):
+        """Entities, edges and mentions by slug and path, independent of row IDs."""
+        entities = conn.execute("""
+            SELECT e.type, e.slug, e.name, e.metadata, d.path FROM entities e
+            LEFT JOIN documents d ON d.id = e.document_id""").fetchall()
+        edges = conn.execute("""
+            SELECT s.type, s.slug, r.type, t.type, t.slug, d.path FROM relationships r
+            JOIN entities s ON s.id = r.source_id JOIN entities t ON t.id = r.target_id
+            LEFT JOIN documents d ON d.id = r.source_document_id""").fetchall()
+        mentions = conn.execute("""
+            SELECT e.type, e.slug, m.date, d.path, m.offset FROM mentions m
+            JOIN entities e ON e.id = m.entity_id JOIN documents d ON d.id = m.document_id""").fetchall()
+        return sorted(entities, key=repr), sorted(edges, key=repr), sorted(mentions, key=repr)
+
+    def full_graph(self, root, tmp_path):
+        full = indexer.init_db(tmp_path / "full.db", indexer.SCHEMA_PATH)
+        try:
+            files = indexer.find_markdown_files(root)
+            indexer.bulk_load(full, (r for _, r, _ in indexer.parse_files(root, files) if r is not None))
+            return self.graph(full)
+        finally:
+            full.close()
+
+    def test_rename_of_linked_file_matches_full(self, conn, brain_dir, sample_threads, tmp_path):
+        root = Path(brain_dir)
+        (root / "threads" / "revival.md").write_text(
+            "# Revival\n\n**Status**: Active\n\n## Updates\n- 2026-01-19: Picking up [[Old Project]]\n")
+        index_all(conn, brain_dir)
+        os.rename(root / "threads" / "old-project.md", root / "threads" / "legacy-project.md")
+
+        stats, cache = self.sync(conn, root)
+        # Revival still links to "Old Project", which a rebuild resolves to
+        # a placeholder, not to the renamed file
+        assert stats["renamed"] == 0
+        assert cache[("thread", "old-project")][2] is None
+        assert self.graph(conn) == self.full_graph(root, tmp_path)
+
+    def test_deleted_person_matches_full(self, conn, brain_dir, sample_people, sample_meeting, tmp_path):
+        root = Path(brain_dir)
+        self.sync(conn, root)
+        wei = ("SELECT COUNT(*) FROM relationships r JOIN entities e ON e.id = r.source_id "
+               "WHERE e.slug = 'wei-zhang'")
+        assert conn.execute(wei).fetchone()[0] > 0
+        os.remove(root / "people" / "wei-zhang.md")
+
+        stats, cache = self.sync(conn, root)
+        assert stats["removed"] == 1
+        assert ("person", "wei-zhang") not in cache
+        assert conn.execute(wei).fetchone()[0] == 0
+        assert self.graph(conn) == self.full_graph(root, tmp_path)
+
+    def test_deleted_link_placeholder_matches_full(self, conn, brain_dir, sample_threads, tmp_path):
+        root = Path(brain_dir)
+        (root / "threads" / "revival.md").write_text(
+            "# Revival\n\n**Status**: Active\n\n## Updates\n- 2026-01-19: See [[Ghost Thread]]\n")
+        self.sync(conn, root)
+        os.remove(root / "threads" / "revival.md")
+
+        stats, cache = self.sync(conn, root)
+        assert stats["removed"] == 1
+        assert ("thread", "ghost-thread") not in cache
+        assert self.graph(conn) == self.full_graph(root, tmp_path)
+        hits = conn.execute("SELECT COUNT(*) FROM entity_search WHERE entity_search MATCH 'ghost'")
+        assert hits.fetchone()[0] == 0
+
+    def test_orphans_purged_in_one_pass(self, conn, brain_dir, sample_threads, sample_people):
+        root = Path(brain_dir)
+        index_all(conn, brain_dir)
+        os.remove(root / "threads" / "old-project.md")
+        os.remove(root / "people" / "simone-cirillo.md")
+
+        stats, _ = self.sync(conn, root)
+        assert stats["removed"] == 2
+        for term in ("dormant", "onboarding"):
+            hits = conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH ?", (term,))
+            assert hits.fetchone()[0] == 0
+
+
+class TestSearchIndex:
+    """Test the external-content FTS table kept in sync by triggers."""
+
+    def search(self, conn, term):
+        return [r[0] for r in conn.execute(
+            "SELECT d.path FROM search_index JOIN documents d ON d.id = search_index.rowid "
+            "WHERE search_index MATCH ? ORDER BY d.path", (term,))]
+
+    def test_edit_replaces_fts_entry(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        assert self.search(conn, "dormant") == ["threads/old-project.md"]
+        path = Path(sample_threads) / "old-project.md"
+        path.write_text("# Old Project\n\n**Status**: Revived\n")
+        index_all(conn, brain_dir)
+        assert self.search(conn, "dormant") == []
+        assert self.search(conn, "revived") == ["threads/old-project.md"]
+        conn.execute("INSERT INTO search_index (search_index, rank) VALUES ('integrity-check', 1)")
+
+    def test_bulk_load_fills_index(self, conn, brain_dir, sample_threads, sample_meeting):
+        root = Path(brain_dir)
+        files = indexer.find_markdown_files(root)
+        triggers = "SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+        before = conn.execute(triggers).fetchall()
+        indexer.bulk_load(conn, (r for _, r, _ in indexer.parse_files(root, files) if r is not None))
+        assert self.search(conn, "aisp") == [
+            "archive/meetings/2026-01-20-weekly-sync.md", "threads/aisp-integration.md"]
+        assert conn.execute(triggers).fetchall() == before
+        hits = conn.execute("SELECT COUNT(*) FROM entity_search WHERE entity_search MATCH 'ntegr'")
+        assert hits.fetchone()[0] == 1
+
+    def test_old_search_index_migrated(self, brain_dir, sample_threads):
+        db_path = Path(brain_dir) / ".brain.db"
+        old = sqlite3.connect(str(db_path))
+        old.executescript("""
+            CREATE TABLE documents (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+                type TEXT NOT NULL, title TEXT, content TEXT, content_hash TEXT,
+                created_at TEXT, updated_at TEXT);
+            CREATE VIRTUAL TABLE search_index USING fts5(title, content, entity_names,
+                path UNINDEXED, document_id UNINDEXED, type UNINDEXED);
+            INSERT INTO documents VALUES (1, 'threads/old-project.md', 'thread', 'Old Project',
+                'Status: Dormant', 'x', '', '');
+            INSERT INTO search_index VALUES ('Old Project', 'Status: Dormant', 'Phase One',
+                'threads/old-project.md', '1', 'thread');
+        """)
+        old.close()
+        upgraded = indexer.init_db(db_path, indexer.SCHEMA_PATH)
+        assert self.search(upgraded, "dormant") == ["threads/old-project.md"]
+        assert self.search(upgraded, "entity_names:phase") == ["threads/old-project.md"]
+        upgraded.close()
+
+    def test_type_column_added(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        conn.executescript("""
+            DROP TRIGGER documents_fts_insert;
+            DROP TABLE search_index;
+            CREATE VIRTUAL TABLE search_index USING fts5(title, content, entity_names,
+                content='documents', content_rowid='id', tokenize='porter unicode61');
+            INSERT INTO search_index (search_index) VALUES ('rebuild');
+            UPDATE indexer_meta SET value = '7' WHERE key = 'schema_version';
+        """)
+        upgraded = indexer.init_db(Path(brain_dir) / ".brain.db", indexer.SCHEMA_PATH)
+        assert self.search(upgraded, "type:thread AND dormant") == ["threads/old-project.md"]
+        upgraded.close()
+
+
+class TestMigrations:
+    """Test schema versioning and in-place upgrades."""
+
+    def version(self, conn):
+        return conn.execute("SELECT value FROM indexer_meta WHERE key = 'schema_version'").fetchone()
+
+    def test_fresh_database_is_current(self, conn):
+        assert self.version(conn) == (str(indexer.SCHEMA_VERSION),)
+
+    def test_unversioned_database_upgraded_without_reparse(self, brain_dir, sample_threads):
+        db_path = Path(brain_dir) / ".brain.db"
+        old = sqlite3.connect(str(db_path))
+        old.executescript("""
+            CREATE TABLE documents (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+                type TEXT NOT NULL, title TEXT, content TEXT, content_hash TEXT,
+                created_at TEXT, updated_at TEXT);
+            CREATE TABLE indexer_meta (key TEXT PRIMARY KEY, value TEXT);
+            INSERT INTO documents VALUES (7, 'threads/gone.md', 'thread', 'Gone', 'x', 'h', '', '');
+        """)
+        old.close()
+        upgraded = indexer.init_db(db_path, indexer.SCHEMA_PATH)
+        assert self.version(upgraded) == (str(indexer.SCHEMA_VERSION),)
+        # Rows survive as they were; nothing was re-read from the brain
+        assert upgraded.execute("SELECT id, path FROM documents").fetchall() == [(7, "threads/gone.md")]
+        upgraded.close()
+
+    def test_migrations_are_idempotent(self, conn, brain_dir, sample_threads):
+        index_all(conn, brain_dir)
+        for migrate in indexer.MIGRATIONS:
+            migrate(conn)
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH 'dormant'"
+                            ).fetchone()[0] == 1
+
+    def test_only_pending_migrations_run(self, brain_dir, monkeypatch):
+        db_path = Path(brain_dir) / ".brain.db"
+        indexer.init_db(db_path, indexer.SCHEMA_PATH).close()
+        ran = []
+        monkeypatch.setattr(indexer, "MIGRATIONS", indexer.MIGRATIONS + [lambda c: ran.append(1) or []])
+        monkeypatch.setattr(indexer, "SCHEMA_VERSION", indexer.SCHEMA_VERSION + 1)
+        indexer.init_db(db_path, indexer.SCHEMA_PATH).close()
+        indexer.init_db(db_path, indexer.SCHEMA_PATH).close()
+        assert ran == [1]
+
+    def test_newer_database_refused(self, conn, brain_dir):
+        conn.execute("UPDATE indexer_meta SET value = '999' WHERE key = 'schema_version'")
+        conn.commit()
+        with pytest.raises(RuntimeError):
+            indexer.init_db(Path(brain_dir) / ".brain.db", indexer.SCHEMA_PATH)
+
+
+class TestPersonMentions:
+    """Test person -> meeting edges recorded at index time."""
+
+    PEOPLE = (("Wei Zhang", "wei-zhang"), ("Wei", "wei"), ("Simone Cirillo", "simone-cirillo"))
+
+    def meetings_for(self, conn, slug):
+        return conn.execute("""
+            SELECT d.path, r.type FROM relationships r
+            JOIN entities p ON p.id = r.source_id
+            JOIN documents d ON d.id = r.source_document_id
+            WHERE p.type = 'person' AND p.slug = ? ORDER BY d.path
+        """, (slug,)).fetchall()
+
+    def test_extract_attendees_and_mentions(self):
+        content = "# Sync\n\n**Attendees**: Simone Cirillo\n\nWEI ZHANG's update. Weird results.\n"
+        assert indexer.extract_person_mentions(content, self.PEOPLE) == [
+            {"name": "Simone Cirillo", "slug": "simone-cirillo", "type": "attended", "offset": 23},
+            {"name": "Wei", "slug": "wei", "type": "mentioned_in", "offset": 39},
+            {"name": "Wei Zhang", "slug": "wei-zhang", "type": "mentioned_in", "offset": 39},
+        ]
+
+    def test_people_and_meetings_in_one_run(self, conn, brain_dir, sample_people, sample_meeting):
+        root = Path(brain_dir)
+        indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [])
+        assert self.meetings_for(conn, "wei-zhang") == [
+            ("archive/meetings/2026-01-20-weekly-sync.md", "mentioned_in")]
+        assert self.meetings_for(conn, "simone-cirillo") == []
+
+    def test_new_person_backfilled_from_existing_meetings(self, conn, brain_dir, sample_meeting):
+        root = Path(brain_dir)
+        cache = indexer.load_entity_cache(conn)
+        indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [], cache)
+        assert self.meetings_for(conn, "wei-zhang") == []
+
+        person = root / "people" / "wei-zhang.md"
+        person.write_text("# Wei Zhang\n\n**Role**: Lead\n")
+        indexer.sync_documents(conn, root, [person], [], cache)
+        assert self.meetings_for(conn, "wei-zhang") == [
+            ("archive/meetings/2026-01-20-weekly-sync.md", "mentioned_in")]
+
+        # Editing the meeting re-derives its edges without duplicating them
+        meeting = Path(sample_meeting)
+        meeting.write_text(meeting.read_text() + "\nAttendees: Wei Zhang\n")
+        indexer.sync_documents(conn, root, [meeting], [], cache)
+        assert self.meetings_for(conn, "wei-zhang") == [
+            ("archive/meetings/2026-01-20-weekly-sync.md", "attended")]
+
+
+class TestEntityDegree:
+    """Test the trigger-maintained degree counts and PageRank scores."""
+
+    def degrees(self, conn):
+        return sorted(conn.execute(
+            "SELECT entity_id, type, in_degree, out_degree FROM entity_degree"
+        ).fetchall())
+
+    def test_triggers_match_recount(self, conn, brain_dir, sample_threads, sample_people, sample_meeting):
+        root = Path(brain_dir)
+        indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [])
+        incremental = self.degrees(conn)
+        assert incremental
+        indexer.rebuild_entity_degree(conn)
+        assert self.degrees(conn) == incremental
+
+        # Purging the meeting (and its edges) counts back down to nothing
+        os.remove(sample_meeting)
+        indexer.sync_documents(conn, root, [], ["archive/meetings/2026-01-20-weekly-sync.md"])
+        assert conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 0
+        assert self.degrees(conn) == []
+
+    def test_totals_per_entity(self, conn, brain_dir, sample_threads):
+        root = Path(brain_dir)
+        indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [])
+        totals = dict(conn.execute("""
+            SELECT e.slug, d.degree FROM entity_degree d JOIN entities e ON e.id = d.entity_id
+            WHERE d.type = '*'
+        """).fetchall())
+        for slug, degree in totals.items():
+            assert degree == conn.execute("""
+                SELECT COUNT(*) FROM relationships r JOIN entities e ON e.id IN (r.source_id, r.target_id)
+                WHERE e.slug = ?
+            """, (slug,)).fetchone()[0]
+
+    def test_pagerank_favours_hubs(self, conn):
+        ids = [conn.execute("INSERT INTO entities (name, type, slug) VALUES (?, 'thread', ?)",
+                            (f"T{i}", f"t{i}")).lastrowid for i in range(5)]
+        conn.executemany("INSERT INTO relationships (source_id, target_id, type) VALUES (?, ?, 'related_to')",
+                         [(ids[0], other) for other in ids[1:]])
+        assert indexer.compute_pagerank(conn) == 5
+        ranks = dict(conn.execute("SELECT entity_id, pagerank FROM entity_degree WHERE pagerank IS NOT NULL"))
+        assert max(ranks, key=ranks.get) == ids[0]
+        assert sum(ranks.values()) == pytest.approx(1.0)
+
+
+class TestTimeline:
+    """Test the dated mentions behind query-graph.py timeline."""
+
+    def timeline(self, conn, slug):
+        return conn.execute("""
+            SELECT m.date, d.path FROM mentions m
+            JOIN entities e ON e.id = m.entity_id
+            JOIN documents d ON d.id = m.document_id
+            WHERE e.slug = ? ORDER BY m.date, d.path
+        """, (slug,)).fetchall()
+
+    def test_handoff_lines_dated_by_session(self):
+        content = ("# Handoff\n\n## 2026-01-20 — session\n### Outcomes\n- Shipped [[AISP]]\n\n"
+                   "## Notes\n- Undated [[AISP]]\n")
+        timeline = indexer.extract_timeline("handoff.md", "handoff", content, "Handoff")
+        assert [(m["slug"], m["date"], content[m["offset"]:m["offset"] + 8]) for m in timeline] == [
+            ("aisp", "2026-01-20", "[[AISP]]")]
+
+    def test_meeting_dated_by_filename(self, brain_dir, sample_meeting):
+        record = indexer.parse_document(Path(brain_dir), Path(sample_meeting),
+                                        (("Wei Zhang", "wei-zhang"),))
+        assert {(m["type"], m["slug"], m["date"]) for m in record["timeline"]} == {
+            ("meeting", "2026-01-20-weekly-sync", "2026-01-20"),
+            ("person", "wei-zhang", "2026-01-20"),
+            ("thread", "aisp-integration", "2026-01-20"),
+        }
+
+    def test_indexed_across_documents(self, conn, brain_dir, sample_threads, sample_people,
+                                      sample_meeting, sample_handoff):
+        root = Path(brain_dir)
+        indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [])
+        assert self.timeline(conn, "aisp-integration") == [
+            ("2026-01-15", "threads/aisp-integration.md"),
+            ("2026-01-18", "threads/aisp-integration.md"),
+            ("2026-01-20", "archive/meetings/2026-01-20-weekly-sync.md"),
+        ]
+        assert self.timeline(conn, "wei-zhang") == [
+            ("2026-01-20", "archive/meetings/2026-01-20-weekly-sync.md")]
+
+        os.remove(sample_meeting)
+        indexer.sync_documents(conn, root, [], ["archive/meetings/2026-01-20-weekly-sync.md"])
+        assert self.timeline(conn, "wei-zhang") == []
+
+    def test_migration_matches_indexing(self, conn, brain_dir, sample_threads, sample_people,
+                                        sample_meeting, sample_handoff):
+        root = Path(brain_dir)
+        indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [])
+        indexed = conn.execute("SELECT * FROM mentions ORDER BY entity_id, date, document_id, offset").fetchall()
+        assert indexed
+
+        indexer.rebuild_mentions(conn)
+        assert conn.execute(
+            "SELECT * FROM mentions ORDER BY entity_id, date, document_id, offset").fetchall() == indexed
+
+
+def write_snapshot(brain_dir, relpath, doc_id, title, transcript, **fields):
+    snapshot = {"id": doc_id, "title": title, "created_at": relpath[:10] + "T10:00:00Z",
+                "start": relpath[:10] + "T10:00:00Z", "end": relpath[:10] + "T10:30:00Z",
+                "attendees": [{"email": "wei@example.com", "name": "Wei Zhang"}],
+                "word_count": len(transcript.split()), "transcript": transcript}
+    snapshot.update(fields)
+    path = Path(brain_dir) / "inbox" / "granola" / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(snapshot))
+    return snapshot
+
+
+class TestMeetings:
+    """Test indexing Granola snapshots into meetings and transcript documents."""
+
+    def search(self, conn, term):
+        return [r[0] for r in conn.execute(
+            "SELECT d.path FROM search_index JOIN documents d ON d.id = search_index.rowid "
+            "WHERE search_index MATCH ? ORDER BY d.path", (term,))]
+
+    def test_chunk_transcript(self):
+        text = "\n".join(f"line {i} " + "word " * 8 for i in range(10))
+        chunks = indexer.chunk_transcript(text, size=25)
+        assert [len(c.split()) for c in chunks] == [20, 20, 20, 20, 20]
+        assert "\n".join(chunks).split() == text.split()
+        assert indexer.chunk_transcript("a " * 7, size=3) == ["a a a", "a a a", "a"]
+        assert indexer.chunk_transcript("  \n") == []
+
+    def test_meeting_rows_and_search(self, conn, brain_dir):
+        write_snapshot(brain_dir, "2026-02-10/sync--aaaaaaaa.json", "aaaaaaaa-1", "Weekly Sync",
+                       "\n".join(["we agreed on the pricing rollout"] + ["filler words here"] * 200))
+        write_snapshot(brain_dir, "2026-02-11/empty--bbbbbbbb.json", "bbbbbbbb-2", "Planning", "")
+        stats = indexer.index_meetings(conn, Path(brain_dir))
+        assert stats == {"indexed": 2, "skipped": 0, "removed": 0}
+
+        row = conn.execute("SELECT id, title, date, start_time, end_time, attendees, word_count, chunks "
+                           "FROM meetings WHERE source = '2026-02-10/sync--aaaaaaaa.json'").fetchone()
+        assert row[:5] == ("aaaaaaaa-1", "Weekly Sync", "2026-02-10",
+                           "2026-02-10T10:00:00Z", "2026-02-10T10:30:00Z")
+        assert json.loads(row[5]) == [{"email": "wei@example.com", "name": "Wei Zhang"}]
+        assert row[6:] == (606, 3)
+        assert self.search(conn, "pricing") == ["inbox/granola/2026-02-10/sync--aaaaaaaa.json#0"]
+        assert self.search(conn, "type:transcript AND planning") == [
+            "inbox/granola/2026-02-11/empty--bbbbbbbb.json#0"]
+
+    def test_incremental(self, conn, brain_dir):
+        write_snapshot(brain_dir, "2026-02-10/sync--aaaaaaaa.json", "aaaaaaaa-1", "Sync", "about budgets")
+        write_snapshot(brain_dir, "2026-02-11/plan--bbbbbbbb.json", "bbbbbbbb-2", "Plan", "about hiring")
+        indexer.index_meetings(conn, Path(brain_dir))
+        assert indexer.index_meetings(conn, Path(brain_dir)) == {"indexed": 0, "skipped": 2, "removed": 0}
+
+        write_snapshot(brain_dir, "2026-02-10/sync--aaaaaaaa.json", "aaaaaaaa-1", "Sync", "about roadmaps now")
+        os.remove(Path(brain_dir) / "inbox" / "granola" / "2026-02-11" / "plan--bbbbbbbb.json")
+        assert indexer.index_meetings(conn, Path(brain_dir)) == {"indexed": 1, "skipped": 0, "removed": 1}
+        assert self.search(conn, "budgets OR hiring") == []
+        assert self.search(conn, "roadmaps") == ["inbox/granola/2026-02-10/sync--aaaaaaaa.json#0"]
+        assert conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0] == 1
+        conn.execute("INSERT INTO search_index (search_index, rank) VALUES ('integrity-check', 1)")
+
+    def test_snapshot_store(self, conn, brain_dir):
+        inbox = str(Path(brain_dir) / "inbox" / "granola")
+        write_snapshot(brain_dir, "2026-02-10/sync--aaaaaaaa.json", "aaaaaaaa-1", "Sync", "about budgets")
+        indexer.index_meetings(conn, Path(brain_dir))
+
+        store = snapshot_store.open_store(inbox, create=True)
+        snapshot_store.import_files(store, inbox)
+        store.close()
+        # Moving into the store changes the signature, not the meeting
+        assert indexer.index_meetings(conn, Path(brain_dir))["indexed"] == 1
+        assert indexer.index_meetings(conn, Path(brain_dir))["skipped"] == 1
+        assert conn.execute("SELECT source, mtime_ns FROM meetings").fetchall() == [
+            ("2026-02-10/sync--aaaaaaaa.json", None)]
+        assert self.search(conn, "budgets") == ["inbox/granola/2026-02-10/sync--aaaaaaaa.json#0"]
+
+    def test_markdown_sync_leaves_transcripts(self, conn, brain_dir, sample_threads):
+        write_snapshot(brain_dir, "2026-02-10/sync--aaaaaaaa.json", "aaaaaaaa-1", "Sync", "about budgets")
+        index_all(conn, brain_dir)
+        indexer.index_meetings(conn, Path(brain_dir))
+        assert indexer.scan_changes(conn, Path(brain_dir)) == set()
+        assert self.search(conn, "budgets") == ["inbox/granola/2026-02-10/sync--aaaaaaaa.json#0"]
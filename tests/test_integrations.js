@@ -56,6 +56,14 @@ assert(status.watching === false, 'Status shows not watching');
 assert(status.messagesProcessed === 0, 'Status shows 0 messages processed');
 assert(status.lastError === null, 'Status shows no errors');
 
+// --- Search module ---
+console.log('\n=== Test: Search module ===');
+
+const { SEARCH_TYPES } = require(path.join(__dirname, '..', 'web', 'search'));
+for (const type of ['thread', 'person', 'meeting', 'transcript', 'handoff', 'commitment']) {
+  assert(SEARCH_TYPES.includes(type), `Search can filter on ${type}`);
+}
+
 // --- Summary ---
 console.log(`\n===========================`);
 console.log(`Results: ${pass} passed, ${fail} failed`);
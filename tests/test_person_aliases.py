@@ -0,0 +1,118 @@
+"""Tests for scripts/person_aliases.py"""
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import indexer
+import person_aliases
+gp = importlib.import_module('generate-prep')
+
+
+@pytest.fixture
+def people(brain_dir, sample_people):
+    """Two more people: one sharing a first name, one with an email line."""
+    files = {
+        "wei-chen.md": "# Wei Chen\n\n**Role**: Designer\n",
+        "sam.md": "# Samantha Ortiz\n\n**Email**: Sam.Ortiz@example.com, sortiz@example.org\n",
+    }
+    for fname, content in files.items():
+        with open(os.path.join(brain_dir, "people", fname), "w") as f:
+            f.write(content)
+    return os.path.join(brain_dir, "people")
+
+
+def index_brain(brain_dir):
+    root = Path(brain_dir)
+    conn = indexer.init_db(root / ".brain.db", indexer.SCHEMA_PATH)
+    indexer.sync_documents(conn, root, indexer.find_markdown_files(root), [])
+    indexer.index_meetings(conn, root)
+    indexer.rebuild_person_aliases(conn)
+    conn.commit()
+    return conn
+
+
+class TestAliases:
+    """Test deriving aliases from a people file."""
+
+    def test_person_aliases(self):
+        content = "# Samantha Ortiz\n\n- **Email**: sam@example.com\n\nMet bob@example.com at lunch\n"
+        assert person_aliases.person_aliases("sam", "Samantha Ortiz", content) == {
+            ("email", "sam@example.com"), ("name", "sam"), ("part", "sam"),
+            ("name", "samantha-ortiz"), ("part", "samantha"), ("part", "ortiz"),
+        }
+
+    def test_initials_not_parts(self):
+        assert ("part", "jd") not in person_aliases.person_aliases("jd-smith", "J.D. Smith", "")
+
+
+class TestResolve:
+    """Test resolving attendees and titles against people files."""
+
+    def test_email_then_name(self, people):
+        aliases = person_aliases.AliasIndex.from_files(people)
+        assert aliases.resolve({"name": "S. O.", "email": "sam.ortiz@example.com"}).endswith("sam.md")
+        assert aliases.resolve({"name": "Samantha Ortiz", "email": ""}).endswith("sam.md")
+        assert aliases.resolve({"name": "Wei Chen", "email": "w@example.com"}).endswith("wei-chen.md")
+        assert aliases.resolve({"name": "Zhang", "email": ""}).endswith("wei-zhang.md")
+        assert aliases.ambiguous == {}
+
+    def test_shared_first_name_is_ambiguous(self, people):
+        aliases = person_aliases.AliasIndex.from_files(people)
+        attendee = {"name": "Wei", "email": "wei@other.com"}
+        assert aliases.resolve(attendee) is None
+        assert aliases.ambiguous == {"wei": ["wei-chen", "wei-zhang"]}
+        assert aliases.candidates(attendee) == ["wei-chen", "wei-zhang"]
+
+    def test_title_whole_words(self, people):
+        aliases = person_aliases.AliasIndex.from_files(people)
+        assert [a["name"] for a in aliases.in_title("Simone / Wei Zhang sync")] == ["Simone Cirillo", "Wei Zhang"]
+        assert aliases.in_title("Weigh-in on samples") == []
+        assert aliases.in_title("1:1 with Wei") == []
+        assert "wei" in aliases.ambiguous
+
+    def test_prep_reports_ambiguity(self, brain_dir, people):
+        lookup = gp.find_people_files(brain_dir)
+        meeting = {"title": "Sync", "attendees": [{"name": "Wei", "email": ""}]}
+        prep = gp.generate_prep(meeting, brain_dir, lookup)
+        assert "Ambiguous: could be [[wei-chen]], [[wei-zhang]]" in prep
+
+
+class TestAliasIndex:
+    """Test the person_aliases table built by the indexer."""
+
+    def test_same_as_files(self, brain_dir, people):
+        conn = index_brain(brain_dir)
+        from_db = person_aliases.AliasIndex.from_db(conn, people)
+        assert from_db.slugs == person_aliases.AliasIndex.from_files(people).slugs
+        conn.close()
+
+    def test_attendee_emails_learned(self, brain_dir, people):
+        snapshot = {"id": "m1", "title": "Sync", "created_at": "2026-02-10T10:00:00Z",
+                    "attendees": [{"email": "WZ@corp.com", "name": "Wei Zhang"},
+                                  {"email": "someone@corp.com", "name": "Wei"},
+                                  {"email": "sortiz@example.org", "name": "Simone Cirillo"}]}
+        path = Path(brain_dir) / "inbox" / "granola" / "2026-02-10" / "sync--m1.json"
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps(snapshot))
+        conn = index_brain(brain_dir)
+        emails = conn.execute("SELECT alias, slug FROM person_aliases WHERE kind = 'email' ORDER BY alias").fetchall()
+        assert emails == [("sam.ortiz@example.com", "sam"), ("sortiz@example.org", "sam"), ("wz@corp.com", "wei-zhang")]
+        conn.close()
+
+    def test_prep_uses_current_index(self, brain_dir, people, monkeypatch):
+        index_brain(brain_dir).close()
+        monkeypatch.setattr(person_aliases.AliasIndex, "from_files",
+                            classmethod(lambda cls, d: pytest.fail("read people files")))
+        assert gp.load_people(brain_dir).resolve({"name": "Wei Zhang"}).endswith("wei-zhang.md")
+
+    def test_stale_index_falls_back(self, brain_dir, people):
+        index_brain(brain_dir).close()
+        with open(os.path.join(people, "ana-lima.md"), "w") as f:
+            f.write("# Ana Lima\n")
+        assert gp.load_people(brain_dir).resolve({"name": "Ana Lima"}).endswith("ana-lima.md")
@@ -0,0 +1,289 @@
+"""Tests for scripts/query-graph.py"""
+import importlib
+import json
+import os
+import socketserver
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import indexer
+qg = importlib.import_module('query-graph')
+
+
+@pytest.fixture
+def brain_db(brain_dir, sample_threads, sample_people, monkeypatch):
+    """Index the sample brain and point query-graph at it."""
+    root = Path(brain_dir)
+    db_path = root / ".brain.db"
+    conn = indexer.init_db(db_path, indexer.SCHEMA_PATH)
+    files = indexer.find_markdown_files(root)
+    indexer.bulk_load(conn, (r for _, r, _ in indexer.parse_files(root, files) if r is not None))
+    conn.close()
+    monkeypatch.setattr(qg, "DB_PATH", db_path)
+    monkeypatch.setattr(qg, "SOCKET_PATH", root / ".brain.sock")
+    monkeypatch.setattr(qg, "_conn", None)
+    return db_path
+
+
+@pytest.fixture
+def server(brain_db):
+    """Run the query service on a background thread."""
+    srv = socketserver.UnixStreamServer(str(qg.SOCKET_PATH), qg.QueryHandler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+class TestConnection:
+    """Test the shared, warm connection."""
+
+    def test_connection_reused(self, brain_db):
+        assert qg.get_conn() is qg.get_conn()
+
+    def test_reopened_when_database_replaced(self, brain_db):
+        first = qg.get_conn()
+        replacement = brain_db.with_name("new.db")
+        indexer.init_db(replacement, indexer.SCHEMA_PATH).close()
+        os.replace(replacement, brain_db)
+        assert qg.get_conn() is not first
+        assert qg.get_conn().execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 0
+
+
+    def test_outdated_schema_refused(self, brain_db):
+        conn = sqlite3.connect(str(brain_db))
+        conn.execute("UPDATE indexer_meta SET value = '1' WHERE key = 'schema_version'")
+        conn.commit()
+        conn.close()
+        with pytest.raises(SystemExit):
+            qg.get_conn()
+
+
+class TestServe:
+    """Test forwarding commands to a resident server."""
+
+    def test_no_server_falls_back(self, brain_db):
+        assert qg.forward(["stats"]) is None
+
+    def test_forwarded_output_matches_local(self, server, capsys):
+        reply = qg.forward(["thread", "AISP"])
+        qg._conn = None  # the server thread's connection can't be used here
+        qg.run_command(["thread", "AISP"])
+        local = capsys.readouterr().out
+        assert reply == {"stdout": local, "stderr": "", "code": 0}
+        assert "=== AISP Integration ===" in local
+
+    def test_errors_carry_exit_code(self, server, brain_db):
+        brain_db.unlink()
+        reply = qg.forward(["stats"])
+        assert reply["code"] == 1
+        assert "Database not found" in reply["stderr"]
+
+    def test_command_line_forwarded(self, server, brain_db, capsys, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["query-graph.py", str(brain_db.parent), "stats"])
+        with pytest.raises(SystemExit) as exit_info:
+            qg.forward_command()
+        assert exit_info.value.code == 0
+        assert "=== Brain Graph Stats ===" in capsys.readouterr().out
+
+    def test_command_line_runs_locally_without_server(self, brain_db, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["query-graph.py", str(brain_db.parent), "stats"])
+        assert qg.forward_command() is None
+
+    def test_stale_socket_is_ignored(self, brain_db):
+        qg.SOCKET_PATH.touch()
+        assert qg.forward(["stats"]) is None
+
+
+class TestFormats:
+    """Test --format json / ndjson output."""
+
+    def run(self, capsys, *args):
+        qg.run_command(list(args))
+        return capsys.readouterr().out
+
+    def test_json_thread(self, brain_db, capsys):
+        data = json.loads(self.run(capsys, "--format", "json", "thread", "AISP"))
+        assert data["thread"]["name"] == "AISP Integration"
+        assert data["thread"]["metadata"]["status"] == "Active"
+        assert set(data) == {"thread", "related_threads", "meetings", "people"}
+
+    def test_json_missing_entity(self, brain_db, capsys):
+        assert json.loads(self.run(capsys, "person", "Nobody", "--format=json")) == {"person": None}
+
+    def test_ndjson_stats(self, brain_db, capsys):
+        lines = [json.loads(line) for line in self.run(capsys, "--format", "ndjson", "stats").splitlines()]
+        assert lines[0]["section"] == "totals"
+        by_type = {r["type"]: r["n"] for r in lines if r["section"] == "documents_by_type"}
+        assert (by_type["thread"], by_type["person"]) == (3, 2)
+        assert lines[0]["documents"] == sum(by_type.values())
+
+    def test_text_unchanged_by_default(self, brain_db, capsys):
+        out = self.run(capsys, "timeline", "zzzunmatched")
+        assert out == "No mentions found for 'zzzunmatched'\n"
+
+    def test_search_pages(self, brain_db, capsys):
+        first = json.loads(self.run(capsys, "search", "active", "--limit", "1", "--format", "json"))
+        assert len(first["results"]) == 1
+        rest = json.loads(self.run(capsys, "search", "active", "--after", first["next"], "--format", "json"))
+        assert first["results"][0]["path"] not in {r["path"] for r in rest["results"]}
+        assert {r["type"] for r in first["results"] + rest["results"]} == {"thread"}
+
+    def test_unknown_format_rejected(self, brain_db):
+        with pytest.raises(SystemExit):
+            qg.run_command(["--format", "xml", "stats"])
+
+
+@pytest.fixture
+def graph_db(brain_db):
+    """A small hand-built graph: meeting -> aisp <- deploy -> wei, plus an island."""
+    conn = sqlite3.connect(str(brain_db))
+    ids = {slug: conn.execute("SELECT id FROM entities WHERE slug = ?", (slug,)).fetchone()[0]
+           for slug in ("aisp-integration", "deployment-planning", "wei-zhang", "old-project")}
+    ids["weekly-sync"] = conn.execute(
+        "INSERT INTO entities (name, type, slug) VALUES ('Weekly Sync', 'meeting', 'weekly-sync')"
+    ).lastrowid
+    conn.executemany("INSERT INTO relationships (source_id, target_id, type) VALUES (?, ?, ?)", [
+        (ids["weekly-sync"], ids["aisp-integration"], "mentioned_in"),
+        (ids["deployment-planning"], ids["aisp-integration"], "related_to"),
+        (ids["deployment-planning"], ids["wei-zhang"], "attended"),
+    ])
+    conn.commit()
+    conn.close()
+    return brain_db
+
+
+class TestTraversal:
+    """Test the neighborhood and path commands."""
+
+    def run(self, capsys, *args):
+        qg.run_command(list(args) + ["--format", "json"])
+        return json.loads(capsys.readouterr().out)
+
+    def test_neighborhood_depths(self, graph_db, capsys):
+        data = self.run(capsys, "neighborhood", "Weekly Sync", "--depth", "3")
+        assert [(n["name"], n["depth"]) for n in data["neighbors"]] == [
+            ("AISP Integration", 1), ("Deployment Planning", 2), ("Wei Zhang", 3)]
+
+    def test_neighborhood_filters(self, graph_db, capsys):
+        data = self.run(capsys, "neighborhood", "AISP", "--depth", "2", "--type", "person")
+        assert [n["name"] for n in data["neighbors"]] == ["Wei Zhang"]
+        data = self.run(capsys, "neighborhood", "AISP", "--depth", "2", "--rel", "mentioned_in,attended")
+        assert [n["name"] for n in data["neighbors"]] == ["Weekly Sync"]
+
+    def test_shortest_path(self, graph_db, capsys):
+        data = self.run(capsys, "path", "Weekly Sync", "--to", "Wei Zhang")
+        assert [(s["name"], s["rel_type"], s["direction"]) for s in data["path"]] == [
+            ("Weekly Sync", None, None),
+            ("AISP Integration", "mentioned_in", "out"),
+            ("Deployment Planning", "related_to", "in"),
+            ("Wei Zhang", "attended", "out"),
+        ]
+
+    def test_path_respects_depth(self, graph_db, capsys):
+        assert self.run(capsys, "path", "Weekly Sync", "--to", "Wei Zhang", "--depth", "2")["path"] == []
+        assert self.run(capsys, "path", "Wei Zhang", "--to", "Old Project")["path"] == []
+
+    def test_path_text(self, graph_db, capsys):
+        qg.run_command(["path", "Wei Zhang", "--to", "Deployment"])
+        assert capsys.readouterr().out == (
+            "=== Path: Wei Zhang → Deployment Planning (1 hop) ===\n"
+            "  Wei Zhang (person)\n"
+            "    ←[attended]— Deployment Planning (thread)\n"
+        )
+
+    def test_stats_hubs(self, graph_db, capsys):
+        data = self.run(capsys, "stats")
+        assert {(e["name"], e["connections"]) for e in data["most_connected"]} >= {
+            ("AISP Integration", 2), ("Deployment Planning", 2), ("Weekly Sync", 1)}
+        assert data["most_central"] == []
+
+        conn = sqlite3.connect(str(graph_db))
+        indexer.compute_pagerank(conn)
+        conn.commit()
+        conn.close()
+        central = self.run(capsys, "stats")["most_central"]
+        assert {e["name"] for e in central[:2]} == {"AISP Integration", "Deployment Planning"}
+
+    def test_unknown_option_rejected(self, graph_db):
+        with pytest.raises(SystemExit):
+            qg.run_command(["person", "Wei", "--depth", "2"])
+
+
+class TestResolution:
+    """Test ranked, index-backed entity name resolution."""
+
+    def names(self, brain_db, query, entity_type=None):
+        return [(e["name"], e["match"]) for e in qg.rank_entities(qg.get_conn(), query, entity_type)]
+
+    def test_tiers_in_order(self, brain_db):
+        conn = sqlite3.connect(str(brain_db))
+        conn.executemany("INSERT INTO entities (name, type, slug) VALUES (?, ?, ?)", [
+            ("Old Project Review", "meeting", "old-project-review"),
+            ("The Old Project Plan", "commitment", "the-old-project-plan"),
+        ])
+        conn.commit()
+        conn.close()
+        assert self.names(brain_db, "old project") == [
+            ("Old Project", "slug"),
+            ("Old Project Review", "prefix"),
+            ("The Old Project Plan", "substring"),
+        ]
+
+    def test_exact_slug_beats_longer_match(self, brain_db):
+        assert qg.find_entity(qg.get_conn(), "wei-zhang")["name"] == "Wei Zhang"
+        assert qg.find_entity(qg.get_conn(), "AISP")["name"] == "AISP Integration"
+
+    def test_fuzzy_match_for_typos(self, brain_db):
+        assert self.names(brain_db, "Simone Cirilo") == [("Simone Cirillo", "fuzzy")]
+        assert self.names(brain_db, "Deployment Planing", "thread") == [("Deployment Planning", "fuzzy")]
+        assert self.names(brain_db, "quarterly budget") == []
+
+    def test_type_filter(self, brain_db):
+        assert self.names(brain_db, "wei", "thread") == []
+        assert self.names(brain_db, "wei", "person") == [("Wei Zhang", "prefix")]
+
+    def test_resolution_tracks_renamed_entities(self, brain_db):
+        conn = sqlite3.connect(str(brain_db))
+        conn.execute("UPDATE entities SET name = 'Simone Rossi' WHERE slug = 'simone-cirillo'")
+        conn.commit()
+        conn.close()
+        assert self.names(brain_db, "Rossi") == [("Simone Rossi", "substring")]
+
+
+class TestTimeline:
+    """Test the dated, keyset-paginated timeline."""
+
+    def run(self, capsys, *args):
+        qg.run_command(["timeline", "AISP", "--format", "json"] + list(args))
+        return json.loads(capsys.readouterr().out)
+
+    def test_pages_follow_cursor(self, brain_db, capsys):
+        first = self.run(capsys, "--limit", "1")
+        assert [m["date"] for m in first["mentions"]] == ["2026-01-15"]
+        assert first["mentions"][0]["snippet"] == "- 2026-01-15: Wei presented initial spec"
+        second = self.run(capsys, "--limit", "1", "--after", first["next"])
+        assert [m["date"] for m in second["mentions"]] == ["2026-01-18"]
+        assert "next" not in second
+
+    def test_date_range(self, brain_db, capsys):
+        assert [m["date"] for m in self.run(capsys, "--since", "2026-01-16")["mentions"]] == ["2026-01-18"]
+        assert self.run(capsys, "--until", "2026-01-01")["mentions"] == []
+
+    def test_text_output(self, brain_db, capsys):
+        qg.run_command(["timeline", "AISP", "--limit", "1"])
+        out = capsys.readouterr().out
+        assert out.startswith("=== Timeline: AISP Integration (thread) ===\n\n2026-01-15 [thread] AISP Integration\n")
+        assert out.rstrip().splitlines()[-1].startswith("More: --after 2026-01-15:")
+
+    def test_bad_options_rejected(self, brain_db):
+        for option in (["--since", "last week"], ["--after", "nonsense"]):
+            with pytest.raises(SystemExit):
+                qg.run_command(["timeline", "AISP"] + option)
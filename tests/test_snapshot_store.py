@@ -0,0 +1,78 @@
+"""Tests for scripts/snapshot_store.py"""
+import importlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import snapshot_store
+gp = importlib.import_module('generate-prep')
+
+
+def snapshot(doc_id, title, start):
+    return {
+        "id": doc_id,
+        "title": title,
+        "created_at": start,
+        "start": start,
+        "attendees": [{"email": "wei@example.com", "name": "Wei Zhang"}],
+        "transcript": "hello " * 50,
+    }
+
+
+class TestStore:
+    """Test writing snapshots into the store and reading them back."""
+
+    def test_no_store(self, tmp_path):
+        assert snapshot_store.open_store(str(tmp_path)) is None
+        assert not (tmp_path / snapshot_store.STORE_NAME).exists()
+
+    def test_put_and_read(self, tmp_path):
+        conn = snapshot_store.open_store(str(tmp_path), create=True)
+        snapshot_store.put(conn, "2026-02-10/sync--aaaaaaaa.json", snapshot("aaaaaaaa-1", "Sync", "2026-02-10T10:00:00Z"))
+        snapshot_store.put(conn, "2026-02-11/b--bbbbbbbb.json", snapshot("bbbbbbbb-2", "B", "2026-02-11T09:00:00Z"))
+        snapshot_store.put(conn, "2026-02-11/a--cccccccc.json", snapshot("cccccccc-3", "A", "2026-02-11T15:00:00Z"))
+        conn.commit()
+        conn.close()
+
+        conn = snapshot_store.open_store(str(tmp_path))
+        assert snapshot_store.get(conn, "aaaaaaaa-1")["title"] == "Sync"
+        assert snapshot_store.get(conn, "missing") is None
+        day = list(snapshot_store.iter_snapshots(conn, "2026-02-11"))
+        assert [relpath for relpath, _ in day] == ["2026-02-11/a--cccccccc.json", "2026-02-11/b--bbbbbbbb.json"]
+        assert day[0][1] == snapshot("cccccccc-3", "A", "2026-02-11T15:00:00Z")
+        assert len(list(snapshot_store.iter_snapshots(conn))) == 3
+        assert snapshot_store.relpaths(conn)["bbbbbbbb-2"] == "2026-02-11/b--bbbbbbbb.json"
+
+    def test_import_files(self, tmp_path):
+        day = tmp_path / "2026-02-10"
+        day.mkdir()
+        (day / "sync--aaaaaaaa.json").write_text(json.dumps(snapshot("aaaaaaaa-1", "Sync", "2026-02-10T10:00:00Z")))
+        (day / "notes.json").write_text(json.dumps({"not": "a snapshot"}))
+        (tmp_path / ".manifest.json").write_text("{}")
+
+        conn = snapshot_store.open_store(str(tmp_path), create=True)
+        assert snapshot_store.import_files(conn, str(tmp_path)) == 1
+        assert snapshot_store.relpaths(conn) == {"aaaaaaaa-1": "2026-02-10/sync--aaaaaaaa.json"}
+        assert not (day / "sync--aaaaaaaa.json").exists()
+        assert (day / "notes.json").exists()
+        assert (tmp_path / ".manifest.json").exists()
+
+
+class TestPrepFromStore:
+    """Test generate-prep.py's inbox fallback reading the store."""
+
+    def test_load_inbox_meetings(self, tmp_path):
+        granola_dir = tmp_path / "granola"
+        granola_dir.mkdir()
+        conn = snapshot_store.open_store(str(granola_dir), create=True)
+        snapshot_store.put(conn, "2026-02-11/late--bbbbbbbb.json", snapshot("bbbbbbbb-2", "Late", "2026-02-11T15:00:00Z"))
+        snapshot_store.put(conn, "2026-02-11/early--cccccccc.json", snapshot("cccccccc-3", "Early", "2026-02-11T09:00:00Z"))
+        snapshot_store.put(conn, "2026-02-10/other--aaaaaaaa.json", snapshot("aaaaaaaa-1", "Other", "2026-02-10T10:00:00Z"))
+        conn.commit()
+        conn.close()
+
+        meetings = gp.load_inbox_meetings(str(tmp_path), "2026-02-11")
+        assert [m["title"] for m in meetings] == ["Early", "Late"]
+        assert meetings[0]["attendees"] == [{"email": "wei@example.com", "name": "Wei Zhang"}]
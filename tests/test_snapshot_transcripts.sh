@@ -0,0 +1,123 @@
+#!/usr/bin/env bash
+# Tests for snapshot-transcripts.sh
+# Usage: bash tests/test_snapshot_transcripts.sh
+
+set -uo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+SNAPSHOT="$SCRIPT_DIR/scripts/snapshot-transcripts.sh"
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+
+BRAIN="$TMPDIR/brain"
+export GRANOLA_CACHE_PATH="$TMPDIR/cache-v3.json"
+PASS=0
+FAIL=0
+
+assert_eq() {
+  local desc="$1" expected="$2" actual="$3"
+  if [ "$expected" = "$actual" ]; then
+    echo "  PASS: $desc"
+    PASS=$((PASS + 1))
+  else
+    echo "  FAIL: $desc (expected '$expected', got '$actual')"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+assert_contains() {
+  local output="$1" pattern="$2" desc="$3"
+  if echo "$output" | grep -qi "$pattern"; then
+    echo "  PASS: $desc"
+    PASS=$((PASS + 1))
+  else
+    echo "  FAIL: $desc (expected output to contain '$pattern', got '$output')"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# write_cache N [title-suffix]: a Granola cache with meetings 0..N-1
+write_cache() {
+  python3 - "$GRANOLA_CACHE_PATH" "$1" "${2:-}" << 'EOF'
+import json, sys
+path, n, suffix = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+documents, transcripts = {}, {}
+for i in range(n):
+    doc_id = f"{i:08d}-meeting"
+    documents[doc_id] = {
+        "created_at": f"2026-02-{10 + i % 2}T10:00:00Z",
+        "google_calendar_event": {"summary": f"Sync {i}{suffix}",
+                                  "attendees": [{"email": "wei@example.com", "displayName": "Wei Zhang"}]},
+    }
+    transcripts[doc_id] = [{"text": f"meeting {i} said hello"}]
+with open(path, "w") as f:
+    json.dump({"cache": json.dumps({"state": {"documents": documents, "transcripts": transcripts}})}, f)
+EOF
+}
+
+count_snapshots() {
+  find "$BRAIN/inbox/granola" -name '*.json' ! -name '.manifest.json' | wc -l | tr -d ' '
+}
+
+# --- Test: First run snapshots everything ---
+echo "=== Test: First run ==="
+write_cache 3
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Snapshotted 3 new meetings, skipped 0" "Reports new meetings"
+assert_eq "Snapshot files written" "3" "$(count_snapshots)"
+[ -f "$BRAIN/inbox/granola/.manifest.json" ]
+assert_eq "Manifest written" "0" "$?"
+
+# --- Test: Unchanged cache short-circuits ---
+echo ""
+echo "=== Test: Unchanged cache ==="
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Cache unchanged" "Skips reading an unchanged cache"
+
+# --- Test: Changed cache only adds new meetings ---
+echo ""
+echo "=== Test: New meeting ==="
+write_cache 4
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Snapshotted 1 new meetings, skipped 3" "Only the new meeting is written"
+assert_eq "Snapshot files after new meeting" "4" "$(count_snapshots)"
+
+# --- Test: Renamed meeting is not snapshotted twice ---
+echo ""
+echo "=== Test: Renamed meeting ==="
+write_cache 4 " (renamed)"
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Snapshotted 0 new meetings, skipped 4" "Known IDs are skipped"
+assert_eq "No duplicate snapshots" "4" "$(count_snapshots)"
+
+# --- Test: Manifest rebuilt from existing snapshots ---
+echo ""
+echo "=== Test: Missing manifest ==="
+rm "$BRAIN/inbox/granola/.manifest.json"
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Snapshotted 0 new meetings, skipped 4" "Existing snapshots recognised"
+assert_eq "Still no duplicates" "4" "$(count_snapshots)"
+
+# --- Test: --store moves snapshots into the compressed store ---
+echo ""
+echo "=== Test: Compressed store ==="
+write_cache 5
+OUTPUT=$("$SNAPSHOT" "$BRAIN" --store 2>&1)
+assert_contains "$OUTPUT" "Moved 4 snapshot files" "Existing files moved into the store"
+assert_contains "$OUTPUT" "Snapshotted 1 new meetings, skipped 4" "New meeting written to the store"
+assert_eq "No snapshot files left" "0" "$(count_snapshots)"
+STORED=$(python3 -c "import sqlite3, sys; print(sqlite3.connect(sys.argv[1]).execute('SELECT COUNT(*) FROM snapshots').fetchone()[0])" "$BRAIN/inbox/granola/snapshots.db")
+assert_eq "All meetings in the store" "5" "$STORED"
+write_cache 6
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Snapshotted 1 new meetings, skipped 5" "Later runs keep using the store"
+assert_eq "Still no snapshot files" "0" "$(count_snapshots)"
+rm "$BRAIN/inbox/granola/.manifest.json"
+OUTPUT=$("$SNAPSHOT" "$BRAIN" 2>&1)
+assert_contains "$OUTPUT" "Snapshotted 0 new meetings, skipped 6" "Manifest rebuilt from the store"
+
+echo ""
+echo "==========================="
+echo "Results: $PASS passed, $FAIL failed"
+echo "==========================="
+[ "$FAIL" -eq 0 ] || exit 1
@@ -23,6 +23,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { searchDocuments } = require('../search');
 
 let bolt;
 try {
@@ -82,15 +83,7 @@ function createSlackApp(brainRoot, db, renderMarkdown) {
           return;
         }
         try {
-          const results = db.prepare(`
-            SELECT d.path, d.type,
-                   snippet(search_index, 0, '*', '*', '...', 24) as snippet
-            FROM search_index s
-            JOIN documents d ON d.id = s.rowid
-            WHERE search_index MATCH ?
-            ORDER BY rank
-            LIMIT 5
-          `).all(query);
+          const { results } = searchDocuments(db, query, { limit: 5, marks: ['*', '*'] });
 
           if (results.length === 0) {
             await respond(`No results for "${query}"`);
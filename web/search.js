@@ -0,0 +1,81 @@
+/**
+ * Ranked, paged full-text search over the brain index.
+ *
+ * Mirrors scripts/brain_search.py (keep the two in step): the query only
+ * matches title, content and entity_names, a type filter is ANDed into the
+ * same FTS expression, results come back in the index's BM25 rank order
+ * (weights are configured in schema.sql), and pages are fetched with a
+ * (rank, rowid) cursor instead of OFFSET.
+ */
+
+const PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 200;
+const TEXT_COLUMNS = '{title content entity_names}';
+// Document types the search page can filter on ('transcript' is a passage
+// of a Granola transcript, indexed from inbox/granola)
+const SEARCH_TYPES = ['thread', 'person', 'meeting', 'transcript', 'handoff', 'commitment'];
+
+function ftsPhrase(text) {
+  return `"${text.replace(/"/g, '""')}"`;
+}
+
+// The MATCH argument for `query` over the text columns, limited to `types`.
+// With `literal`, each word is matched as-is rather than as FTS5 syntax.
+function matchExpression(query, types = [], literal = false) {
+  if (literal) {
+    query = query.split(/\s+/).filter(Boolean).map(ftsPhrase).join(' ');
+  }
+  let expression = `${TEXT_COLUMNS} : (${query})`;
+  if (types.length > 0) {
+    expression += ` AND type : (${types.map(ftsPhrase).join(' OR ')})`;
+  }
+  return expression;
+}
+
+function decodeCursor(cursor) {
+  const i = cursor.lastIndexOf(':');
+  const rank = Number(cursor.slice(0, i));
+  const rowid = Number(cursor.slice(i + 1));
+  if (i < 0 || Number.isNaN(rank) || !Number.isInteger(rowid)) {
+    throw new Error('invalid page cursor');
+  }
+  return [rank, rowid];
+}
+
+// One page of documents matching `query`, best first:
+// { results: [{ rowid, path, type, title, snippet }], next: cursor | null }
+function searchDocuments(db, query, { types = [], limit = PAGE_SIZE, after = null,
+  marks = ['>>>', '<<<'] } = {}) {
+  if (!query.trim()) return { results: [], next: null };
+  limit = Math.max(1, Math.min(limit, MAX_PAGE_SIZE));
+
+  let conditions = '';
+  let params = [];
+  if (after) {
+    const [rank, rowid] = decodeCursor(after);
+    conditions = ' AND (s.rank > ? OR (s.rank = ? AND s.rowid > ?))';
+    params = [rank, rank, rowid];
+  }
+
+  const statement = db.prepare(`
+    SELECT s.rowid, s.rank, d.path, d.type, d.title,
+           snippet(search_index, 1, ?, ?, '...', 32) as snippet
+    FROM search_index s
+    JOIN documents d ON d.id = s.rowid
+    WHERE search_index MATCH ?${conditions}
+    ORDER BY s.rank, s.rowid
+    LIMIT ?
+  `);
+  let rows;
+  try {
+    rows = statement.all(...marks, matchExpression(query, types), ...params, limit + 1);
+  } catch (e) {
+    rows = statement.all(...marks, matchExpression(query, types, true), ...params, limit + 1);
+  }
+
+  const results = rows.slice(0, limit).map(({ rank, ...row }) => row);
+  const last = rows.length > limit ? rows[limit - 1] : null;
+  return { results, next: last ? `${last.rank}:${last.rowid}` : null };
+}
+
+module.exports = { searchDocuments, PAGE_SIZE, SEARCH_TYPES };
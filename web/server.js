@@ -10,6 +10,7 @@ const path = require('path');
 const fs = require('fs');
 const Database = require('better-sqlite3');
 const { marked } = require('marked');
+const { searchDocuments, SEARCH_TYPES } = require('./search');
 
 // ---------------------------------------------------------------------------
 // CLI args
@@ -296,19 +297,16 @@ app.get('/timeline', (req, res) => {
 // Search
 app.get('/search', (req, res) => {
   const query = req.query.q || '';
+  const type = req.query.type || '';
   let resultsHtml = '';
 
   if (query && db) {
     try {
-      const results = db.prepare(`
-        SELECT s.rowid, d.path, d.type,
-               snippet(search_index, 0, '<mark>', '</mark>', '...', 32) as snippet
-        FROM search_index s
-        JOIN documents d ON d.id = s.rowid
-        WHERE search_index MATCH ?
-        ORDER BY rank
-        LIMIT 20
-      `).all(query);
+      const { results, next } = searchDocuments(db, query, {
+        types: type ? [type] : [],
+        after: req.query.after || null,
+        marks: ['<mark>', '</mark>'],
+      });
 
       if (results.length > 0) {
         resultsHtml = results.map(r => {
@@ -323,6 +321,11 @@ app.get('/search', (req, res) => {
             <p>${r.snippet}</p>
           </div>`;
         }).join('\n');
+        if (next) {
+          const params = new URLSearchParams({ q: query, after: next });
+          if (type) params.set('type', type);
+          resultsHtml += `\n<p class="more"><a href="/search?${params}">More results →</a></p>`;
+        }
       } else {
         resultsHtml = '<p class="empty">No results found</p>';
       }
@@ -333,9 +336,14 @@ app.get('/search', (req, res) => {
     resultsHtml = '<p class="error">Search index not available. Run indexer.py to build it.</p>';
   }
 
+  const typeOptions = ['', ...SEARCH_TYPES].map(t =>
+    `<option value="${t}"${t === type ? ' selected' : ''}>${t || 'All types'}</option>`
+  ).join('');
+
   render(res, 'search.html', {
     title: 'Search',
     query: query.replace(/"/g, '&quot;'),
+    types: typeOptions,
     results: resultsHtml,
   });
 });